@@ -0,0 +1,91 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Startup budget in milliseconds: importing cli.py, and opening an existing up-to-date database.
+IMPORT_BUDGET_MS = 100
+DB_OPEN_BUDGET_MS = 10
+
+# Modules that must not be imported until the first prompt is shown.
+LAZY_MODULES = ("questionary", "prompt_toolkit")
+
+
+def measure_imports(module="cli", runs=5):
+    """Measures the import time of a module in fresh interpreters with `python -X importtime`.
+
+    Args:
+        module (str): The module to import.
+        runs (int): Number of interpreters to start; the median is reported.
+
+    Returns:
+        tuple: (median_ms, heaviest, loaded) where heaviest is a list of (cumulative_ms, name) for the ten
+        slowest imports of the last run and loaded lists the LAZY_MODULES that were imported.
+    """
+    check = f"import sys, {module}; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    totals = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", check],
+                                cwd=ROOT_PATH, capture_output=True, text=True, check=True)
+        timings = []
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            timings.append((int(cumulative) / 1000, name.strip()))
+        totals.append(next(ms for ms, name in timings if name == module))
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return statistics.median(totals), sorted(timings, reverse=True)[:10], loaded
+
+
+def measure_db_open(runs=20):
+    """Measures how long constructing a DBManager takes for an existing, up-to-date database.
+
+    Returns:
+        float: The median time in milliseconds.
+    """
+    sys.path.insert(0, ROOT_PATH)
+    from habit_components.db import DBManager
+
+    db_name = "bench_startup.db"
+    DBManager(db_name).is_conn.close()
+    timings = []
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            db = DBManager(db_name)
+            timings.append((time.perf_counter() - start) * 1000)
+            db.is_conn.close()
+    finally:
+        os.remove(os.path.join(ROOT_PATH, db_name))
+    return statistics.median(timings)
+
+
+def main():
+    """Prints the startup measurements and exits with status 1 if a budget is exceeded."""
+    import_ms, heaviest, loaded = measure_imports()
+    db_open_ms = measure_db_open()
+
+    print(f"import cli:        {import_ms:8.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+    print(f"open DBManager:    {db_open_ms:8.1f} ms (budget {DB_OPEN_BUDGET_MS} ms)")
+    print("\nHeaviest imports (cumulative):")
+    for ms, name in heaviest:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    failures = []
+    if import_ms > IMPORT_BUDGET_MS:
+        failures.append("import time over budget")
+    if db_open_ms > DB_OPEN_BUDGET_MS:
+        failures.append("database open time over budget")
+    if loaded:
+        failures.append(f"eagerly imported: {', '.join(loaded)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
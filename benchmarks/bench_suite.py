@@ -0,0 +1,227 @@
+import argparse
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from unittest.mock import patch
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_PATH)
+
+from habit_components import analytics
+from habit_components.db import DBManager
+from habit_components.habit import Habit, HabitPeriod, HabitType, TIMESTAMP_FORMAT
+from habit_components.habit_tracker import HabitTracker
+from habit_components.seed_data import generate_habits
+
+# Synthetic database sizes as (habits, years of history); roughly 10k, 1M and 100M completions.
+SIZES = {
+    "small": (100, 0.5),
+    "medium": (10_000, 0.5),
+    "large": (1_000_000, 0.5)
+}
+
+# A benchmark is repeated until it ran for this many seconds, at least MIN_RUNS and at most MAX_RUNS times.
+TARGET_SECONDS = 0.5
+MIN_RUNS = 3
+MAX_RUNS = 200
+
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), "results")
+
+
+def generate_database(db_path, habits, years, seed=0):
+    """Creates a synthetic benchmark database with `seed_data.generate_habits` and analyzes it."""
+    db = DBManager(db_path, cache=False)
+    generate_habits(db, habits, years, seed)
+    db.cursor.execute('ANALYZE')
+    db.is_conn.close()
+
+
+def time_call(func, setup=None):
+    """Times repeated calls of `func`.
+
+    Args:
+        func (callable): The call to time.
+        setup (callable): Optional untimed call made before every call of `func`, whose return value is
+            passed to `func`.
+
+    Returns:
+        dict: The number of runs and the median, minimum and maximum call time in milliseconds.
+    """
+    timings = []
+    deadline = time.perf_counter() + TARGET_SECONDS
+    while len(timings) < MIN_RUNS or (len(timings) < MAX_RUNS and time.perf_counter() < deadline):
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "runs": len(timings),
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings)
+    }
+
+
+def fresh_habit(db, created):
+    """Replaces the habit created by the previous call with a new daily habit and returns its ID.
+
+    Completing a fresh habit takes the insert path of `insert_habit_completion` on every run, instead of the
+    "already completed" no-op of a habit that was completed in the first run.
+    """
+    for habit_id in created:
+        db.delete_habit_info(habit_id)
+    created[:] = db.insert_habits([Habit("Benchmark habit", HabitPeriod.DAILY, HabitType.POSITIVE)])
+    return created[0]
+
+
+def render_view_habits(tracker):
+    """Renders the habit list of `view_habits` once and returns to the main menu."""
+    with patch("habit_components.habit_tracker.select") as mock_select, redirect_stdout(io.StringIO()):
+        mock_select.return_value.ask.return_value = "Go back to main menu"
+        tracker.view_habits()
+
+
+def run_benchmarks(db_path):
+    """Times the DBManager methods, the analytics functions and the `view_habits` render path on one database.
+
+    Args:
+        db_path (str): Absolute path of a database created by `generate_database`.
+
+    Returns:
+        dict: Maps each benchmark name to its timings as returned by `time_call`.
+    """
+    db = DBManager(db_path, cache=False)
+    cached_db = DBManager(db_path)
+    habit_id = db._fetchone('SELECT id FROM habits WHERE is_active = 1 ORDER BY id DESC LIMIT 1')[0]
+    habit = db.fetch_habit_by_id(habit_id)
+    records = db.fetch_all_habits()
+    name = habit.name.upper()
+
+    benchmarks = {
+        "db.fetch_all_habits": db.fetch_all_habits,
+        "db.fetch_all_habits[cached]": cached_db.fetch_all_habits,
+        "db.fetch_habit_by_id": lambda: db.fetch_habit_by_id(habit_id),
+        "db.fetch_habit_names": db.fetch_habit_names,
+        "db.fetch_habit_completions": lambda: db.fetch_habit_completions(habit_id),
+        "db.fetch_completion_counts": lambda: db.fetch_completion_counts(habit_id, "WEEK"),
+        "db.is_habit_completed": lambda: db.is_habit_completed(habit),
+        "db.has_active_habits": db.has_active_habits,
+        "db.reset_broken_streak": lambda: db.reset_broken_streak(habit),
+        "db.reset_broken_streaks": db.reset_broken_streaks,
+        "db.insert_habit_completion": db.insert_habit_completion,
+        "db.fetch_top_streaks": lambda: db.fetch_top_streaks(10),
+    }
+    for label, source in (("sql", db), ("list", records)):
+        benchmarks.update({
+            f"analytics.get_all_active_habits[{label}]": lambda s=source: analytics.get_all_active_habits(s),
+            f"analytics.get_habits_by_period[{label}]": lambda s=source: analytics.get_habits_by_period(s, "weekly"),
+            f"analytics.get_habits_by_type[{label}]": lambda s=source: analytics.get_habits_by_type(s, "negative"),
+            f"analytics.list_habits_by_longest_streak[{label}]":
+                lambda s=source: analytics.list_habits_by_longest_streak(s),
+            f"analytics.get_current_streaks[{label}]": lambda s=source: analytics.get_current_streaks(s),
+            f"analytics.get_longest_streak_for_name[{label}]":
+                lambda s=source: analytics.get_longest_streak_for_name(s, name),
+        })
+
+    with redirect_stdout(io.StringIO()):
+        tracker = HabitTracker(db_path)
+    benchmarks["habit_tracker.view_habits"] = lambda: render_view_habits(tracker)
+
+    fresh_habits = []
+    setups = {"db.insert_habit_completion": lambda: fresh_habit(db, fresh_habits)}
+
+    results = {}
+    for benchmark, func in benchmarks.items():
+        results[benchmark] = time_call(func, setups.get(benchmark))
+        print(f"  {benchmark:<55} {results[benchmark]['median_ms']:10.3f} ms")
+        for habit_id in fresh_habits:
+            db.delete_habit_info(habit_id)
+        fresh_habits.clear()
+
+    for manager in (db, cached_db, tracker.db):
+        manager.is_conn.close()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Finds the benchmarks that got slower than in a baseline run.
+
+    Args:
+        results (dict): The current results as written by `main`.
+        baseline (dict): An earlier results file loaded from JSON.
+        threshold (float): Allowed relative slowdown of the median time, e.g. 0.2 for 20%.
+
+    Returns:
+        list: A list of (size, benchmark, baseline_ms, current_ms) tuples for every regression.
+    """
+    regressions = []
+    for size, benchmarks in results["sizes"].items():
+        for benchmark, timing in benchmarks.items():
+            previous = baseline["sizes"].get(size, {}).get(benchmark)
+            if previous and timing["median_ms"] > previous["median_ms"] * (1 + threshold):
+                regressions.append((size, benchmark, previous["median_ms"], timing["median_ms"]))
+    return regressions
+
+
+def git_commit():
+    """Returns the short hash of the checked out commit, or "unknown" outside a git checkout."""
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_PATH, capture_output=True, text=True)
+    return result.stdout.strip() or "unknown"
+
+
+def main():
+    """Generates the requested database sizes, runs the benchmarks on each and writes the results as JSON."""
+    parser = argparse.ArgumentParser(description="Benchmark DBManager, analytics and the view_habits render path.")
+    parser.add_argument("--sizes", nargs="+", choices=SIZES, default=["small"], help="Database sizes to benchmark.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data generator.")
+    parser.add_argument("--output", help="Path of the JSON results file (default: benchmarks/results/<commit>.json).")
+    parser.add_argument("--compare", metavar="BASELINE", help="Results file to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before failing (default 0.2).")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "created_at": datetime.now().strftime(TIMESTAMP_FORMAT),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "sizes": {}
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in args.sizes:
+            habits, years = SIZES[size]
+            db_path = os.path.join(tmp_dir, f"bench_{size}.db")
+            print(f"Generating {size} database ({habits} habits, {years} year(s) of completions)...")
+            start = time.perf_counter()
+            generate_database(db_path, habits, years, args.seed)
+            print(f"  generated in {time.perf_counter() - start:.1f} s")
+            results["sizes"][size] = run_benchmarks(db_path)
+
+    output = args.output or os.path.join(RESULTS_PATH, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for size, benchmark, previous_ms, current_ms in regressions:
+            print(f"REGRESSION [{size}] {benchmark}: {previous_ms:.3f} ms -> {current_ms:.3f} ms")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Request mix sent by default, as (method, path) pairs taken in turn by every client.
+DEFAULT_MIX = [
+    ("GET", "/habits"),
+    ("GET", "/analytics/current_streaks"),
+    ("GET", "/analytics/by_period?period=daily"),
+    ("GET", "/analytics/longest_streak"),
+]
+
+
+def run_client(url, requests, mix, latencies, errors):
+    """Sends requests over one persistent connection and records the latency of each in milliseconds."""
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    for i in range(requests):
+        method, path = mix[i % len(mix)]
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=b"" if method != "GET" else None)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(repr(e))
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    conn.close()
+
+
+def load_test(url, concurrency=8, requests=1000, mix=DEFAULT_MIX):
+    """Runs `concurrency` keep-alive clients against a habit tracker server.
+
+    Args:
+        url (str): Base URL of the server, e.g. "http://127.0.0.1:8765".
+        concurrency (int): Number of clients sending requests in parallel.
+        requests (int): Number of requests sent by each client.
+        mix (list): (method, path) pairs the clients cycle through.
+
+    Returns:
+        dict: Requests per second, error count and latency percentiles in milliseconds.
+    """
+    latencies, errors = [], []
+    clients = [threading.Thread(target=run_client, args=(url, requests, mix, latencies, errors))
+               for _ in range(concurrency)]
+    start = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else None
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "mean_ms": statistics.fmean(latencies) if latencies else None,
+        "p50_ms": percentile(0.50),
+        "p90_ms": percentile(0.90),
+        "p99_ms": percentile(0.99),
+        "max_ms": latencies[-1] if latencies else None
+    }
+
+
+def main():
+    """Load-tests a running `python -m habit_components.server` and prints the results."""
+    parser = argparse.ArgumentParser(description="Load-test the habit tracker HTTP server.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765", help="Base URL of the server.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Number of parallel keep-alive clients.")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests sent by each client.")
+    parser.add_argument("--path", action="append", metavar="[METHOD ]PATH",
+                        help="Request to send instead of the default mix; may be repeated.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args()
+
+    mix = DEFAULT_MIX
+    if args.path:
+        mix = [tuple(path.split(" ", 1)) if " " in path else ("GET", path) for path in args.path]
+    results = load_test(args.url, args.concurrency, args.requests, mix)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{results['requests']} requests in {results['seconds']:.2f} s, {results['errors']} error(s)")
+    print(f"throughput: {results['requests_per_second']:.0f} requests/s")
+    print("latency:    " + ", ".join(f"{key[:-3]} {results[key]:.2f} ms"
+                                     for key in ("mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms")))
+
+
+if __name__ == "__main__":
+    main()
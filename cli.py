@@ -1,11 +1,39 @@
-from questionary import select, confirm
+from habit_components.prompts import select, confirm
 from habit_components.habit_tracker import HabitTracker
 import habit_components.analytics
 
+# Time spans offered for the completion heatmap, in months.
+HEATMAP_SPANS = {"Last 3 months": 3, "Last 6 months": 6, "Last 12 months": 12, "Last 5 years": 60}
 
-def main():
-    """This function creates the main menu with all the relevant actions."""
-    tracker = HabitTracker()
+
+def main(argv=None):
+    """This function creates the main menu with all the relevant actions.
+
+    With `--profile`, every database query is traced and a summary of the slowest calls is printed on exit.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Track your habits from the command line.", allow_abbrev=False)
+    parser.add_argument("--profile", action="store_true", help="Print a query profile when the app exits.")
+    parser.add_argument("--slow-ms", type=float, default=50, help="Threshold of the slow-query log in ms.")
+    parser.add_argument("--slow-log", help="File to append slow queries and their query plans to.")
+    args = parser.parse_args(argv)
+
+    tracer = None
+    if args.profile:
+        from habit_components.tracing import QueryTracer
+        tracer = QueryTracer(args.slow_ms, open(args.slow_log, "a") if args.slow_log else None)
+    try:
+        run_menu(HabitTracker(tracer=tracer))
+    finally:
+        if tracer is not None:
+            print("\n" + tracer.summary())
+            if tracer.slow_log is not None:
+                tracer.slow_log.close()
+
+
+def run_menu(tracker):
+    """Shows the main menu until the user exits."""
     analytics = habit_components.analytics
 
     print("Welcome to the Habit Tracker App! \n")
@@ -32,59 +60,55 @@ def main():
                 "List habits by type",
                 "List habits by longest streak",
                 "Show current streak for all habits",
+                "Show completion rates for all habits",
                 "View longest streak for a specific habit",
+                "Show completion heatmap for a habit",
                 "Back to main menu..."
             ]).ask()
 
             if analysis_options == "List habits by time-period":
-                habits = tracker.db.fetch_all_habits()
-
-                if not habits:
+                if not tracker.db.has_active_habits():
                     print("No habits found, please create a habit first.")
                 else:
                     habit_period = select("Which period?\n", choices=["Daily", "Weekly"]).ask()
-                    results = analytics.get_habits_by_period(habits, habit_period)
+                    results = analytics.get_habits_by_period(tracker.db, habit_period)
 
                     if not results:
                         print(f"No habits found for period: {habit_period}.")
                     else:
                         for h in results:
-                            print(f"{h[1]} - {h[2].title()}")
+                            print(f"{h.name} - {h.habit_period.title()}")
 
             elif analysis_options == "List habits by type":
-                habits = tracker.db.fetch_all_habits()
-
-                if not habits:
+                if not tracker.db.has_active_habits():
                     print("No habits found, please create a habit first.")
                 else:
                     habit_type = select("Which type?", choices=["Positive", "Negative"]).ask()
 
-                    results = analytics.get_habits_by_type(habits, habit_type)
+                    results = analytics.get_habits_by_type(tracker.db, habit_type)
                     if not results:
                         print(f"No habits found for type: {habit_type}.")
 
                     else:
                         for h in results:
-                            print(f"{h[1]} - {h[3].title()}")
+                            print(f"{h.name} - {h.habit_type.title()}")
 
             elif analysis_options == "List habits by longest streak":
-                habits = tracker.db.fetch_all_habits()
-                if not habits:
+                if not tracker.db.has_active_habits():
                     print("No habits found, please create a habit first.")
                 else:
-                    results = analytics.list_habits_by_longest_streak(habits)
+                    results = analytics.list_habits_by_longest_streak(tracker.db)
                     
                     if not results:
                         print("No habit data available for analysis.")                    
                     else:
                         print("Habits by longest streak:\n")
                         for idx, h in enumerate(results, start=1):
-                            print(f"{idx}. {h[1]} — 🔥 {h[7]} days")
+                            print(f"{idx}. {h.name} — 🔥 {h.longest_streak} days")
 
 
             elif analysis_options == "Show current streak for all habits":
-                habits = tracker.db.fetch_all_habits()
-                streaks = analytics.get_current_streaks(habits)
+                streaks = analytics.get_current_streaks(tracker.db)
 
                 if not streaks:
                     print("No active habits with a current streak...")
@@ -93,22 +117,48 @@ def main():
                     for name, habit_period, current_streak in streaks:
                         print(f"{name} ({habit_period.title()}): ⏳ Current Streak = {current_streak}")
 
+            elif analysis_options == "Show completion rates for all habits":
+                rates = analytics.get_completion_rates(tracker.db)
+
+                if not rates:
+                    print("No active habits found...please create a habit.")
+
+                else:
+                    for name, habit_period, stats in rates:
+                        windows = " | ".join(f"{days} days: {window.rate:.0%}" for days, window in stats.items())
+                        print(f"{name} ({habit_period.title()}): 📈 {windows}")
+
             elif analysis_options == "View longest streak for a specific habit":
-                habits = tracker.db.fetch_all_habits()
-                names = [h[1] for h in habits if  h [8] == 1]
+                names = tracker.db.fetch_habit_names()
                 if not names:
                     print("No active habits found...please create a habit.")
                 else:
                     selected = select("Choose a habit", choices=names).ask()
-                    data = analytics.get_longest_streak_for_name(habits, selected)
+                    data = analytics.get_longest_streak_for_name(tracker.db, selected)
 
 
                     if data:
-                        print(f"Habit: {data[1]}\nCurrent Streak: {data[6]}\nLongest Streak: {data[7]}")
+                        print(f"Habit: {data.name}\nCurrent Streak: {data.current_streak}\nLongest Streak: {data.longest_streak}")
                     else:
                         print("Habit not found.")
 
 
+            elif analysis_options == "Show completion heatmap for a habit":
+                names = tracker.db.fetch_habit_names()
+                if not names:
+                    print("No active habits found...please create a habit.")
+                else:
+                    selected = select("Choose a habit", choices=names).ask()
+                    span = select("Which time span?", choices=list(HEATMAP_SPANS)).ask()
+                    habit = tracker.db.fetch_habit_by_name(selected)
+
+                    if habit:
+                        heatmap = analytics.get_completion_heatmap(tracker.db, habit.id, HEATMAP_SPANS[span])
+                        print(f"Habit: {habit.name}\n")
+                        print(analytics.format_heatmap(heatmap))
+                    else:
+                        print("Habit not found.")
+
             elif analysis_options == "Back to main menu...":
                 pass
         
@@ -1,64 +1,213 @@
+from datetime import date, timedelta
+
+# Weekday labels used by the heatmap, Monday first like `date.weekday()`.
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+# Heatmap cells from no completions to the busiest day.
+HEATMAP_SHADES = "·░▒▓█"
+
+# Window lengths in days reported by `get_completion_rates`.
+ROLLING_WINDOWS = (7, 30, 90)
+
+def _is_query_source(habits):
+    """Checks whether `habits` is a database manager that can answer the query in SQL.
+
+    Every analytics function accepts either a list of habit records, which is filtered in Python, or a
+    `DBManager`, in which case the filter runs as an indexed query and only matching rows are loaded.
+    """
+    return hasattr(habits, "fetch_habits_by_period")
+
 def get_all_active_habits(habits):
     """Returns a list of all active habits.
 
     Args:
-        habits (list): A list of habit records where index 8 represents the "active" status of the habit.
+        habits (list or DBManager): A list of HabitRecord objects, or a database manager to query.
     """
-    return list(filter(lambda h: h[8] == 1, habits))
+    if _is_query_source(habits):
+        return habits.fetch_all_habits()
+    return list(filter(lambda h: h.is_active == 1, habits))
 
 def get_habits_by_period(habits, habit_period):
     """Returns a list of habits with the chosen period.
 
     Args:
-        habits (list): A list of habit records with index 2 being the habit's period attribute.
+        habits (list or DBManager): A list of HabitRecord objects, or a database manager to query.
         habit_period (str): The period to filter by (daily or weekly).
 
     Returns:
           list: A list of habits that match the selected period.
     """
-    return list(filter(lambda h: h[2].upper() == habit_period.upper(), habits))
+    if _is_query_source(habits):
+        return habits.fetch_habits_by_period(habit_period)
+    return list(filter(lambda h: h.habit_period.upper() == habit_period.upper(), habits))
 
 def get_habits_by_type(habits, habit_type):
     """Returns a list of habits with the chosen type.
 
     Args:
-        habits (list): A list of habit records with index 2 being the habit's period attribute.
+        habits (list or DBManager): A list of HabitRecord objects, or a database manager to query.
         habit_type (str): The type to filter by (positive or negative).
 
     Returns:
           list: A list of habits that match the selected type.
     """
-    return list(filter(lambda h: h[3].upper() == habit_type.upper(), habits))
+    if _is_query_source(habits):
+        return habits.fetch_habits_by_type(habit_type)
+    return list(filter(lambda h: h.habit_type.upper() == habit_type.upper(), habits))
 
 def list_habits_by_longest_streak(habits):
     """Returns all habits that have the longest streak value."""
+    if _is_query_source(habits):
+        return habits.fetch_habits_with_longest_streak()
+
     if not habits:
         return []
 
-    max_streak = max(h[7] for h in habits)
-    return [h for h in habits if h[7] == max_streak]
+    max_streak = max(h.longest_streak for h in habits)
+    return [h for h in habits if h.longest_streak == max_streak]
 
 def get_current_streaks(habits):
     """Returns a list of active habits with their current streak.
 
     Args:
-        habits (list): List of habit records.
-    
+        habits (list or DBManager): List of HabitRecord objects, or a database manager to query.
+
     Returns:
         list: A list of tuples in the order (name, period, current_streak) for active streaks.
     """
-    return [(h[1], h[2], h[6]) for h in habits if h[6] > 0]
+    if _is_query_source(habits):
+        return habits.fetch_current_streaks()
+    return [(h.name, h.habit_period, h.current_streak) for h in habits if h.current_streak > 0]
+
+def get_completion_rates(db, windows=ROLLING_WINDOWS, today=None):
+    """Returns the rolling completion rates of all active habits.
+
+    The windows are answered from the cached per-habit prefix sums of `DBManager.fetch_completion_prefix_sums`,
+    so each window of each habit costs two array lookups instead of a query over its history.
+
+    Args:
+        db (DBManager): The database manager to query.
+        windows (tuple): Window lengths in days, each ending today.
+        today (date): Last day of every window, defaults to the current date.
+
+    Returns:
+        list: A list of tuples in the order (name, period, stats), where stats maps each window length to the
+        WindowStats of the habit.
+    """
+    prefix_sums = db.fetch_completion_prefix_sums(today)
+    return [(h.name, h.habit_period, {days: prefix_sums.window(h.id, days) for days in windows})
+            for h in db.fetch_all_habits()]
+
+def get_completion_rate(db, habit_id, days, end=None):
+    """Returns the completion statistics of one habit over an arbitrary window.
+
+    Args:
+        db (DBManager): The database manager to query.
+        habit_id (int): The ID of the habit.
+        days (int): Length of the window in days.
+        end (date): Last day of the window, defaults to the current date.
+
+    Returns:
+        WindowStats: The statistics of the window.
+    """
+    return db.fetch_completion_prefix_sums().window(habit_id, days, end)
 
 def get_longest_streak_for_name(habits, name):
     """Returns the habit with the given name to check their longest streak.
 
     Args:
-        habits (list): A list of habit records.
+        habits (list or DBManager): A list of HabitRecord objects, or a database manager to query.
         name (str): The name of the habit to search for.
 
     Returns:
-        list: A list of habit records that match the given name.
+        HabitRecord or None: The first habit that matches the given name.
     """
-    result = list(filter(lambda h: h[1].lower() == name.lower(), habits))
+    if _is_query_source(habits):
+        return habits.fetch_habit_by_name(name)
+    result = list(filter(lambda h: h.name.lower() == name.lower(), habits))
     return result[0] if result else None
 
+def _months_before(day, months):
+    """Returns the same day of the month `months` months before `day`, clamped to the length of that month."""
+    month_index = day.year * 12 + day.month - 1 - months
+    year, month = divmod(month_index, 12)
+    first_of_next = date(year + (month + 1) // 12, (month + 1) % 12 + 1, 1)
+    return date(year, month + 1, min(day.day, (first_of_next - timedelta(days=1)).day))
+
+def get_completion_heatmap(db, habit_id, months=12, today=None):
+    """Returns the completions per day and per weekday of a habit over the last months.
+
+    Both are aggregated in SQLite: the daily counts come from the rollup table, which holds one row per habit
+    and day with completions, and the weekday distribution is a `GROUP BY` over those rows. Only one row per
+    active day is loaded, so even a multi-year heatmap needs no scan of the completions.
+
+    Args:
+        db (DBManager): The database manager to query.
+        habit_id (int): The ID of the habit.
+        months (int): Number of months to cover, ending today.
+        today (date): Last day of the heatmap, defaults to the current date.
+
+    Returns:
+        dict: The heatmap data:
+            - "start" (date): First day covered.
+            - "end" (date): Last day covered.
+            - "days" (dict): Maps every date with completions to its number of completions.
+            - "weekdays" (list): Number of completions per weekday, Monday first.
+            - "total" (int): Number of completions in the period.
+    """
+    end = today or date.today()
+    start = _months_before(end, months) + timedelta(days=1)
+    days = {date.fromisoformat(day): count
+            for day, count in db.fetch_completion_counts(habit_id, "DAY", start.isoformat(), end.isoformat())}
+    weekdays = [0] * 7
+    for weekday, count in db.fetch_weekday_counts(habit_id, start.isoformat(), end.isoformat()):
+        weekdays[weekday] = count
+    return {"start": start, "end": end, "days": days, "weekdays": weekdays, "total": sum(weekdays)}
+
+def format_heatmap(heatmap, weeks_per_row=26):
+    """Renders a heatmap from `get_completion_heatmap` as a calendar grid with one column per week.
+
+    Args:
+        heatmap (dict): The heatmap data.
+        weeks_per_row (int): Maximum number of week columns before the grid wraps.
+
+    Returns:
+        str: The grid, followed by the weekday distribution.
+    """
+    start, end, days = heatmap["start"], heatmap["end"], heatmap["days"]
+    busiest = max(days.values(), default=0)
+    first_monday = start - timedelta(days=start.weekday())
+    week_count = (end - first_monday).days // 7 + 1
+    # Spread the weeks evenly over the rows, so a wrapped grid doesn't end in a single stray column.
+    rows = -(-week_count // weeks_per_row)
+    per_row = -(-week_count // rows)
+
+    lines = []
+    for first_week in range(0, week_count, per_row):
+        weeks = range(first_week, min(first_week + per_row, week_count))
+        # Month names above the first week of each month, where they don't overlap the previous one.
+        header = ""
+        for column, week in enumerate(weeks):
+            monday = first_monday + timedelta(weeks=week)
+            if column == 0 or (monday.day <= 7 and len(header) < 2 * column):
+                header = header.ljust(2 * column) + monday.strftime("%b")
+        lines.append("    " + header)
+        for weekday, name in enumerate(WEEKDAYS):
+            cells = []
+            for week in weeks:
+                day = first_monday + timedelta(weeks=week, days=weekday)
+                if day < start or day > end:
+                    cells.append(" ")
+                else:
+                    count = days.get(day, 0)
+                    shade = 0 if not count else max(1, round(count / busiest * (len(HEATMAP_SHADES) - 1)))
+                    cells.append(HEATMAP_SHADES[shade])
+            lines.append(f"{name} " + " ".join(cells).rstrip())
+        lines.append("")
+
+    most = max(heatmap["weekdays"])
+    lines.append(f"{heatmap['total']} completions from {start} to {end}, by weekday:")
+    for name, count in zip(WEEKDAYS, heatmap["weekdays"]):
+        bar = "█" * round(count / most * 20) if most else ""
+        lines.append(f"  {name} {count:>5} {bar}")
+    return "\n".join(lines)
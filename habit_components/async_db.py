@@ -0,0 +1,160 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from habit_components import analytics
+from habit_components.db import DBManager
+from habit_components.habit import Habit, HabitPeriod, HabitType
+
+
+class AsyncDBManager:
+    """Asyncio API over `DBManager` for embedding the tracker in an event loop.
+
+    Every call runs in a thread pool, so SQLite I/O and commits never block the loop. The database is opened in
+    concurrent mode: reads run on a bounded pool of worker threads, each borrowing one of the WAL reader
+    connections, so up to `max_readers` queries run in parallel. Writes go to a single writer thread, which
+    serializes them on the writer connection. At most `max_pending` calls are handed to the executors at a time;
+    further callers wait on a semaphore, which is much cheaper for the loop than queueing thousands of futures.
+
+    The habit session cache is disabled by default, because pooled readers see committed data directly. Methods
+    without their own docstring behave like the `DBManager` method or analytics function of the same name.
+
+    Attributes:
+        db (DBManager): The underlying database manager, opened in concurrent mode.
+    """
+    def __init__(self, db_name="habit_tracker.db", max_readers=4, max_pending=64, busy_timeout=5000, cache=False):
+        """Opens the database and starts the reader and writer executors.
+
+        Args:
+            db_name (str): Name of the SQLite database file.
+            max_readers (int): Number of reader threads and pooled reader connections.
+            max_pending (int): Maximum number of calls queued or running in the executors at once.
+            busy_timeout (int): Milliseconds to wait for a lock held by another connection before failing.
+            cache (bool): If True, habit records are served from the DBManager session cache.
+        """
+        self.db = DBManager(db_name, concurrent=True, pool_size=max_readers, busy_timeout=busy_timeout, cache=cache)
+        self._read_executor = ThreadPoolExecutor(max_workers=max_readers, thread_name_prefix="habit-reader")
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="habit-writer")
+        self._pending = asyncio.Semaphore(max_pending)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _submit(self, executor, func, *args, **kwargs):
+        """Runs a call on an executor once fewer than `max_pending` calls are queued or running."""
+        async with self._pending:
+            return await asyncio.get_running_loop().run_in_executor(executor, partial(func, *args, **kwargs))
+
+    async def _read(self, func, *args, **kwargs):
+        """Runs a read-only call on the reader executor."""
+        return await self._submit(self._read_executor, func, *args, **kwargs)
+
+    async def _write(self, func, *args, **kwargs):
+        """Runs a writing call on the single writer thread."""
+        return await self._submit(self._write_executor, func, *args, **kwargs)
+
+    async def close(self):
+        """Waits for pending calls to finish and closes all connections."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._read_executor.shutdown)
+        await loop.run_in_executor(None, self._write_executor.shutdown)
+        self.db.close_conn()
+
+    # Habit management, mirroring the non-interactive parts of HabitTracker
+    async def create_habit(self, name, habit_period, habit_type):
+        """Creates a new habit.
+
+        Args:
+            name (str): The name of the habit.
+            habit_period (HabitPeriod or str): The period of the habit, or its value (DAILY or WEEKLY).
+            habit_type (HabitType or str): The type of the habit, or its value (POSITIVE or NEGATIVE).
+
+        Returns:
+            int: The ID of the new habit.
+        """
+        habit = Habit(name, HabitPeriod(habit_period), HabitType(habit_type))
+        return (await self._write(self.db.insert_habits, [habit]))[0]
+
+    async def complete_habit(self, habit_id):
+        """Marks a habit as completed now; see `DBManager.insert_habit_completion`."""
+        return await self._write(self.db.insert_habit_completion, habit_id)
+
+    async def update_habit(self, habit_id, new_name, new_habit_period, new_habit_type):
+        """Updates a habit's name, period, and type."""
+        await self._write(self.db.change_habit_info, habit_id, new_name, HabitPeriod(new_habit_period),
+                          HabitType(new_habit_type))
+
+    async def archive_habit(self, habit_id):
+        """Archives a habit, making it inactive."""
+        await self._write(self.db.archive_habit_info, habit_id)
+
+    async def unarchive_habit(self, habit_id):
+        """Makes an archived habit active again."""
+        await self._write(self.db.unarchive_habit_info, habit_id)
+
+    async def delete_habit(self, habit_id):
+        """Deletes a habit."""
+        await self._write(self.db.delete_habit_info, habit_id)
+
+    # DBManager writes
+    async def insert_habits(self, habits):
+        return await self._write(self.db.insert_habits, habits)
+
+    async def insert_habit_completions(self, completions):
+        return await self._write(self.db.insert_habit_completions, completions)
+
+    async def reset_broken_streaks(self):
+        return await self._write(self.db.reset_broken_streaks)
+
+    async def verify_streaks(self, apply=False):
+        return await self._write(self.db.verify_streaks, apply)
+
+    # DBManager reads
+    async def fetch_all_habits(self, include_archived=False):
+        return await self._read(self.db.fetch_all_habits, include_archived)
+
+    async def fetch_habit_by_id(self, habit_id):
+        return await self._read(self.db.fetch_habit_by_id, habit_id)
+
+    async def fetch_habit_by_name(self, name):
+        return await self._read(self.db.fetch_habit_by_name, name)
+
+    async def fetch_habit_names(self):
+        return await self._read(self.db.fetch_habit_names)
+
+    async def fetch_habit_completions(self, habit_id):
+        return await self._read(self.db.fetch_habit_completions, habit_id)
+
+    async def fetch_completion_counts(self, habit_id, granularity="DAY", start=None, end=None):
+        return await self._read(self.db.fetch_completion_counts, habit_id, granularity, start, end)
+
+    async def has_active_habits(self):
+        return await self._read(self.db.has_active_habits)
+
+    async def fetch_top_streaks(self, limit):
+        return await self._read(self.db.fetch_top_streaks, limit)
+
+    def is_habit_completed(self, habit):
+        """Checks whether a habit record was completed within its period; needs no database access."""
+        return self.db.is_habit_completed(habit)
+
+    # Analytics, answered by the indexed SQL queries of DBManager
+    async def get_all_active_habits(self):
+        return await self._read(analytics.get_all_active_habits, self.db)
+
+    async def get_habits_by_period(self, habit_period):
+        return await self._read(analytics.get_habits_by_period, self.db, habit_period)
+
+    async def get_habits_by_type(self, habit_type):
+        return await self._read(analytics.get_habits_by_type, self.db, habit_type)
+
+    async def list_habits_by_longest_streak(self):
+        return await self._read(analytics.list_habits_by_longest_streak, self.db)
+
+    async def get_current_streaks(self):
+        return await self._read(analytics.get_current_streaks, self.db)
+
+    async def get_longest_streak_for_name(self, name):
+        return await self._read(analytics.get_longest_streak_for_name, self.db, name)
@@ -0,0 +1,58 @@
+class HabitCache:
+    """Identity map of habit records kept in front of the database for one session.
+
+    The cache is filled with every habit on first use and then patched record by record after writes made
+    by `DBManager` methods; a `DBManager.transaction` block clears it on commit. It is tagged with a token of
+    the connection's `PRAGMA data_version` and `total_changes`, so commits from other processes and raw SQL
+    writes committed outside a transaction block both invalidate it.
+
+    Attributes:
+        habits (dict): Maps habit ID to its cached record, in the order the habits were created.
+        loaded (bool): Whether `habits` holds every habit of the database.
+        version (int): Incremented whenever the cached data changes.
+    """
+    def __init__(self):
+        self.habits = {}
+        self.loaded = False
+        self.version = 0
+        self._token = None
+
+    def is_valid(self, token):
+        """Checks whether the cache is loaded and still matches the database state described by `token`."""
+        return self.loaded and token == self._token
+
+    def load(self, records, token):
+        """Replaces the cache content with all habit records.
+
+        Args:
+            records (list): Every habit record of the database.
+            token (tuple): The database state the records were read at.
+        """
+        self.habits = {record[0]: record for record in records}
+        self.loaded = True
+        self._token = token
+        self.version += 1
+
+    def patch(self, habit_ids, records, token):
+        """Updates the cached records of some habits after a write.
+
+        Args:
+            habit_ids (iterable): IDs of the habits that were written.
+            records (list): The current records of those habits; IDs without a record were deleted.
+            token (tuple): The database state after the write.
+        """
+        current = {record[0]: record for record in records}
+        for habit_id in habit_ids:
+            if habit_id in current:
+                self.habits[habit_id] = current[habit_id]
+            else:
+                self.habits.pop(habit_id, None)
+        self._token = token
+        self.version += 1
+
+    def clear(self):
+        """Drops every cached record, so the next read loads them again."""
+        self.habits = {}
+        self.loaded = False
+        self._token = None
+        self.version += 1
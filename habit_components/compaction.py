@@ -0,0 +1,37 @@
+def format_report(report, dry_run=False):
+    """Formats the report returned by `DBManager.compact_history` as one line of text.
+
+    Args:
+        report (dict): The compaction report.
+        dry_run (bool): Whether the report describes a dry run.
+
+    Returns:
+        str: The formatted report.
+    """
+    verb = "Would compact" if dry_run else "Compacted"
+    line = (f"{verb} {report['rows']} completion(s) of {report['habits']} habit(s) before {report['cutoff']}, "
+            f"about {report['bytes'] / 1024:.1f} KiB")
+    if not dry_run:
+        line += f"; the file shrank by {report['reclaimed_bytes'] / 1024:.1f} KiB"
+    return line + "."
+
+
+def main():
+    """Compacts the completions of a database older than a horizon into its rollups, or reports what would be."""
+    import argparse
+    from habit_components.db import DBManager
+
+    parser = argparse.ArgumentParser(description="Roll old completions into per-day and per-week aggregates.")
+    parser.add_argument("db_name", nargs="?", default="habit_tracker.db", help="Name of the SQLite database file.")
+    parser.add_argument("--horizon-days", type=int, default=365, help="Number of days of completions to keep.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the rows and bytes that would be saved.")
+    args = parser.parse_args()
+
+    db = DBManager(args.db_name)
+    report = db.compact_history(horizon_days=args.horizon_days, dry_run=args.dry_run)
+    print(format_report(report, dry_run=args.dry_run))
+    db.close_conn()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from bisect import bisect_left, insort
+from datetime import date
+
+
+class HabitDashboard:
+    """Snapshot of the active habits listed by `HabitTracker.view_habits`.
+
+    The snapshot is computed once per session against a single `today`: missed streaks are reset with one
+    set-based statement, every active habit is loaded once, and its completion status and menu label are
+    stored. After an action on one habit only that habit is read back and patched with `refresh`, so
+    redrawing the menu does no work for the untouched habits.
+
+    Attributes:
+        db (DBManager): The database the snapshot was read from.
+        today (date): The day completion statuses are computed for.
+        missed (list): (habit_id, name, habit_period, days_missed) tuples of the streaks reset when the
+            snapshot was taken.
+        rows (dict): Maps habit ID to a (record, completed, label) tuple.
+        ids (list): The IDs in `rows` in ascending order, which is the order of the menu.
+    """
+    def __init__(self, db, today=None):
+        """Resets the missed streaks and loads every active habit.
+
+        Args:
+            db (DBManager): The database to read from.
+            today (date): The day to compute completion statuses for, defaults to the current date.
+        """
+        self.db = db
+        self.today = today or date.today()
+        self.missed = db.reset_broken_streaks()
+        self.rows = {}
+        self.ids = []
+        for habit in db.fetch_all_habits():
+            self._set(habit)
+
+    def _set(self, habit):
+        """Stores the completion status and menu label of one habit record."""
+        completed = self.db.is_habit_completed(habit, self.today)
+        status = "✅" if completed else "🔲"
+        label = f"{status} {habit.name} - {habit.habit_period.title()}, {habit.habit_type.title()}"
+        if habit.id not in self.rows:
+            insort(self.ids, habit.id)
+        self.rows[habit.id] = (habit, completed, label)
+
+    def refresh(self, habit_id):
+        """Patches the snapshot after a habit was completed, edited, archived or deleted.
+
+        Args:
+            habit_id (int): The ID of the habit that changed.
+        """
+        habit = self.db.fetch_habit_by_id(habit_id)
+        if habit is None or not habit.is_active:
+            if self.rows.pop(habit_id, None) is not None:
+                del self.ids[bisect_left(self.ids, habit_id)]
+        else:
+            self._set(habit)
+
+    def choices(self):
+        """Returns the numbered menu labels of all habits, numbered from 1 in habit ID order."""
+        return [f"[{index}] {self.rows[habit_id][2]}" for index, habit_id in enumerate(self.ids, start=1)]
+
+    def habit_at(self, index):
+        """Returns the (record, completed) pair of the habit shown with the given menu number.
+
+        Args:
+            index (int): The number shown in front of the habit, starting at 1.
+        """
+        habit, completed, _ = self.rows[self.ids[index - 1]]
+        return habit, completed
@@ -1,7 +1,40 @@
+import heapq
+import inspect
 import os
+import queue
 import sqlite3
-from datetime import datetime
-from habit_components.habit import Habit
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from habit_components.archive import pack_history, unpack_history
+from habit_components.cache import HabitCache
+from habit_components.habit import Habit, HabitRecord, TIMESTAMP_FORMAT, LEGACY_TIMESTAMP_FORMAT, habit_record_factory
+from habit_components.rates import CompletionPrefixSums
+from habit_components.streaks import compute_all_streaks, compute_streaks, is_overdue, period_key
+from habit_components.tracing import TracedConnection
+
+SCHEMA_VERSION = 7
+
+# SQL expressions mapping a completion timestamp to the first day of its rollup bucket; weeks start on Monday.
+ROLLUP_BUCKETS = {
+    "DAY": "date(completed_at)",
+    "WEEK": "date(completed_at, 'weekday 0', '-6 days')"
+}
+
+
+def _day_ordinal_sql(timestamp):
+    """Returns an SQL expression turning a timestamp into its proleptic Gregorian ordinal, like `toordinal()`.
+
+    julianday('0001-01-01') is 1721425.5, so the integer part of the difference is the ordinal.
+    """
+    return f"CAST(julianday({timestamp}) - 1721424.5 AS INTEGER)"
+
+
+def _period_key_sql(day, habit_period):
+    """Returns an SQL expression computing `streaks.period_key` from a day ordinal and a habit period."""
+    return f"CASE {habit_period} WHEN 'WEEKLY' THEN ({day} - 1) / 7 ELSE {day} END"
 
 
 class DBManager:
@@ -9,48 +42,381 @@ class DBManager:
 
     Manages the SQLite3 database connection, schema creation, and all interactions involving habits and their completions.
 
+    By default a single connection is used for everything. In concurrent mode the database is switched to WAL
+    journaling and reads are served from a small pool of reader connections, while all writes go through one
+    writer connection guarded by a lock. Readers then never block completions, and several processes can share
+    the same database file.
+
     Attributes:
-        is_conn (sqlite3.Connection): Active SQLite3 connection object.
+        is_conn (sqlite3.Connection): Active SQLite3 connection object, used as the writer connection.
         cursor (sqlite3.Cursor): Cursor used for executing SQL queries.
+        db_path (str): Absolute path of the SQLite database file.
+        concurrent (bool): Whether WAL mode and the reader pool are enabled.
+        cache (HabitCache or None): Session cache of habit records, or None if caching is disabled.
+        tracer (QueryTracer or None): Query instrumentation, or None if tracing is disabled.
         """
-    def __init__(self, db_name='habit_tracker.db'):
-        """Initializes the database manager and creates tables if not present.
+    def __init__(self, db_name='habit_tracker.db', concurrent=False, pool_size=4, busy_timeout=5000,
+                 synchronous='NORMAL', cache=True, tracer=None):
+        """Initializes the database manager and creates or migrates the tables if the schema version changed.
 
         Args:
             db_name (str): Name of the SQLite database file.
+            concurrent (bool): If True, enables WAL journaling and a pool of reader connections.
+            pool_size (int): Maximum number of reader connections kept open in concurrent mode.
+            busy_timeout (int): Milliseconds to wait for a lock held by another connection before failing.
+            synchronous (str): `PRAGMA synchronous` level used in concurrent mode (OFF, NORMAL, FULL or EXTRA).
+            cache (bool): If True, habit records are served from a session cache that is patched on writes.
+            tracer (QueryTracer): Optional tracer that records every query, commit and method call.
             """
         root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-        db_path = os.path.join(root_path, db_name)
-        self.is_conn = sqlite3.connect(db_path)
+        self.db_path = os.path.join(root_path, db_name)
+        self.concurrent = concurrent
+        self.pool_size = pool_size
+        self.busy_timeout = busy_timeout
+        self.synchronous = synchronous
+
+        self._write_lock = threading.RLock()
+        self._transaction_depth = 0
+        self._readers = queue.LifoQueue()
+        self._reader_count = 0
+        self._reader_lock = threading.Lock()
+        self.cache = HabitCache() if cache else None
+        self._cache_valid = False
+        self._changed_habit_ids = set()
+        self._prefix_sums = None
+        self._prefix_sums_key = None
+        self.tracer = tracer
+        if tracer is not None:
+            self._trace_methods()
+
+        self.is_conn = self._connect()
         self.cursor = self.is_conn.cursor()
-        self.create_tables()
+        if concurrent:
+            self.cursor.execute('PRAGMA journal_mode = WAL')
+        if self.cursor.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            self.create_tables()
+
+    def _connect(self, read_only=False):
+        """Opens a new connection to the database file configured for the current mode.
+
+        Args:
+            read_only (bool): If True, the connection refuses any write statement.
+
+        Returns:
+            sqlite3.Connection: The new connection.
+        """
+        if self.tracer is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=not self.concurrent)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=not self.concurrent, factory=TracedConnection)
+            conn.tracer = self.tracer
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout)}')
+        if self.concurrent:
+            conn.execute(f'PRAGMA synchronous = {self.synchronous}')
+        if read_only:
+            conn.execute('PRAGMA query_only = 1')
+        return conn
+
+    def _trace_methods(self):
+        """Replaces the public methods of this instance with wrappers that report their calls to the tracer.
+
+        Generator-based methods, such as the context managers and streaming reads, are left as they are.
+        """
+        for name, func in inspect.getmembers(type(self), inspect.isfunction):
+            if not name.startswith('_') and not inspect.isgeneratorfunction(inspect.unwrap(func)):
+                setattr(self, name, self.tracer.wrap_method(name, getattr(self, name)))
+
+    @contextmanager
+    def reader(self):
+        """Borrows a connection for read-only queries.
+
+        In concurrent mode a pooled reader connection is handed out, opening a new one while fewer than
+        `pool_size` exist and otherwise waiting for one to be returned. In the default mode the shared
+        connection is used.
+
+        Yields:
+            sqlite3.Connection: A connection to run read queries on.
+        """
+        if not self.concurrent:
+            yield self.is_conn
+            return
+
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._reader_lock:
+                can_open = self._reader_count < self.pool_size
+                if can_open:
+                    self._reader_count += 1
+            conn = self._connect(read_only=True) if can_open else self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Runs a block of writes on the writer connection as a single transaction.
+
+        The transaction is committed when the block finishes and rolled back if it raises. Nested blocks join the
+        outermost transaction, so only one commit happens. Writes made through the yielded cursor aren't
+        tracked habit by habit, so the session cache is cleared when the transaction commits.
+
+        Yields:
+            sqlite3.Cursor: The writer cursor.
+        """
+        with self._transaction() as cursor:
+            self._cache_valid = False
+            yield cursor
+
+    @contextmanager
+    def _transaction(self):
+        """Runs the writes of a DBManager method as a single transaction, like `transaction`.
+
+        The methods add the IDs of the habits they write to `_changed_habit_ids`, so on commit only the cached
+        records of those habits are patched.
+
+        Yields:
+            sqlite3.Cursor: The writer cursor.
+        """
+        with self._write_lock:
+            if self._transaction_depth == 0:
+                self._cache_valid = self.cache is not None and self.cache.is_valid(self._cache_token())
+                self._changed_habit_ids = set()
+                if not self.is_conn.in_transaction:
+                    self.cursor.execute('BEGIN IMMEDIATE')
+            self._transaction_depth += 1
+            try:
+                yield self.cursor
+            except BaseException:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self.is_conn.rollback()
+                    if self.cache is not None:
+                        self.cache.clear()
+                raise
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self.is_conn.commit()
+                self._update_cache()
+
+    # Habit cache
+    def _cache_token(self):
+        """Describes the current database state for cache validation.
+
+        `PRAGMA data_version` changes when another connection commits, and `total_changes` changes with every
+        row written on this connection.
+        """
+        return self.is_conn.execute('PRAGMA data_version').fetchone()[0], self.is_conn.total_changes
+
+    def _update_cache(self):
+        """Patches the cached records of the habits written by the finished transaction.
+
+        If the cache was already stale when the transaction began, it is cleared instead.
+        """
+        if self.cache is None:
+            return
+        if not self._cache_valid:
+            self.cache.clear()
+            return
+        habit_ids = list(self._changed_habit_ids)
+        records = []
+        cursor = self.is_conn.cursor()
+        cursor.row_factory = habit_record_factory
+        for start in range(0, len(habit_ids), 500):
+            chunk = habit_ids[start:start + 500]
+            cursor.execute(f'SELECT * FROM habits WHERE id IN ({", ".join("?" * len(chunk))})', chunk)
+            records.extend(cursor.fetchall())
+        self.cache.patch(habit_ids, records, self._cache_token())
+
+    def _cached_habits(self):
+        """Returns the habit cache after making sure it is loaded and current, or None if it can't be used."""
+        if self.cache is None or self.is_conn.in_transaction:
+            return None
+        with self._write_lock:
+            token = self._cache_token()
+            if not self.cache.is_valid(token):
+                self.cache.load(self._fetchall('SELECT * FROM habits ORDER BY id', row_factory=habit_record_factory), token)
+        return self.cache
+
+    def _fetchall(self, sql, params=(), row_factory=None):
+        """Runs a read query and returns all rows, built by `row_factory` if given."""
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = row_factory
+            return cursor.execute(sql, params).fetchall()
+
+    def _fetchone(self, sql, params=(), row_factory=None):
+        """Runs a read query and returns the first row built by `row_factory` if given, or None."""
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = row_factory
+            return cursor.execute(sql, params).fetchone()
 
     def create_tables(self):
         """Creates the tables if they don't already exist for habits and completions to track habits and streaks.
+
+        Only called on construction when `PRAGMA user_version` differs from SCHEMA_VERSION, so opening an
+        up-to-date database runs no DDL at all. A new database is created with incremental auto-vacuum, so
+        `compact_history` can return freed pages to the file system without rewriting the whole file.
         """
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS habits (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                habit_period TEXT NOT NULL,
-                habit_type TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                last_completed_at TEXT,
-                current_streak INTEGER DEFAULT 0,
-                longest_streak INTEGER DEFAULT 0,
-                is_active INTEGER DEFAULT 1
-            );
-        ''')
+        if self.cursor.execute('SELECT 1 FROM sqlite_master LIMIT 1').fetchone() is None:
+            # Switching to WAL already wrote the file header, so the empty file is vacuumed to apply the mode.
+            self.cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            self.cursor.execute('VACUUM')
+        with self._transaction():
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS habits (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    habit_period TEXT NOT NULL,
+                    habit_type TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    last_completed_at TEXT,
+                    current_streak INTEGER DEFAULT 0,
+                    longest_streak INTEGER DEFAULT 0,
+                    is_active INTEGER DEFAULT 1
+                );
+            ''')
 
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS completions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                habit_id INTEGER NOT NULL,
-                completed_at TEXT NOT NULL,
-                FOREIGN KEY (habit_id) REFERENCES habits(id) ON DELETE CASCADE
-            );
-        ''')
-        self.is_conn.commit()
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS completions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    habit_id INTEGER NOT NULL,
+                    completed_at TEXT NOT NULL,
+                    period_key INTEGER,
+                    FOREIGN KEY (habit_id) REFERENCES habits(id) ON DELETE CASCADE
+                );
+            ''')
+
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS completion_rollups (
+                    habit_id INTEGER NOT NULL,
+                    granularity TEXT NOT NULL,
+                    period_start TEXT NOT NULL,
+                    completions INTEGER NOT NULL,
+                    PRIMARY KEY (habit_id, granularity, period_start)
+                ) WITHOUT ROWID;
+            ''')
+
+            # Cold storage: the compressed completion history of every archived habit, one row per habit.
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS archived_completions (
+                    habit_id INTEGER PRIMARY KEY,
+                    completions INTEGER NOT NULL,
+                    history BLOB NOT NULL
+                );
+            ''')
+
+            # Habits whose completions before `compacted_before`, a Monday, only remain in the rollups.
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS compacted_history (
+                    habit_id INTEGER PRIMARY KEY,
+                    compacted_before TEXT NOT NULL,
+                    completions INTEGER NOT NULL
+                );
+            ''')
+
+            # Number of rows of each import source written so far, so `importer.import_file` can resume.
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS import_checkpoints (
+                    source TEXT PRIMARY KEY,
+                    rows_done INTEGER NOT NULL
+                );
+            ''')
+            self.migrate_schema()
+
+            self.cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_completions_habit_completed_at
+                ON completions (habit_id, completed_at)
+            ''')
+            # At most one completion per habit and period; also serves streak rebuilds in period order.
+            self.cursor.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_completions_habit_period ON completions (habit_id, period_key)
+            ''')
+            # Keeps the active habits in id order, so listing them needs neither a table scan nor a sort.
+            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_habits_active ON habits (is_active)')
+            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_habits_active_period ON habits (is_active, habit_period)')
+            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_habits_active_type ON habits (is_active, habit_type)')
+            self.cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_habits_active_longest_streak ON habits (is_active, longest_streak)
+            ''')
+            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_habits_name_nocase ON habits (name COLLATE NOCASE)')
+
+    def migrate_schema(self):
+        """Upgrades an existing database to the current schema version tracked in `PRAGMA user_version`.
+
+        Version 1 rewrites all stored timestamps from the legacy "%b %d, %Y at %H:%M" format to ISO-8601,
+        which sorts chronologically and can be used in index range scans. Version 2 fills the completion
+        rollup table from the existing completions. Version 3 only adds `idx_habits_active`, which
+        `create_tables` creates. Version 4 adds the `period_key` column and gives it to the earliest completion
+        of every habit and period, so `create_tables` can add the unique index over it; the streaks are then
+        rebuilt with every period counted once. Version 5 moves the completions of
+        archived habits into cold storage. Versions 6 and 7 only add the `compacted_history` and
+        `import_checkpoints` tables.
+        """
+        version = self.cursor.execute('PRAGMA user_version').fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+
+        if version < 1:
+            self._migrate_legacy_timestamps('habits', 'created_at')
+            self._migrate_legacy_timestamps('habits', 'last_completed_at')
+            self._migrate_legacy_timestamps('completions', 'completed_at')
+        if version < 2:
+            self.rebuild_rollups()
+        if version < 4:
+            columns = [row[1] for row in self.cursor.execute('PRAGMA table_info(completions)')]
+            if 'period_key' not in columns:
+                self.cursor.execute('ALTER TABLE completions ADD COLUMN period_key INTEGER')
+            self._rekey_completions(self.cursor)
+            self._recompute_streaks(self.cursor, dict(self.cursor.execute('SELECT id, habit_period FROM habits')))
+        if version < 5:
+            self.move_archived_to_cold_storage()
+
+        self.cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def _migrate_legacy_timestamps(self, table, column):
+        """Converts the legacy formatted timestamps of one column to ISO-8601.
+
+        Args:
+            table (str): Name of the table to migrate.
+            column (str): Name of the timestamp column.
+        """
+        self.cursor.execute(f"SELECT id, {column} FROM {table} WHERE {column} NOT LIKE '____-__-__%'")
+        updates = []
+        for row_id, value in self.cursor.fetchall():
+            try:
+                converted = datetime.strptime(value, LEGACY_TIMESTAMP_FORMAT).strftime(TIMESTAMP_FORMAT)
+            except (TypeError, ValueError):
+                continue
+            updates.append((converted, row_id))
+        self.cursor.executemany(f'UPDATE {table} SET {column} = ? WHERE id = ?', updates)
+
+    def _rekey_completions(self, cursor, habit_id=None):
+        """Recomputes the period keys of completions for the current period of their habit.
+
+        Only the earliest completion of each habit and period gets the key. Later completions in the same
+        period keep their row with a NULL key, so they stay in the history and rollups, count once toward
+        streaks, and get their own key back if the habit's period changes again.
+
+        Args:
+            cursor (sqlite3.Cursor): Writer cursor of the surrounding transaction.
+            habit_id (int): Optional habit whose completions are rekeyed, defaults to all completions.
+        """
+        where, params = ('WHERE habit_id = ?', (habit_id,)) if habit_id is not None else ('', ())
+        habit_period = '(SELECT habit_period FROM habits WHERE habits.id = completions.habit_id)'
+        key = _period_key_sql(_day_ordinal_sql('completed_at'), habit_period)
+        # The old keys are cleared first, so the unique index never sees a new key that is still in use.
+        cursor.execute(f'UPDATE completions SET period_key = NULL {where}', params)
+        cursor.execute(f'''
+            UPDATE completions SET period_key = {key} WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (PARTITION BY habit_id, {key} ORDER BY completed_at, id) AS n
+                    FROM completions {where}
+                ) WHERE n = 1
+            )
+        ''', params)
 
     # Habit CRUD methods
     def insert_habit_info(self, habit: Habit):
@@ -59,37 +425,81 @@ class DBManager:
         Args:
             habit (Habit): The Habit object containing habit details.
         """
-        self.cursor.execute('''
-            INSERT INTO habits (name, habit_period, habit_type, created_at, last_completed_at, current_streak, longest_streak, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (habit.name, habit.habit_period.value, habit.habit_type.value, habit.created_at, habit.last_completed_at,
-              habit.current_streak, habit.longest_streak, int(habit.is_active)))
-        self.is_conn.commit()
+        self.insert_habits([habit])
+
+    def insert_habits(self, habits):
+        """Inserts many habits in a single transaction.
+
+        Habits with an `id` keep it, all others get the next free ID.
+
+        Args:
+            habits (iterable): Habit objects containing the habit details.
+
+        Returns:
+            list: The IDs of the inserted habits, in input order.
+        """
+        habit_ids = []
+        with self._transaction() as cursor:
+            for habit in habits:
+                cursor.execute('''
+                    INSERT INTO habits (id, name, habit_period, habit_type, created_at, last_completed_at, current_streak, longest_streak, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (habit.id, habit.name, habit.habit_period.value, habit.habit_type.value, habit.created_at,
+                      habit.last_completed_at, habit.current_streak, habit.longest_streak, int(habit.is_active)))
+                habit_ids.append(cursor.lastrowid)
+            self._changed_habit_ids.update(habit_ids)
+        return habit_ids
 
     def change_habit_info(self, habit_id, new_name, new_habit_period, new_habit_type):
         """Updates a habit's name, period, and type.
 
+        When the period changes, the completions are regrouped into the new periods with `_rekey_completions`
+        and the streaks of the habit are rebuilt. No completion is deleted, so changing the period back
+        restores the previous streaks.
+
         Args:
             habit_id(int): The ID of the habit to update.
             new_name(str): The updated name for the habit.
             new_habit_period (HabitPeriod): The updated frequency/period for the habit.
             new_habit_type (HabitType): The updated type for the habit.
         """
-        self.cursor.execute('''
-            UPDATE habits SET name = ?, habit_period = ?, habit_type = ?
-            WHERE id = ?
-        ''', (new_name, new_habit_period.value, new_habit_type.value, habit_id))
-        self.is_conn.commit()
+        with self._transaction() as cursor:
+            row = cursor.execute('SELECT habit_period FROM habits WHERE id = ?', (habit_id,)).fetchone()
+            cursor.execute('''
+                UPDATE habits SET name = ?, habit_period = ?, habit_type = ?
+                WHERE id = ?
+            ''', (new_name, new_habit_period.value, new_habit_type.value, habit_id))
+            if row and row[0] != new_habit_period.value:
+                self._rekey_completions(cursor, habit_id)
+                self._recompute_streaks(cursor, {habit_id: new_habit_period.value})
+            self._changed_habit_ids.add(habit_id)
 
     def archive_habit_info(self, habit_id: int):
-        """Archives a habit by marking it as inactive.
+        """Archives a habit by marking it as inactive and moving its completions into cold storage.
 
         Args:
             habit_id(int): The ID of the habit to archive.
         """
-        self.cursor.execute('''
-            UPDATE habits SET is_active = 0 WHERE id = ?
-        ''', (habit_id,))
-        self.is_conn.commit()
+        with self._transaction() as cursor:
+            cursor.execute('''
+                UPDATE habits SET is_active = 0 WHERE id = ?
+            ''', (habit_id,))
+            self._freeze_history(cursor, habit_id)
+            self._changed_habit_ids.add(habit_id)
+
+    def unarchive_habit_info(self, habit_id: int):
+        """Makes an archived habit active again and moves its completions back from cold storage.
+
+        The streaks are then rebuilt from the restored history, since a period missed while the habit was
+        archived breaks its current streak.
+
+        Args:
+            habit_id(int): The ID of the habit to restore.
+        """
+        with self._transaction() as cursor:
+            cursor.execute('UPDATE habits SET is_active = 1 WHERE id = ?', (habit_id,))
+            self._thaw_history(cursor, habit_id)
+            self._recompute_streaks(cursor, self._fetch_habit_periods(cursor, [habit_id]))
+            self._changed_habit_ids.add(habit_id)
 
     def delete_habit_info(self, habit_id: int):
         """Deletes a habit from the database.
@@ -98,13 +508,186 @@ class DBManager:
             habit_id(int): The ID of the habit to delete.
         """
         try:
-            self.cursor.execute('''
-                DELETE FROM habits WHERE id = ?
-            ''', (habit_id,))
-            self.is_conn.commit()
+            with self._transaction() as cursor:
+                cursor.execute('''
+                    DELETE FROM habits WHERE id = ?
+                ''', (habit_id,))
+                cursor.execute('DELETE FROM completion_rollups WHERE habit_id = ?', (habit_id,))
+                cursor.execute('DELETE FROM archived_completions WHERE habit_id = ?', (habit_id,))
+                cursor.execute('DELETE FROM compacted_history WHERE habit_id = ?', (habit_id,))
+                self._changed_habit_ids.add(habit_id)
         except sqlite3.Error as e:
             print(f"Failed to delete habit {habit_id}: {e}")
 
+    # Cold storage
+    def _freeze_history(self, cursor, habit_id):
+        """Moves the completions of a habit from the completions table into its compressed cold storage row.
+
+        Completions already in cold storage, e.g. from an earlier archival, are merged with the moved ones.
+        The rollups are left in place, so heatmaps and completion counts still cover archived habits.
+
+        Args:
+            cursor (sqlite3.Cursor): Writer cursor of the surrounding transaction.
+            habit_id (int): The ID of the habit.
+
+        Returns:
+            int: The number of completions moved.
+        """
+        rows = cursor.execute('SELECT id, completed_at FROM completions WHERE habit_id = ? ORDER BY id',
+                              (habit_id,)).fetchall()
+        if not rows:
+            return 0
+        frozen = cursor.execute('SELECT history FROM archived_completions WHERE habit_id = ?', (habit_id,)).fetchone()
+        history = sorted(unpack_history(frozen[0]) + rows) if frozen else rows
+        cursor.execute('''
+            INSERT INTO archived_completions (habit_id, completions, history) VALUES (?, ?, ?)
+            ON CONFLICT (habit_id) DO UPDATE SET completions = excluded.completions, history = excluded.history
+        ''', (habit_id, len(history), pack_history(history)))
+        cursor.execute('DELETE FROM completions WHERE habit_id = ?', (habit_id,))
+        return len(rows)
+
+    def _thaw_history(self, cursor, habit_id):
+        """Moves the completions of a habit from cold storage back into the completions table.
+
+        The period keys of the habit are then recomputed with `_rekey_completions`, so a restored completion in
+        a period that was completed again in the meantime is kept without a key instead of being dropped.
+
+        Args:
+            cursor (sqlite3.Cursor): Writer cursor of the surrounding transaction.
+            habit_id (int): The ID of the habit.
+        """
+        frozen = cursor.execute('SELECT history FROM archived_completions WHERE habit_id = ?', (habit_id,)).fetchone()
+        if frozen is None:
+            return
+        cursor.executemany('INSERT INTO completions (id, habit_id, completed_at) VALUES (?, ?, ?)',
+                           [(completion_id, habit_id, completed_at)
+                            for completion_id, completed_at in unpack_history(frozen[0])])
+        self._rekey_completions(cursor, habit_id)
+        cursor.execute('DELETE FROM archived_completions WHERE habit_id = ?', (habit_id,))
+
+    def _frozen_timestamps(self, cursor, habit_id):
+        """Gets the completion timestamps of a habit that are in cold storage.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor to read from.
+            habit_id (int): The ID of the habit.
+
+        Returns:
+            list: ISO-8601 timestamps in chronological order, empty if the habit has no cold storage row.
+        """
+        frozen = cursor.execute('SELECT history FROM archived_completions WHERE habit_id = ?', (habit_id,)).fetchone()
+        return sorted(completed_at for _, completed_at in unpack_history(frozen[0])) if frozen else []
+
+    def move_archived_to_cold_storage(self):
+        """Moves the completions of every archived habit that are still in the completions table into cold storage.
+
+        `archive_habit_info` does this for a single habit; this catches habits archived by other means, such as
+        bulk loads or older versions of the schema. The streaks of the moved habits are rebuilt from their merged
+        history, since `verify_streaks` leaves habits in cold storage alone.
+
+        Returns:
+            int: The number of habits whose completions were moved.
+        """
+        with self._transaction() as cursor:
+            habit_ids = [row[0] for row in cursor.execute('''
+                SELECT id FROM habits h WHERE is_active = 0 AND EXISTS (SELECT 1 FROM completions WHERE habit_id = h.id)
+            ''').fetchall()]
+            for habit_id in habit_ids:
+                self._freeze_history(cursor, habit_id)
+            self._recompute_streaks(cursor, self._fetch_habit_periods(cursor, habit_ids))
+            self._changed_habit_ids.update(habit_ids)
+        return len(habit_ids)
+
+    # History compaction
+    def _plan_compaction(self, conn, cutoff):
+        """Finds the completions `compact_history` would remove and estimates the space they take.
+
+        Args:
+            conn (sqlite3.Connection or sqlite3.Cursor): Connection or cursor to read from.
+            cutoff (str): The Monday before which completions are compacted, as YYYY-MM-DD.
+
+        Returns:
+            tuple: A list of (habit_id, boundary, rows) tuples of the habits with completions to compact, and the
+            estimated number of bytes a completion takes in the table and its indexes.
+        """
+        bounds = conn.execute('''
+            SELECT habit_id, MIN(?, date(MAX(completed_at), 'weekday 0', '-6 days')) FROM completions
+            WHERE habit_id IN (SELECT id FROM habits) GROUP BY habit_id
+        ''', (cutoff,)).fetchall()
+        plan = []
+        for habit_id, boundary in bounds:
+            rows = conn.execute('SELECT COUNT(*) FROM completions WHERE habit_id = ? AND completed_at < ?',
+                                (habit_id, boundary)).fetchone()[0]
+            if rows:
+                plan.append((habit_id, boundary, rows))
+
+        total_rows = conn.execute('SELECT COUNT(*) FROM completions').fetchone()[0]
+        try:
+            total_bytes = conn.execute('''
+                SELECT SUM(pgsize) FROM dbstat WHERE name IN
+                    ('completions', 'idx_completions_habit_completed_at', 'idx_completions_habit_period')
+            ''').fetchone()[0] or 0
+        except sqlite3.OperationalError:
+            # SQLite built without the dbstat table: a row with its two index entries takes about 80 bytes.
+            total_bytes = total_rows * 80
+        return plan, total_bytes / total_rows if total_rows else 0
+
+    def compact_history(self, horizon_days=365, dry_run=False, today=None):
+        """Removes the completions older than a horizon, keeping only their per-day and per-week rollups.
+
+        The cutoff is the Monday on or before `today - horizon_days`, and each habit keeps at least the week of
+        its latest completion, so `last_completed_at` and the period of the next completion stay answerable
+        from the completions table. The days of the removed completions remain in the daily rollups, from
+        which streaks are rebuilt, so streaks, heatmaps and rolling rates are unchanged.
+
+        The freed pages are then returned to the file system with an incremental vacuum. A database created
+        before incremental auto-vacuum was the default is converted with one full VACUUM first.
+
+        Args:
+            horizon_days (int): Number of days of completions to keep.
+            dry_run (bool): If True, only reports what would be removed.
+            today (date): Day the horizon is counted back from, defaults to the current date.
+
+        Returns:
+            dict: A report with the `cutoff` date, the number of `habits` and completion `rows` compacted, the
+            estimated `bytes` they take, and the `reclaimed_bytes` by which the file shrank (0 for a dry run).
+        """
+        cutoff = (today or date.today()) - timedelta(days=horizon_days)
+        cutoff = (cutoff - timedelta(days=cutoff.weekday())).isoformat()
+        if dry_run:
+            with self.reader() as conn:
+                plan, row_bytes = self._plan_compaction(conn, cutoff)
+        else:
+            with self._transaction() as cursor:
+                plan, row_bytes = self._plan_compaction(cursor, cutoff)
+                cursor.executemany('DELETE FROM completions WHERE habit_id = ? AND completed_at < ?',
+                                   [(habit_id, boundary) for habit_id, boundary, _ in plan])
+                cursor.executemany('''
+                    INSERT INTO compacted_history (habit_id, compacted_before, completions) VALUES (?, ?, ?)
+                    ON CONFLICT (habit_id) DO UPDATE SET
+                        compacted_before = MAX(compacted_before, excluded.compacted_before),
+                        completions = completions + excluded.completions
+                ''', plan)
+
+        rows = sum(count for _, _, count in plan)
+        report = {"cutoff": cutoff, "habits": len(plan), "rows": rows, "bytes": round(rows * row_bytes),
+                  "reclaimed_bytes": 0}
+        if not dry_run:
+            report["reclaimed_bytes"] = self._reclaim_space()
+        return report
+
+    def _reclaim_space(self):
+        """Returns free pages to the file system and returns the number of bytes the file shrank by."""
+        with self._write_lock:
+            page_size = self.cursor.execute('PRAGMA page_size').fetchone()[0]
+            pages = self.cursor.execute('PRAGMA page_count').fetchone()[0]
+            if self.cursor.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                self.cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                self.cursor.execute('VACUUM')
+            else:
+                self.cursor.execute('PRAGMA incremental_vacuum').fetchall()
+            return (pages - self.cursor.execute('PRAGMA page_count').fetchone()[0]) * page_size
+
     def fetch_all_habits(self, include_archived=False):
         """Fetches all habits from the database.
 
@@ -112,19 +695,28 @@ class DBManager:
             include_archived (bool): If True, includes archived habits.
 
         Returns:
-            list: A list of habit records.
+            list: A list of HabitRecord objects.
         """
+        cache = self._cached_habits()
+        if cache is not None:
+            # Writes patch the cache while holding the write lock, so the snapshot is taken under it too.
+            with self._write_lock:
+                if include_archived:
+                    return list(cache.habits.values())
+                return [h for h in cache.habits.values() if h.is_active == 1]
+
         if include_archived:
-            self.cursor.execute('SELECT * FROM habits')
-        else:
-            self.cursor.execute('SELECT * FROM habits WHERE is_active = 1')
-        rows = self.cursor.fetchall()
-        return rows
+            return self._fetchall('SELECT * FROM habits ORDER BY id', row_factory=habit_record_factory)
+        return self._fetchall('SELECT * FROM habits WHERE is_active = 1 ORDER BY id', row_factory=habit_record_factory)
     
     # Habit tracking methods
     def insert_habit_completion(self, habit_id: int):
         """Marks a habit as completed and updates streaks in the database.
 
+        A habit is completed at most once per period: the insert is an upsert on the (habit_id, period_key)
+        unique index, so completing it again in the same day or week changes nothing. The streak continues
+        when the previous completion's period key is exactly one lower.
+
         Args:
             habit_id(int): The habit to be completed and its streak to be updated.
 
@@ -132,100 +724,423 @@ class DBManager:
             dict or None: a dictionary with streak info:
                 - "new_streak" (int): Updated streak count.
                 - "streak_broken" (bool): True if streak was broken.
+                - "already_completed" (bool): True if the habit was already completed in this period, in
+                  which case nothing was recorded and "new_streak" is the unchanged current streak.
             Returns None if the habit is not found.
         """
         now = datetime.now()
-        now_str = now.strftime("%b %d, %Y at %H:%M")
+        now_str = now.strftime(TIMESTAMP_FORMAT)
 
-        self.cursor.execute(
-            'SELECT last_completed_at, habit_period, current_streak, longest_streak FROM habits WHERE id = ?',
-            (habit_id,))
-        row = self.cursor.fetchone()
+        with self._transaction() as cursor:
+            cursor.execute(
+                'SELECT last_completed_at, habit_period, current_streak, longest_streak FROM habits WHERE id = ?',
+                (habit_id,))
+            row = cursor.fetchone()
 
-        if not row:
-            print("Habit not found.")
-            return
+            if not row:
+                print("Habit not found.")
+                return
 
-        last_completed_at, habit_period, current_streak, longest_streak = row
-        new_streak = 1
-        streak_broken = False
+            last_completed_at, habit_period, current_streak, longest_streak = row
+            key = period_key(now.toordinal(), habit_period)
+            cursor.execute('''
+                INSERT INTO completions (habit_id, completed_at, period_key) VALUES (?, ?, ?)
+                ON CONFLICT (habit_id, period_key) DO NOTHING
+            ''', (habit_id, now_str, key))
+            if cursor.rowcount == 0:
+                return {
+                    "new_streak": current_streak,
+                    "streak_broken": False,
+                    "already_completed": True
+                }
+            self._update_rollups(cursor, 'id = ?', (cursor.lastrowid,))
 
-        if last_completed_at:
-            try:
-                last_time = datetime.strptime(last_completed_at, "%b %d, %Y at %H:%M")
-                delta_days = (now - last_time).days
+            new_streak = 1
+            streak_broken = False
 
-                if habit_period == "DAILY":
-                    if delta_days == 1:
+            if last_completed_at:
+                try:
+                    last_key = period_key(datetime.fromisoformat(last_completed_at).toordinal(), habit_period)
+                    if last_key == key - 1:
                         new_streak = current_streak + 1
-                    elif delta_days > 1:
+                    elif last_key < key - 1:
                         streak_broken = True
-
-                elif habit_period == "WEEKLY":
-                    if 1 <= delta_days <= 7:
-                        new_streak = current_streak + 1
                     else:
-                        streak_broken = True
-
-            except ValueError:
-                print("Could not parse last completed date.")
+                        # Completed this period without a logged completion, e.g. after a period change.
+                        new_streak = max(current_streak, 1)
 
-        new_longest = max(longest_streak, new_streak)
+                except ValueError:
+                    print("Could not parse last completed date.")
 
-        self.cursor.execute('''
-            INSERT INTO completions (habit_id, completed_at) VALUES (?, ?)
-        ''', (habit_id, now_str))
+            new_longest = max(longest_streak, new_streak)
 
-        self.cursor.execute('''
-            UPDATE habits SET last_completed_at = ?, current_streak = ?, longest_streak = ?
-            WHERE id = ?
-        ''', (now_str, new_streak, new_longest, habit_id))
-
-        self.is_conn.commit()
+            cursor.execute('''
+                UPDATE habits SET last_completed_at = ?, current_streak = ?, longest_streak = ?
+                WHERE id = ?
+            ''', (now_str, new_streak, new_longest, habit_id))
+            self._changed_habit_ids.add(habit_id)
 
         return {
             "new_streak" : new_streak,
-            "streak_broken" : streak_broken
+            "streak_broken" : streak_broken,
+            "already_completed": False
         }
 
-    def is_habit_completed(self, habit):
-        """Checks whether a habit has already been completed today or this week.
+    def insert_habit_completions(self, completions, recompute_streaks=True):
+        """Inserts many completions at once and recomputes the streaks of the affected habits.
+
+        All rows are written with a single `executemany` in one transaction. Afterwards the streak values of
+        every affected habit are rebuilt once from its completion history, instead of once per completion.
+        Completions for habits that don't exist are skipped, as are completions in a period that already has
+        one, so importing the same history twice is harmless. Completions before a habit's compaction boundary
+        are skipped too, since those days only remain as rollup totals that already count them or not.
+
+        Args:
+            completions (iterable): (habit_id, timestamp) pairs, where timestamp is a datetime or an ISO-8601 string.
+            recompute_streaks (bool): If False, the streaks are left untouched, e.g. when a bulk import rebuilds
+                them once with `verify_streaks` after its last batch.
+
+        Returns:
+            dict: Maps each affected habit ID to a dictionary with streak info, or to None if the streaks were
+            not recomputed:
+                - "current_streak" (int): Recomputed current streak.
+                - "longest_streak" (int): Recomputed longest streak.
+                - "last_completed_at" (str): Timestamp of the latest completion.
+        """
+        rows = [(habit_id, _format_timestamp(timestamp)) for habit_id, timestamp in completions]
+        if not rows:
+            return {}
+
+        with self._transaction() as cursor:
+            habit_periods = self._fetch_habit_periods(cursor, {habit_id for habit_id, _ in rows})
+            compacted = self._fetch_compaction_boundaries(cursor, habit_periods)
+            rows = [(habit_id, timestamp,
+                     period_key(datetime.fromisoformat(timestamp).toordinal(), habit_periods[habit_id]))
+                    for habit_id, timestamp in rows
+                    if habit_id in habit_periods and timestamp >= compacted.get(habit_id, '')]
+            last_id = cursor.execute('SELECT COALESCE(MAX(id), 0) FROM completions').fetchone()[0]
+            cursor.executemany('''
+                INSERT INTO completions (habit_id, completed_at, period_key) VALUES (?, ?, ?)
+                ON CONFLICT (habit_id, period_key) DO NOTHING
+            ''', rows)
+            new_last_id = cursor.execute('SELECT COALESCE(MAX(id), 0) FROM completions').fetchone()[0]
+            # With an open-ended `id > ?` the planner prefers scanning the whole (habit_id, completed_at) index
+            # for the GROUP BY; a closed range makes it seek the new rows by rowid instead.
+            self._update_rollups(cursor, 'id BETWEEN ? AND ?', (last_id + 1, new_last_id))
+            if not recompute_streaks:
+                return {habit_id: None for habit_id, _, _ in rows}
+            return self._recompute_streaks(cursor, habit_periods)
+
+    # Completion rollups
+    def _update_rollups(self, cursor, where, params=()):
+        """Adds the completions matching a WHERE clause to the per-day and per-week rollup rows.
+
+        Args:
+            cursor (sqlite3.Cursor): Writer cursor of the surrounding transaction.
+            where (str): SQL condition selecting the completions to add.
+            params (tuple): Parameters bound to the condition.
+        """
+        for granularity, bucket in ROLLUP_BUCKETS.items():
+            cursor.execute(f'''
+                INSERT INTO completion_rollups (habit_id, granularity, period_start, completions)
+                SELECT habit_id, '{granularity}', {bucket}, COUNT(*) FROM completions
+                WHERE {where} GROUP BY habit_id, {bucket}
+                ON CONFLICT (habit_id, granularity, period_start)
+                DO UPDATE SET completions = completions + excluded.completions
+            ''', params)
+
+    def _reset_rollups(self, cursor, habit_id=None):
+        """Recomputes the rollups of one or all habits from their completions.
+
+        Rollups before a habit's compaction boundary are kept, since they are all that remains of the
+        compacted completions. The boundary is a Monday, so no day or week bucket spans both sides of it.
+        Completions in cold storage are counted too, so archived habits keep their heatmaps and rates.
+
         Args:
-            habit (tuple): A habit record from the database.
+            cursor (sqlite3.Cursor): Writer cursor of the surrounding transaction.
+            habit_id (int): Optional habit whose rollups are recomputed, defaults to every existing habit.
+        """
+        habit_filter, params = ('habit_id = ? AND ', (habit_id,)) if habit_id is not None else ('', ())
+        cursor.execute(f'''
+            DELETE FROM completion_rollups WHERE {habit_filter}period_start >= COALESCE(
+                (SELECT compacted_before FROM compacted_history WHERE habit_id = completion_rollups.habit_id), '')
+        ''', params)
+        if habit_id is None:
+            habit_filter = 'habit_id IN (SELECT id FROM habits) AND '
+        self._update_rollups(cursor, f'''{habit_filter}completed_at >= COALESCE(
+            (SELECT compacted_before FROM compacted_history WHERE habit_id = completions.habit_id), '')''', params)
+
+        if habit_id is None:
+            frozen_ids = [row[0] for row in cursor.execute(
+                'SELECT habit_id FROM archived_completions WHERE habit_id IN (SELECT id FROM habits)').fetchall()]
+        else:
+            frozen_ids = [habit_id]
+        boundaries = self._fetch_compaction_boundaries(cursor, frozen_ids)
+        # Cold storage histories are packed blobs, so their buckets are counted here, matching ROLLUP_BUCKETS.
+        for frozen_id in frozen_ids:
+            boundary = boundaries.get(frozen_id, '')
+            days = Counter(datetime.fromisoformat(completed_at).date()
+                           for completed_at in self._frozen_timestamps(cursor, frozen_id) if completed_at >= boundary)
+            weeks = Counter()
+            for day, completions in days.items():
+                weeks[day - timedelta(days=day.weekday())] += completions
+            cursor.executemany('''
+                INSERT INTO completion_rollups (habit_id, granularity, period_start, completions) VALUES (?, ?, ?, ?)
+                ON CONFLICT (habit_id, granularity, period_start)
+                DO UPDATE SET completions = completions + excluded.completions
+            ''', [(frozen_id, granularity, bucket.isoformat(), completions)
+                  for granularity, buckets in (("DAY", days), ("WEEK", weeks))
+                  for bucket, completions in buckets.items()])
+
+    def rebuild_rollups(self):
+        """Recomputes the whole completion rollup table from the completions of existing habits, hot and cold."""
+        with self._transaction() as cursor:
+            self._reset_rollups(cursor)
+
+    def fetch_completion_counts(self, habit_id, granularity="DAY", start=None, end=None):
+        """Gets the number of completions of a habit per day or week from the rollup table.
+
+        Args:
+            habit_id (int): The ID of the habit.
+            granularity (str): "DAY" or "WEEK".
+            start (str): Optional first bucket date to include, as YYYY-MM-DD.
+            end (str): Optional last bucket date to include, as YYYY-MM-DD.
+
+        Returns:
+            list: A list of (period_start, completions) tuples in chronological order. Periods without
+            completions are omitted.
+        """
+        return self._fetchall('''
+            SELECT period_start, completions FROM completion_rollups
+            WHERE habit_id = ? AND granularity = ? AND period_start BETWEEN ? AND ?
+            ORDER BY period_start
+        ''', (habit_id, granularity, start or "0000-00-00", end or "9999-99-99"))
+
+    def fetch_weekday_counts(self, habit_id, start=None, end=None):
+        """Gets the number of completions of a habit per day of the week, aggregated from the daily rollups.
+
+        Args:
+            habit_id (int): The ID of the habit.
+            start (str): Optional first date to include, as YYYY-MM-DD.
+            end (str): Optional last date to include, as YYYY-MM-DD.
+
+        Returns:
+            list: A list of (weekday, completions) tuples, where weekday 0 is Monday. Weekdays without
+            completions are omitted.
+        """
+        return self._fetchall('''
+            SELECT (CAST(strftime('%w', period_start) AS INTEGER) + 6) % 7 AS weekday, SUM(completions)
+            FROM completion_rollups
+            WHERE habit_id = ? AND granularity = 'DAY' AND period_start BETWEEN ? AND ?
+            GROUP BY weekday ORDER BY weekday
+        ''', (habit_id, start or "0000-00-00", end or "9999-99-99"))
+
+    def fetch_completion_prefix_sums(self, today=None):
+        """Gets the per-habit prefix sums of daily completions that answer rolling-window queries.
+
+        The prefix sums are built from the daily rollups in one pass over the table and kept until the
+        database changes or another day is requested, so dashboards can query any number of windows for
+        thousands of habits without reading the history again.
+
+        Args:
+            today (date): Last day covered, defaults to the current date.
+
+        Returns:
+            CompletionPrefixSums: The prefix sums of every habit.
+        """
+        today = today or date.today()
+        with self._write_lock:
+            key = (self._cache_token(), today)
+            if self._prefix_sums_key != key:
+                habits = self._fetchall(f'SELECT id, habit_period, {_day_ordinal_sql("created_at")} FROM habits')
+                rows = self._iter_rows(f'''
+                    SELECT habit_id, group_concat({_day_ordinal_sql("period_start")}), group_concat(completions)
+                    FROM completion_rollups WHERE granularity = 'DAY' GROUP BY habit_id
+                ''')
+                self._prefix_sums = CompletionPrefixSums(habits, rows, today)
+                self._prefix_sums_key = key
+            return self._prefix_sums
+
+    def _fetch_habit_periods(self, cursor, habit_ids):
+        """Looks up the period of each existing habit in `habit_ids`.
+
+        Returns:
+            dict: Maps habit ID to its period string.
+        """
+        habit_ids = list(habit_ids)
+        habit_periods = {}
+        for start in range(0, len(habit_ids), 500):
+            chunk = habit_ids[start:start + 500]
+            cursor.execute(f'SELECT id, habit_period FROM habits WHERE id IN ({", ".join("?" * len(chunk))})', chunk)
+            habit_periods.update(cursor.fetchall())
+        return habit_periods
+
+    def _fetch_compaction_boundaries(self, cursor, habit_ids):
+        """Looks up the compaction boundary of each compacted habit in `habit_ids`.
+
+        Returns:
+            dict: Maps habit ID to the date before which its completions were compacted, as YYYY-MM-DD.
+        """
+        habit_ids = list(habit_ids)
+        boundaries = {}
+        for start in range(0, len(habit_ids), 500):
+            chunk = habit_ids[start:start + 500]
+            cursor.execute(f'''
+                SELECT habit_id, compacted_before FROM compacted_history WHERE habit_id IN ({", ".join("?" * len(chunk))})
+            ''', chunk)
+            boundaries.update(cursor.fetchall())
+        return boundaries
+
+    def _recompute_streaks(self, cursor, habit_periods):
+        """Rebuilds the streak columns of the given habits from their completion history.
+
+        The days of compacted completions are taken from the daily rollups before the compaction boundary, and
+        the completions of an archived habit in cold storage are merged with those still in the completions table.
+        Like `reset_broken_streaks`, the current streak of an active habit is 0 once its period was missed.
+
+        Args:
+            cursor (sqlite3.Cursor): Writer cursor of the surrounding transaction.
+            habit_periods (dict): Maps habit ID to its period string.
+
+        Returns:
+            dict: Maps habit ID to its recomputed streak info.
+        """
+        today = date.today().toordinal()
+        results = {}
+        for habit_id, habit_period in habit_periods.items():
+            cursor.execute('SELECT completed_at FROM completions WHERE habit_id = ? ORDER BY completed_at ASC',
+                           (habit_id,))
+            timestamps = [row[0] for row in cursor.fetchall()]
+            frozen = self._frozen_timestamps(cursor, habit_id)
+            if frozen:
+                timestamps = list(heapq.merge(frozen, timestamps))
+            is_active, compacted_before = cursor.execute('''
+                SELECT h.is_active, c.compacted_before FROM habits h LEFT JOIN compacted_history c ON c.habit_id = h.id
+                WHERE h.id = ?
+            ''', (habit_id,)).fetchone()
+            if compacted_before:
+                cursor.execute('''
+                    SELECT period_start FROM completion_rollups
+                    WHERE habit_id = ? AND granularity = 'DAY' AND period_start < ? ORDER BY period_start
+                ''', (habit_id, compacted_before))
+                timestamps = list(heapq.merge((row[0] for row in cursor.fetchall()), timestamps))
+            current_streak, longest_streak, last_completed_at = compute_streaks(timestamps, habit_period)
+            if is_active and last_completed_at and is_overdue(
+                    datetime.fromisoformat(last_completed_at).toordinal(), today, habit_period):
+                current_streak = 0
+            results[habit_id] = {
+                "current_streak": current_streak,
+                "longest_streak": longest_streak,
+                "last_completed_at": last_completed_at
+            }
+
+        cursor.executemany('''
+            UPDATE habits SET current_streak = ?, longest_streak = ?, last_completed_at = ?
+            WHERE id = ?
+        ''', [(r["current_streak"], r["longest_streak"], r["last_completed_at"], habit_id)
+              for habit_id, r in results.items()])
+        self._changed_habit_ids.update(results)
+        return results
+
+    def verify_streaks(self, apply=False):
+        """Rebuilds the streaks of all habits from the completions log and compares them with the stored values.
+
+        The stored period keys are read in index order, merged with the period keys of compacted days from the
+        daily rollups, and handed to the vectorized streak engine in one pass.
+        Like `reset_broken_streaks`, the rebuilt current streak of an active habit is 0 once its period was
+        missed.
+        Completions left behind by deleted habits are ignored, and archived habits whose history is in cold
+        storage keep the streak values they were archived with.
+
+        Args:
+            apply (bool): If True, stored values that drifted are overwritten with the rebuilt ones.
+
+        Returns:
+            list: A list of (habit_id, stored, rebuilt) tuples for every habit whose stored values differ, where
+            stored and rebuilt are (current_streak, longest_streak, last_completed_at) tuples.
+        """
+        today = date.today().toordinal()
+        with self.reader() as conn:
+            habits = conn.execute('''
+                SELECT id, habit_period, is_active, current_streak, longest_streak, last_completed_at FROM habits
+            ''').fetchall()
+            last_completions = dict(conn.execute(
+                'SELECT habit_id, MAX(completed_at) FROM completions GROUP BY habit_id'))
+            frozen = {row[0] for row in conn.execute('SELECT habit_id FROM archived_completions')}
+            compacted = conn.execute(f'''
+                SELECT r.habit_id, {_period_key_sql(_day_ordinal_sql('r.period_start'), 'h.habit_period')}
+                FROM compacted_history c CROSS JOIN completion_rollups r JOIN habits h ON h.id = c.habit_id
+                WHERE r.habit_id = c.habit_id AND r.granularity = 'DAY' AND r.period_start < c.compacted_before
+                ORDER BY c.habit_id, r.period_start
+            ''')
+            streaks = compute_all_streaks(heapq.merge(conn.execute('''
+                SELECT habit_id, period_key FROM completions WHERE period_key IS NOT NULL ORDER BY habit_id, period_key
+            '''), compacted), {habit_id: 1 for habit_id, *_ in habits})
+
+        mismatches = []
+        for habit_id, habit_period, is_active, current_streak, longest_streak, last_completed_at in habits:
+            if habit_id in frozen:
+                continue
+            rebuilt_current, rebuilt_longest = streaks.get(habit_id, (0, 0))
+            rebuilt_last = last_completions.get(habit_id)
+            if is_active and rebuilt_last and is_overdue(
+                    datetime.fromisoformat(rebuilt_last).toordinal(), today, habit_period):
+                rebuilt_current = 0
+            stored = (current_streak, longest_streak, last_completed_at)
+            rebuilt = (rebuilt_current, rebuilt_longest, rebuilt_last)
+            if stored != rebuilt:
+                mismatches.append((habit_id, stored, rebuilt))
+
+        if apply and mismatches:
+            with self._transaction() as cursor:
+                cursor.executemany('''
+                    UPDATE habits SET current_streak = ?, longest_streak = ?, last_completed_at = ?
+                    WHERE id = ?
+                ''', [rebuilt + (habit_id,) for habit_id, _, rebuilt in mismatches])
+                self._changed_habit_ids.update(habit_id for habit_id, _, _ in mismatches)
+        return mismatches
+
+    def is_habit_completed(self, habit, today=None):
+        """Checks whether a habit has already been completed today or this calendar week.
+        Args:
+            habit (HabitRecord): A habit record from the database.
+            today (date): The day to check against, defaults to the current date.
 
         Returns:
             bool: True if the habit has already been completed within its period.
         """
-        last_completed_at = habit[5]
-        habit_period = habit[2]
+        last_completed_at = habit.last_completed_at
+        habit_period = habit.habit_period
 
         if not last_completed_at:
             return False
 
         try:
-            last_time = datetime.strptime(last_completed_at, "%b %d, %Y at %H:%M")
-            now = datetime.now()
-            delta_days = (now - last_time).days
-
-            if habit_period == "DAILY":
-                return delta_days == 0
-
-            elif habit_period == "WEEKLY":
-                return delta_days < 7
+            last_day = datetime.fromisoformat(last_completed_at).toordinal()
+            today = (today or date.today()).toordinal()
+            return period_key(last_day, habit_period) == period_key(today, habit_period)
 
         except Exception as e:
             print("Error parsing last_completed_at:", e)
 
         return False
 
+    def fetch_compaction_boundaries(self):
+        """Fetches the compaction boundary of every compacted habit.
+
+        Returns:
+            dict: Maps habit ID to the date before which its completions only remain in the rollups, as
+            YYYY-MM-DD.
+        """
+        return dict(self._fetchall('SELECT habit_id, compacted_before FROM compacted_history'))
+
     def fetch_habit_names(self):
         """Fetches names of active habits.
 
         Returns:
             list: A list of habit names.
         """
-        self.cursor.execute('SELECT name FROM habits WHERE is_active = 1')
-        return [row[0] for row in self.cursor.fetchall()]
+        return [row[0] for row in self._fetchall('SELECT name FROM habits WHERE is_active = 1')]
 
     def fetch_habit_by_id(self, habit_id: int):
         """Retrieves a single habit record by its ID.
@@ -234,26 +1149,127 @@ class DBManager:
             habit_id (int): The ID of the habit.
 
         Returns:
-            tuple or None: The habit record, or None if not found.
+            HabitRecord or None: The habit record, or None if not found.
         """
-        self.cursor.execute('SELECT * FROM habits WHERE id = ?', (habit_id,))
-        return self.cursor.fetchone()
+        cache = self._cached_habits()
+        if cache is not None:
+            return cache.habits.get(habit_id)
+        return self._fetchone('SELECT * FROM habits WHERE id = ?', (habit_id,), habit_record_factory)
 
     def fetch_habit_completions(self, habit_id: int):
-        """Gets all completion dates for a specific habit.
+        """Gets all completion dates for a specific habit, including those of an archived habit in cold storage.
 
         Args:
             habit_id (int): The ID of the habit.
 
         Returns:
-            list: A list of completion timestamps.
+            list: A list of completion timestamps in chronological order.
         """
-        self.cursor.execute('''
+        rows = self._fetchall('''
             SELECT completed_at FROM completions
             WHERE habit_id = ? ORDER BY completed_at ASC
         ''', (habit_id,))
-        return self.cursor.fetchall()
+        frozen = self._fetchone('SELECT history FROM archived_completions WHERE habit_id = ?', (habit_id,))
+        if frozen:
+            rows = sorted(rows + [(completed_at,) for _, completed_at in unpack_history(frozen[0])])
+        return rows
+
+    # Streaming reads
+    def _iter_rows(self, sql, params=(), batch_size=1000):
+        """Runs a read query and yields its rows, loading `batch_size` rows at a time with `fetchmany`."""
+        with self.reader() as conn:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+
+    @staticmethod
+    def _habit_filters(habit_ids=None, habit_period=None, habit_type=None):
+        """Builds the WHERE conditions and parameters that restrict a query on `habits h` to matching habits."""
+        conditions, params = [], []
+        if habit_ids:
+            habit_ids = list(habit_ids)
+            conditions.append(f'h.id IN ({", ".join("?" * len(habit_ids))})')
+            params.extend(habit_ids)
+        if habit_period:
+            conditions.append('h.habit_period = ?')
+            params.append(habit_period.upper())
+        if habit_type:
+            conditions.append('h.habit_type = ?')
+            params.append(habit_type.upper())
+        return conditions, params
 
+    def iter_habits(self, habit_ids=None, habit_period=None, habit_type=None, batch_size=1000):
+        """Streams habit records, including archived habits, in constant memory.
+
+        Args:
+            habit_ids (iterable): Optional IDs of the habits to include.
+            habit_period (str): Optional period to filter by (daily or weekly), case-insensitive.
+            habit_type (str): Optional type to filter by (positive or negative), case-insensitive.
+            batch_size (int): Number of rows loaded from SQLite at a time.
+
+        Yields:
+            HabitRecord: The matching habits ordered by ID.
+        """
+        conditions, params = self._habit_filters(habit_ids, habit_period, habit_type)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        for row in self._iter_rows(f'SELECT * FROM habits h {where} ORDER BY h.id', params, batch_size):
+            yield HabitRecord._make(row)
+
+    def iter_completions(self, habit_ids=None, habit_period=None, habit_type=None, start=None, end=None,
+                         batch_size=1000):
+        """Streams the completions log in constant memory.
+
+        The completions table is streamed first. The completions of archived habits then follow from cold
+        storage, one habit at a time, so at most one unpacked history is held in memory.
+
+        Args:
+            habit_ids (iterable): Optional IDs of the habits to include.
+            habit_period (str): Optional period of the habits to include, case-insensitive.
+            habit_type (str): Optional type of the habits to include, case-insensitive.
+            start (str): Optional first day to include, as YYYY-MM-DD.
+            end (str): Optional last day to include, as YYYY-MM-DD.
+            batch_size (int): Number of rows loaded from SQLite at a time.
+
+        Yields:
+            tuple: (id, habit_id, completed_at) rows, in the order they were recorded within the completions
+            table and within each archived habit.
+        """
+        conditions, params = self._habit_filters(habit_ids, habit_period, habit_type)
+        archived = self._iter_archived_completions(list(conditions), list(params), start, end)
+        if start:
+            conditions.append('c.completed_at >= ?')
+            params.append(start)
+        if end:
+            conditions.append("c.completed_at < date(?, '+1 day')")
+            params.append(end)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        yield from self._iter_rows(f'''
+            SELECT c.id, c.habit_id, c.completed_at FROM completions c JOIN habits h ON h.id = c.habit_id
+            {where} ORDER BY c.id
+        ''', params, batch_size)
+        yield from archived
+
+    def _iter_archived_completions(self, conditions, params, start=None, end=None):
+        """Streams the completions in cold storage of the habits matching `_habit_filters` conditions.
+
+        The history blobs are read one at a time, and each is unpacked and filtered before the next is read.
+
+        Yields:
+            tuple: (id, habit_id, completed_at) rows, by habit ID and by ID within a habit.
+        """
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        start = str(start) if start else None
+        end = str(end)[:10] if end else None
+        for habit_id, history in self._iter_rows(f'''
+            SELECT a.habit_id, a.history FROM archived_completions a JOIN habits h ON h.id = a.habit_id {where}
+            ORDER BY a.habit_id
+        ''', params, batch_size=1):
+            for completion_id, completed_at in unpack_history(history):
+                if (start is None or completed_at >= start) and (end is None or completed_at[:10] <= end):
+                    yield completion_id, habit_id, completed_at
 
     def fetch_all_streaks(self):
         """Retrieves the current streaks of all active habits.
@@ -261,51 +1277,175 @@ class DBManager:
         Returns:
             list: A list of tuples with name, habit_period, and current_streak.
         """
-        self.cursor.execute('SELECT name, habit_period, current_streak FROM habits WHERE is_active = 1')
-        return self.cursor.fetchall()
+        return self._fetchall('SELECT name, habit_period, current_streak FROM habits WHERE is_active = 1')
+
+    # Analytics queries
+    def has_active_habits(self):
+        """Checks whether at least one active habit exists.
+
+        Returns:
+            bool: True if there is an active habit.
+        """
+        return bool(self._fetchone('SELECT EXISTS (SELECT 1 FROM habits WHERE is_active = 1)')[0])
+
+    def fetch_habits_by_period(self, habit_period):
+        """Fetches the active habits with the given period.
+
+        Args:
+            habit_period (str): The period to filter by (daily or weekly), case-insensitive.
+
+        Returns:
+            list: A list of HabitRecord objects.
+        """
+        return self._fetchall('SELECT * FROM habits WHERE is_active = 1 AND habit_period = ? ORDER BY id',
+                              (habit_period.upper(),), habit_record_factory)
+
+    def fetch_habits_by_type(self, habit_type):
+        """Fetches the active habits with the given type.
+
+        Args:
+            habit_type (str): The type to filter by (positive or negative), case-insensitive.
+
+        Returns:
+            list: A list of HabitRecord objects.
+        """
+        return self._fetchall('SELECT * FROM habits WHERE is_active = 1 AND habit_type = ? ORDER BY id',
+                              (habit_type.upper(),), habit_record_factory)
+
+    def fetch_habits_with_longest_streak(self):
+        """Fetches all active habits that share the highest longest streak value.
+
+        Returns:
+            list: A list of HabitRecord objects.
+        """
+        return self._fetchall('''
+            SELECT * FROM habits WHERE is_active = 1 AND longest_streak = (
+                SELECT longest_streak FROM habits WHERE is_active = 1 ORDER BY longest_streak DESC LIMIT 1
+            ) ORDER BY id
+        ''', row_factory=habit_record_factory)
+
+    def fetch_top_streaks(self, limit):
+        """Fetches the active habits with the highest longest streak values.
+
+        Args:
+            limit (int): The maximum number of habits to return.
+
+        Returns:
+            list: A list of HabitRecord objects ordered by longest streak, highest first.
+        """
+        return self._fetchall('''
+            SELECT * FROM habits WHERE is_active = 1 ORDER BY longest_streak DESC LIMIT ?
+        ''', (limit,), habit_record_factory)
+
+    def fetch_current_streaks(self):
+        """Fetches the active habits with a running streak.
+
+        Returns:
+            list: A list of tuples in the order (name, period, current_streak).
+        """
+        return self._fetchall('''
+            SELECT name, habit_period, current_streak FROM habits WHERE is_active = 1 AND current_streak > 0 ORDER BY id
+        ''')
+
+    def fetch_habit_by_name(self, name):
+        """Fetches the first active habit with the given name, compared case-insensitively.
+
+        Args:
+            name (str): The name of the habit.
+
+        Returns:
+            HabitRecord or None: The habit record, or None if not found.
+        """
+        return self._fetchone('''
+            SELECT * FROM habits WHERE name = ? COLLATE NOCASE AND is_active = 1 ORDER BY id LIMIT 1
+        ''', (name,), habit_record_factory)
 
 
     def reset_broken_streak(self, habit):
         """Resets the streak of a missed habit.
 
         Args:
-            habit (tuple): A habit record.
+            habit (HabitRecord): A habit record.
 
         Returns:
             tuple: (bool, int) where bool indicates if the streak was reset, and int is the number of missed days.
         """
-        habit_id = habit[0]
-        last_completed_at = habit[5]
-        habit_period = habit[2]
+        habit_id = habit.id
+        last_completed_at = habit.last_completed_at
+        habit_period = habit.habit_period
 
         if not last_completed_at:
             return False, 0
 
         try:
-            last_time = datetime.strptime(last_completed_at, "%b %d, %Y at %H:%M")
-            now = datetime.now()
-            delta = (now - last_time).days
+            last_day = datetime.fromisoformat(last_completed_at).toordinal()
+            today = date.today().toordinal()
+            delta = today - last_day
 
-            if (habit_period == "DAILY" and delta > 1) or (habit_period == "WEEKLY" and delta > 7):
-                self.cursor.execute('UPDATE habits SET current_streak = 0 WHERE id = ?', (habit_id,))
-                self.is_conn.commit()
+            if is_overdue(last_day, today, habit_period):
+                with self._transaction() as cursor:
+                    cursor.execute('UPDATE habits SET current_streak = 0 WHERE id = ?', (habit_id,))
+                    self._changed_habit_ids.add(habit_id)
                 return True, delta
         except Exception as e:
             print(f"Error checking streak for habit {habit_id}: {e}")
 
         return False, 0
 
-  
-    def close_conn(self):
-        """Closes the database connection if found open."""
+    def reset_broken_streaks(self):
+        """Resets the streaks of all active habits that missed their period.
+
+        Overdue habits are found and reset with set-based statements in a single transaction, rather than
+        checking and committing each habit separately. A habit is overdue once a whole period passed
+        without a completion: a DAILY habit from the second day after its last completion and a WEEKLY habit
+        from the second calendar week after it. Habits whose streak is already 0 are left alone.
+
+        Returns:
+            list: A list of (habit_id, name, habit_period, days_missed) tuples for every habit that was reset.
+        """
+        params = {"today": date.today().toordinal()}
+        last_day = _day_ordinal_sql('last_completed_at')
+        # The rule of `streaks.is_overdue`, evaluated in SQL.
+        overdue = f'''
+            is_active = 1 AND current_streak > 0 AND last_completed_at IS NOT NULL AND
+            {_period_key_sql(':today', 'habit_period')} - {_period_key_sql(last_day, 'habit_period')} >= 2
+        '''
+        with self._transaction() as cursor:
+            cursor.execute(f'SELECT id, name, habit_period, :today - {last_day} FROM habits WHERE {overdue}', params)
+            broken = cursor.fetchall()
+            if broken:
+                cursor.execute(f'UPDATE habits SET current_streak = 0 WHERE {overdue}', params)
+                self._changed_habit_ids.update(row[0] for row in broken)
+        return broken
+
+
+    def close_conn(self, verbose=True):
+        """Closes the database connection if found open.
+
+        Args:
+            verbose (bool): If True, prints whether a connection was closed.
+        """
         if self.is_conn:
+            while not self._readers.empty():
+                self._readers.get_nowait().close()
             self.is_conn.close()
-            print("Connection closed.")
-        else:
+            if verbose:
+                print("Connection closed.")
+        elif verbose:
             print("No connection to close.")
 
 
+def _format_timestamp(value):
+    """Normalizes a datetime or ISO-8601 string to the stored timestamp format."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.strftime(TIMESTAMP_FORMAT)
+
+
 if __name__ == "__main__":
     db_manager = DBManager()
     print("Database initialized and tables created.")
+    if "--rebuild-rollups" in sys.argv:
+        db_manager.rebuild_rollups()
+        print("Completion rollups rebuilt.")
     db_manager.close_conn()
\ No newline at end of file
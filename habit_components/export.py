@@ -0,0 +1,125 @@
+import csv
+import gzip
+import json
+import sys
+from habit_components.db import DBManager
+from habit_components.habit import HabitRecord
+
+# Column names of the exported tables, in the order the rows are streamed.
+COLUMNS = {
+    "habits": HabitRecord._fields,
+    "completions": ("id", "habit_id", "completed_at")
+}
+
+FORMATS = ("csv", "jsonl")
+
+
+def open_output(path, compress=None):
+    """Opens a text stream to write an export to.
+
+    Args:
+        path (str): Output file path, or "-" for standard output.
+        compress (bool): Whether to gzip the output; by default it is compressed if `path` ends with ".gz".
+
+    Returns:
+        file object: A writable text stream.
+    """
+    if compress is None:
+        compress = path.endswith(".gz")
+    if path == "-":
+        if compress:
+            return gzip.open(sys.stdout.buffer, "wt", newline="")
+        return open(sys.stdout.fileno(), "w", newline="", closefd=False)
+    if compress:
+        return gzip.open(path, "wt", newline="")
+    return open(path, "w", newline="")
+
+
+def write_rows(rows, columns, stream, fmt="csv"):
+    """Writes rows to a stream one at a time, as CSV with a header line or as one JSON object per line.
+
+    Args:
+        rows (iterable): Rows to write, in the order of `columns`.
+        columns (tuple): Column names.
+        stream (file object): Writable text stream.
+        fmt (str): "csv" or "jsonl".
+
+    Returns:
+        int: Number of rows written.
+    """
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif fmt == "jsonl":
+        for row in rows:
+            stream.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+            stream.write("\n")
+            count += 1
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return count
+
+
+def export_table(db, table, path, fmt=None, compress=None, habit_ids=None, habit_period=None, habit_type=None,
+                 start=None, end=None):
+    """Streams the habits or completions table to a CSV or JSONL file in constant memory.
+
+    Args:
+        db (DBManager): The database to export from.
+        table (str): "habits" or "completions".
+        path (str): Output file path, or "-" for standard output.
+        fmt (str): "csv" or "jsonl"; by default taken from the file extension, falling back to CSV.
+        compress (bool): Whether to gzip the output; by default decided by a ".gz" extension.
+        habit_ids (iterable): Optional IDs of the habits to export.
+        habit_period (str): Optional period of the habits to export.
+        habit_type (str): Optional type of the habits to export.
+        start (str): Optional first completion day to export, as YYYY-MM-DD. Ignored for habits.
+        end (str): Optional last completion day to export, as YYYY-MM-DD. Ignored for habits.
+
+    Returns:
+        int: Number of rows written.
+    """
+    if fmt is None:
+        fmt = "jsonl" if path.endswith((".jsonl", ".jsonl.gz")) else "csv"
+
+    if table == "habits":
+        rows = db.iter_habits(habit_ids, habit_period, habit_type)
+    elif table == "completions":
+        rows = db.iter_completions(habit_ids, habit_period, habit_type, start, end)
+    else:
+        raise ValueError(f"Unknown table: {table}")
+
+    with open_output(path, compress) as stream:
+        return write_rows(rows, COLUMNS[table], stream, fmt)
+
+
+def main():
+    """Exports a table of the habit tracker database from the command line."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export habits or completions to CSV or JSONL.")
+    parser.add_argument("table", choices=COLUMNS, help="Table to export.")
+    parser.add_argument("output", help="Output file; '-' writes to standard output. A .gz suffix enables gzip.")
+    parser.add_argument("--db", default="habit_tracker.db", help="Name of the SQLite database file.")
+    parser.add_argument("--format", choices=FORMATS, help="Output format (default: from the file extension).")
+    parser.add_argument("--gzip", action="store_true", default=None, help="Compress the output with gzip.")
+    parser.add_argument("--habit", type=int, action="append", dest="habit_ids", help="Only export this habit ID.")
+    parser.add_argument("--period", help="Only export habits with this period (daily or weekly).")
+    parser.add_argument("--type", dest="habit_type", help="Only export habits with this type (positive or negative).")
+    parser.add_argument("--start", help="Only export completions on or after this day (YYYY-MM-DD).")
+    parser.add_argument("--end", help="Only export completions on or before this day (YYYY-MM-DD).")
+    args = parser.parse_args()
+
+    db = DBManager(args.db, cache=False)
+    count = export_table(db, args.table, args.output, args.format, args.gzip, args.habit_ids, args.period,
+                         args.habit_type, args.start, args.end)
+    db.is_conn.close()
+    print(f"Exported {count} {args.table} row(s).", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 from enum import Enum
 from datetime import datetime
-from typing import List, Optional
+from typing import List, NamedTuple, Optional
+
+# ISO-8601 timestamps sort chronologically as plain text and are understood by SQLite's date functions.
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Format used by databases created before schema version 1.
+LEGACY_TIMESTAMP_FORMAT = "%b %d, %Y at %H:%M"
 
 class HabitPeriod(Enum):
     """Enumeration of possible habit tracking periods.
@@ -40,13 +45,16 @@ class Habit:
         is_active (bool): Whether the habit is currently active (not archived or deleted).
         completions (List[str]): Dates on which the habit was completed.
     """
+    __slots__ = ("id", "name", "habit_period", "habit_type", "created_at", "last_completed_at", "current_streak",
+                 "longest_streak", "is_active", "completions")
+
     def __init__(self, name: str, habit_period: 'HabitPeriod', habit_type: 'HabitType', id: Optional[int] = None, created_at: Optional[str] = None,
         last_completed_at: Optional[str] = None, current_streak: int = 0, longest_streak: int = 0, is_active: bool = True, completions: Optional[List[str]] = None):
         self.id: Optional[int] = id
         self.name: str = name
         self.habit_period: 'HabitPeriod' = habit_period
         self.habit_type: 'HabitType' = habit_type
-        self.created_at: Optional[str] = created_at or datetime.now().strftime("%b %d, %Y at %H:%M")
+        self.created_at: Optional[str] = created_at or datetime.now().strftime(TIMESTAMP_FORMAT)
         self.last_completed_at: Optional[str] = last_completed_at
         self.current_streak: int = current_streak
         self.longest_streak: int = longest_streak
@@ -54,4 +62,34 @@ class Habit:
         self.completions: Optional[List[str]] = completions or []
 
 
+class HabitRecord(NamedTuple):
+    """A habit row as read from the database.
+
+    Records are immutable tuples without a per-instance `__dict__`, so large numbers of them stay compact in
+    memory. Fields can be read by name, and by position in the column order of the habits table.
+
+    Attributes:
+        id (int): Unique identifier of the habit.
+        name (str): The name of the habit.
+        habit_period (str): Value of the habit's HabitPeriod (DAILY or WEEKLY).
+        habit_type (str): Value of the habit's HabitType (POSITIVE or NEGATIVE).
+        created_at (str): Timestamp of when the habit was created.
+        last_completed_at (Optional[str]): Last date/time the habit was marked as completed.
+        current_streak (int): Current number of consecutive completions.
+        longest_streak (int): Longest recorded streak for this habit.
+        is_active (int): 1 if the habit is active, 0 if it is archived.
+    """
+    id: int
+    name: str
+    habit_period: str
+    habit_type: str
+    created_at: str
+    last_completed_at: Optional[str]
+    current_streak: int
+    longest_streak: int
+    is_active: int
+
 
+def habit_record_factory(cursor, row):
+    """`sqlite3` row factory that builds a HabitRecord from a `SELECT * FROM habits` row."""
+    return HabitRecord._make(row)
@@ -1,4 +1,5 @@
-from questionary import text, select, confirm
+from habit_components.prompts import text, select, confirm
+from habit_components.dashboard import HabitDashboard
 from habit_components.habit import Habit, HabitPeriod, HabitType
 from habit_components.db import DBManager
 
@@ -12,11 +13,13 @@ class HabitTracker:
     Attributes:
         db (DBManager): Instance of the DBManager class for handling database interactions.
         test_mode (bool): Flag to bypass confirmation prompts during testing.
+        tracer (QueryTracer): Optional query tracer passed to the DBManager, used by `cli.py --profile`.
 
     """
-    def __init__(self, db_name="habit_tracker.db", test_mode=False):
-        self.db = DBManager(db_name)
+    def __init__(self, db_name="habit_tracker.db", test_mode=False, tracer=None):
+        self.db = DBManager(db_name, tracer=tracer)
         self.test_mode = test_mode
+        self.tracer = tracer
 
     def create_habit(self):
         """Prompts the user to create a new habit and saves it to the database.
@@ -128,6 +131,7 @@ class HabitTracker:
             dict or None: A dictionary containing streak info:
                 - "new_streak" (int): Updated current streak value.
                 - "streak_broken" (bool): True if the user broke their previous streak.
+                - "already_completed" (bool): True if the habit was already completed in this period.
             Returns None if the habit doesn't exist or if the operation is cancelled.
             """
         if habit_id is None:
@@ -142,7 +146,9 @@ class HabitTracker:
                 print("Could not complete the habit, make sure it exists.\n")
                 return
 
-            if result["streak_broken"]:
+            if result["already_completed"]:
+                print("This habit is already completed for the current period.\n")
+            elif result["streak_broken"]:
                 print("You missed your habit last time, starting new streak from today...")
             elif result["new_streak"] == 1:
                 print("New habit streak started! ⏳")
@@ -162,31 +168,23 @@ class HabitTracker:
             - Archive the habit
             - Delete the habit
 
-        Continues until the user chooses to return to the main menu.
+        Continues until the user chooses to return to the main menu. The list is a `HabitDashboard` snapshot
+        taken once when the menu opens; after each action only the habit that was acted on is refreshed.
 
         Returns:
             None
         """
+        dashboard = HabitDashboard(self.db)
+        for _, name, habit_period, days_missed in dashboard.missed:
+            print(
+                f"‼️ You missed your {habit_period.title()} streak for habit '{name}'! Missed by {days_missed} day(s)...Better luck next time!")
+
         while True:
-            habits = self.db.fetch_all_habits()
-            if not habits:
+            if not dashboard.rows:
                 print("No habits found. Please create a habit first.\n")
                 return None
 
-            habit_choices = []
-            habit_lookup = {}
-
-            for idx, h in enumerate(habits, start=1):
-                streak_broken, days_missed = self.db.reset_broken_streak(h)
-                if streak_broken:
-                    print(
-                        f"‼️ You missed your {h[2].title()} streak for habit '{h[1]}'! Missed by {days_missed} day(s)...Better luck next time!")
-
-                completed = self.db.is_habit_completed(h)
-                status = "✅" if completed else "🔲"
-                habit_choices.append(f"[{idx}] {status} {h[1]} - {h[2].title()}, {h[3].title()}")
-                habit_lookup[idx] = h
-
+            habit_choices = dashboard.choices()
             habit_choices.append("Go back to main menu")
 
             selection = select(
@@ -197,28 +195,25 @@ class HabitTracker:
             if selection == "Go back to main menu":
                 print("Returning to main menu...")
                 break
-            
-            
+
             selected_index = int(selection.split("]")[0][1:])
-            h = habit_lookup[selected_index]
-            habit_id = h[0]
-
-            while True:
-                habit_completed = self.db.is_habit_completed(h)
-                action = [
-                    "Edit habit",
-                    "Archive habit",
-                    "Delete habit",
-                    "Go back to selection"
-                ]
-
-                if not habit_completed:
-                    action.insert(0, "Mark habit as completed")
-
-                select_actions = select(
-                    "What would you like to do with this habit?",
-                    choices=action).ask()
-                break
+            h, habit_completed = dashboard.habit_at(selected_index)
+            habit_id = h.id
+
+            action = [
+                "Edit habit",
+                "Archive habit",
+                "Delete habit",
+                "Go back to selection"
+            ]
+
+            if not habit_completed:
+                action.insert(0, "Mark habit as completed")
+
+            select_actions = select(
+                "What would you like to do with this habit?",
+                choices=action).ask()
+
             if select_actions == "Mark habit as completed":
                 self.mark_habit_completed(habit_id)
             elif select_actions == "Edit habit":
@@ -227,5 +222,6 @@ class HabitTracker:
                 self.archive_habit(habit_id)
             elif select_actions == "Delete habit":
                 self.delete_habit(habit_id)
-            elif select_actions == "Go back to selection":
-                continue
\ No newline at end of file
+            else:
+                continue
+            dashboard.refresh(habit_id)
\ No newline at end of file
@@ -0,0 +1,247 @@
+import csv
+import gzip
+import json
+import os
+import sys
+from datetime import datetime
+from itertools import islice
+from habit_components.db import DBManager
+from habit_components.habit import Habit, HabitPeriod, HabitType, TIMESTAMP_FORMAT
+
+# Rows validated and written per transaction.
+CHUNK_SIZE = 10_000
+
+# Invalid rows beyond this number are counted but not described in the result.
+MAX_REPORTED_ERRORS = 100
+
+TABLES = ("habits", "completions")
+FORMATS = ("csv", "jsonl")
+
+
+def open_input(path):
+    """Opens a CSV or JSONL file for reading as text, transparently decompressing ".gz" files."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="")
+    return open(path, newline="")
+
+
+def read_records(stream, fmt="csv"):
+    """Lazily reads the records of an import file.
+
+    CSV rows are yielded as dictionaries keyed by the header line. JSONL lines are yielded as raw strings and
+    decoded during validation, so a malformed line is reported like any other invalid row. Blank lines are
+    skipped.
+
+    Args:
+        stream (file object): Readable text stream.
+        fmt (str): "csv" or "jsonl".
+
+    Yields:
+        dict or str: One record per data row.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    elif fmt == "jsonl":
+        for line in stream:
+            if line.strip():
+                yield line
+    else:
+        raise ValueError(f"Unknown import format: {fmt}")
+
+
+def _as_dict(record):
+    """Decodes a JSONL record, leaving CSV records as they are."""
+    if isinstance(record, str):
+        record = json.loads(record)
+        if not isinstance(record, dict):
+            raise ValueError("expected a JSON object")
+    return record
+
+
+def _parse_timestamp(value):
+    """Normalizes an ISO-8601 date or timestamp to TIMESTAMP_FORMAT."""
+    return datetime.fromisoformat(str(value).strip()).strftime(TIMESTAMP_FORMAT)
+
+
+def validate_habit(record):
+    """Builds a Habit from an import record.
+
+    The record needs `name`, `habit_period` and `habit_type` fields, where the period and type must be values of
+    HabitPeriod and HabitType (case-insensitive). `id`, `created_at` and `is_active` are optional. Streak values
+    are not imported; they are rebuilt from the completions.
+
+    Raises:
+        ValueError: If a field is missing or invalid.
+    """
+    record = _as_dict(record)
+    name = str(record.get("name") or "").strip()
+    if not name:
+        raise ValueError("missing habit name")
+    try:
+        habit_period = HabitPeriod(str(record.get("habit_period", "")).strip().upper())
+        habit_type = HabitType(str(record.get("habit_type", "")).strip().upper())
+    except ValueError as e:
+        raise ValueError(str(e)) from None
+    habit_id = int(record["id"]) if record.get("id") not in (None, "") else None
+    created_at = _parse_timestamp(record["created_at"]) if record.get("created_at") else None
+    is_active = str(record.get("is_active", 1)).strip().lower() not in ("0", "false", "no")
+    return Habit(name, habit_period, habit_type, id=habit_id, created_at=created_at, is_active=is_active)
+
+
+def validate_completion(record, habit_ids, habit_names, compacted=None):
+    """Builds a (habit_id, completed_at) pair from an import record.
+
+    The habit is referenced either by `habit_id` or, for data from other tools, by `habit_name`.
+
+    Args:
+        record (dict or str): The import record.
+        habit_ids (set): IDs of the existing habits.
+        habit_names (dict): Maps lowercased habit names to habit IDs.
+        compacted (dict): Optional map of habit ID to its compaction boundary, as YYYY-MM-DD.
+
+    Raises:
+        ValueError: If a field is missing or invalid, the habit doesn't exist, or the completion falls before
+            the habit's compaction boundary.
+    """
+    record = _as_dict(record)
+    if record.get("habit_id") not in (None, ""):
+        habit_id = int(record["habit_id"])
+        if habit_id not in habit_ids:
+            raise ValueError(f"unknown habit ID {habit_id}")
+    elif record.get("habit_name"):
+        habit_id = habit_names.get(str(record["habit_name"]).strip().lower())
+        if habit_id is None:
+            raise ValueError(f"unknown habit '{record['habit_name']}'")
+    else:
+        raise ValueError("missing habit_id or habit_name")
+    if not record.get("completed_at"):
+        raise ValueError("missing completed_at")
+    completed_at = _parse_timestamp(record["completed_at"])
+    if compacted and completed_at < compacted.get(habit_id, ""):
+        raise ValueError(f"completion before the compacted history of habit {habit_id}")
+    return habit_id, completed_at
+
+
+def _load_checkpoint(db, source):
+    """Returns the number of rows of `source` that were already imported."""
+    with db.reader() as conn:
+        row = conn.execute('SELECT rows_done FROM import_checkpoints WHERE source = ?', (source,)).fetchone()
+    return row[0] if row else 0
+
+
+def import_file(db, table, path, fmt=None, chunk_size=CHUNK_SIZE, restart=False):
+    """Streams a CSV or JSONL file into the habits or completions table.
+
+    The file is read lazily and each chunk of rows is validated and written in its own transaction, together
+    with a checkpoint of how many rows are done. If an import is interrupted, running it again for the same file
+    skips the rows that were already written. After the last chunk, completions of archived habits are moved
+    into cold storage and the streak values are rebuilt once with the vectorized `verify_streaks`.
+
+    Args:
+        db (DBManager): The database to import into.
+        table (str): "habits" or "completions".
+        path (str): Path of the input file; a ".gz" suffix means gzip compression.
+        fmt (str): "csv" or "jsonl"; by default taken from the file extension, falling back to CSV.
+        chunk_size (int): Rows written per transaction.
+        restart (bool): If True, the checkpoint is ignored and the whole file is imported again.
+
+    Returns:
+        dict: Import summary:
+            - "imported" (int): Number of rows written in this run.
+            - "duplicates" (int): Number of valid completions skipped because their period was already completed.
+            - "resumed_at" (int): Number of rows skipped because an earlier run already imported them.
+            - "invalid" (int): Number of rows that failed validation and were skipped.
+            - "errors" (list): (row_number, message) tuples for the first MAX_REPORTED_ERRORS invalid rows.
+    """
+    if table not in TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    if fmt is None:
+        fmt = "jsonl" if path.endswith((".jsonl", ".jsonl.gz")) else "csv"
+
+    source = f"{table}:{os.path.abspath(path)}"
+    done = _load_checkpoint(db, source)
+    if restart:
+        done = 0
+    summary = {"imported": 0, "duplicates": 0, "resumed_at": done, "invalid": 0, "errors": []}
+
+    habit_ids, habit_names = set(), {}
+    for habit in db.iter_habits():
+        habit_ids.add(habit.id)
+        habit_names.setdefault(habit.name.lower(), habit.id)
+    compacted = db.fetch_compaction_boundaries() if table == "completions" else {}
+
+    with open_input(path) as stream:
+        records = islice(read_records(stream, fmt), done, None)
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+
+            valid = []
+            for row_number, record in enumerate(chunk, start=done + 1):
+                try:
+                    if table == "habits":
+                        habit = validate_habit(record)
+                        if habit.id is not None:
+                            if habit.id in habit_ids:
+                                raise ValueError(f"habit ID {habit.id} already exists")
+                            habit_ids.add(habit.id)
+                        valid.append(habit)
+                    else:
+                        valid.append(validate_completion(record, habit_ids, habit_names, compacted))
+                except (ValueError, KeyError, TypeError) as e:
+                    summary["invalid"] += 1
+                    if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+                        summary["errors"].append((row_number, str(e)))
+
+            with db.transaction() as cursor:
+                if table == "habits":
+                    # Habits with an ID go first, so no ID assigned to the others in this chunk can collide.
+                    valid.sort(key=lambda habit: habit.id is None)
+                    habit_ids.update(db.insert_habits(valid))
+                    imported = len(valid)
+                else:
+                    # Completion IDs only grow, so the rows written by this chunk are the ones past the old maximum.
+                    last_id = cursor.execute('SELECT COALESCE(MAX(id), 0) FROM completions').fetchone()[0]
+                    db.insert_habit_completions(valid, recompute_streaks=False)
+                    imported = cursor.execute('SELECT COUNT(*) FROM completions WHERE id > ?', (last_id,)).fetchone()[0]
+                    summary["duplicates"] += len(valid) - imported
+                done += len(chunk)
+                cursor.execute('INSERT OR REPLACE INTO import_checkpoints (source, rows_done) VALUES (?, ?)',
+                               (source, done))
+            summary["imported"] += imported
+
+    if table == "completions":
+        db.move_archived_to_cold_storage()
+        db.verify_streaks(apply=True)
+    return summary
+
+
+def main():
+    """Imports a CSV or JSONL file into the habit tracker database from the command line."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import habits or completions from CSV or JSONL.")
+    parser.add_argument("table", choices=TABLES, help="Table to import into.")
+    parser.add_argument("input", help="Input file; a .gz suffix means gzip compression.")
+    parser.add_argument("--db", default="habit_tracker.db", help="Name of the SQLite database file.")
+    parser.add_argument("--format", choices=FORMATS, help="Input format (default: from the file extension).")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows written per transaction.")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint of an earlier run.")
+    args = parser.parse_args()
+
+    db = DBManager(args.db, cache=False)
+    summary = import_file(db, args.table, args.input, args.format, args.chunk_size, args.restart)
+    db.is_conn.close()
+
+    if summary["resumed_at"]:
+        print(f"Resumed after {summary['resumed_at']} row(s) imported by an earlier run.")
+    print(f"Imported {summary['imported']} {args.table} row(s), skipped {summary['invalid']} invalid row(s).")
+    if summary["duplicates"]:
+        print(f"Skipped {summary['duplicates']} completion(s) in periods that were already completed.")
+    for row_number, message in summary["errors"]:
+        print(f"  row {row_number}: {message}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
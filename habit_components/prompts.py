@@ -0,0 +1,20 @@
+# Importing questionary pulls in prompt_toolkit, which makes up most of the CLI's startup time. These wrappers
+# only import it when the first prompt is shown, so non-interactive paths and tests never pay for it.
+
+
+def text(*args, **kwargs):
+    """Creates a `questionary.text` prompt."""
+    import questionary
+    return questionary.text(*args, **kwargs)
+
+
+def select(*args, **kwargs):
+    """Creates a `questionary.select` prompt."""
+    import questionary
+    return questionary.select(*args, **kwargs)
+
+
+def confirm(*args, **kwargs):
+    """Creates a `questionary.confirm` prompt."""
+    import questionary
+    return questionary.confirm(*args, **kwargs)
@@ -0,0 +1,171 @@
+from array import array
+from itertools import accumulate
+from typing import NamedTuple, Optional
+
+
+class WindowStats(NamedTuple):
+    """Completion statistics of one habit over a window of days.
+
+    Attributes:
+        completions (int): Number of completions in the window.
+        completed_periods (int): Number of days (daily habits) or Monday-based weeks (weekly habits) in the
+            window with at least one completion.
+        periods (int): Number of days or weeks in the window.
+        rate (float): `completed_periods` divided by `periods`.
+        adherence (Optional[float]): `completed_periods` divided by the number of periods since the habit
+            started, i.e. since it was created or first completed; None if it started after the window.
+    """
+    completions: int
+    completed_periods: int
+    periods: int
+    rate: float
+    adherence: Optional[float]
+
+
+def _week(day):
+    """Returns the number of the Monday-based week of a proleptic Gregorian ordinal."""
+    return (day - 1) // 7
+
+
+class CompletionPrefixSums:
+    """Per-habit prefix sums of daily completions, answering any window query in constant time.
+
+    Every habit with completions gets a segment covering the days from its first completion up to `today`, and
+    a segment covering the weeks in between. Three flat arrays hold the running totals over all segments: the
+    number of completions, of days with a completion, and of weeks with a completion. The statistics of any
+    window are then differences of two entries of the habit's segment.
+
+    Attributes:
+        today (int): Ordinal of the last day covered.
+    """
+    def __init__(self, habits, rows, today):
+        """Builds the prefix sums.
+
+        Uses NumPy when it is installed, so millions of daily counts are summed in well under a second.
+        Without NumPy the same arrays are built in Python.
+
+        Args:
+            habits (iterable): (habit_id, habit_period, created_day) tuples of every habit, where created_day is
+                a date ordinal or None if unknown.
+            rows (iterable): (habit_id, days, completions) tuples, one per habit with completions, where days
+                and completions are comma-separated lists of date ordinals and the number of completions on
+                each, as built by `group_concat`. Parsing one string per habit is much faster than fetching
+                one row per day.
+            today (date): Last day covered by the prefix sums.
+        """
+        self.today = today.toordinal()
+        self._habits = {habit_id: (habit_period, created_day) for habit_id, habit_period, created_day in habits}
+        self._segments = {}
+        try:
+            import numpy as np
+        except ImportError:
+            self._build_python(rows)
+        else:
+            self._build_numpy(np, rows)
+
+    def _build_numpy(self, np, rows):
+        """Builds the segments and running totals with NumPy."""
+        rows = list(rows)
+        if not rows:
+            self._counts = self._days = self._weeks = array("q", [0])
+            return
+        habit_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        days = np.fromstring(",".join(row[1] for row in rows), dtype=np.int64, sep=",")
+        counts = np.fromstring(",".join(row[2] for row in rows), dtype=np.int64, sep=",")
+        row_counts = np.fromiter((row[1].count(",") + 1 for row in rows), dtype=np.int64, count=len(rows))
+        habit_index = np.repeat(np.arange(len(rows)), row_counts)
+
+        keep = days <= self.today
+        present, segment = np.unique(habit_index[keep], return_inverse=True)
+        days, counts = days[keep], counts[keep]
+        if not len(present):
+            self._counts = self._days = self._weeks = array("q", [0])
+            return
+        first_days = np.full(len(present), self.today, dtype=np.int64)
+        np.minimum.at(first_days, segment, days)
+        first_weeks = (first_days - 1) // 7
+        lengths = self.today - first_days + 1
+        week_lengths = (self.today - 1) // 7 - first_weeks + 1
+        bases = np.r_[0, np.cumsum(lengths)[:-1]]
+        week_bases = np.r_[0, np.cumsum(week_lengths)[:-1]]
+
+        daily = np.zeros(int(lengths.sum()), dtype=np.int64)
+        daily[bases[segment] + days - first_days[segment]] = counts
+        weekly = np.zeros(int(week_lengths.sum()), dtype=np.int64)
+        weekly[week_bases[segment] + (days - 1) // 7 - first_weeks[segment]] = 1
+
+        self._counts = array("q", np.r_[0, np.cumsum(daily)].tobytes())
+        self._days = array("q", np.r_[0, np.cumsum(daily > 0)].tobytes())
+        self._weeks = array("q", np.r_[0, np.cumsum(weekly)].tobytes())
+        for segment_values in zip(habit_ids[present].tolist(), first_days.tolist(), bases.tolist(),
+                                  lengths.tolist(), first_weeks.tolist(), week_bases.tolist(), week_lengths.tolist()):
+            self._segments[segment_values[0]] = segment_values[1:]
+
+    def _build_python(self, rows):
+        """Builds the segments and running totals in pure Python."""
+        daily, weekly = [], []
+        for habit_id, habit_days, habit_counts in rows:
+            habit_days = [(day, count) for day, count in zip(map(int, habit_days.split(",")),
+                                                             map(int, habit_counts.split(","))) if day <= self.today]
+            if not habit_days:
+                continue
+            first_day = min(day for day, _ in habit_days)
+            first_week = _week(first_day)
+            base, week_base = len(daily), len(weekly)
+            length, week_length = self.today - first_day + 1, _week(self.today) - first_week + 1
+            daily.extend([0] * length)
+            weekly.extend([0] * week_length)
+            for day, count in habit_days:
+                daily[base + day - first_day] = count
+                weekly[week_base + _week(day) - first_week] = 1
+            self._segments[habit_id] = (first_day, base, length, first_week, week_base, week_length)
+
+        self._counts = array("q", accumulate(daily, initial=0))
+        self._days = array("q", accumulate((count > 0 for count in daily), initial=0))
+        self._weeks = array("q", accumulate(weekly, initial=0))
+
+    @staticmethod
+    def _range_sum(prefix, base, length, first, last):
+        """Sums positions `first` to `last` of a segment from its running totals, clipped to the segment."""
+        lo = min(max(first, 0), length)
+        hi = min(max(last + 1, 0), length)
+        return prefix[base + hi] - prefix[base + lo] if hi > lo else 0
+
+    def window(self, habit_id, days, end=None):
+        """Returns the completion statistics of a habit over the `days` days ending on `end`.
+
+        Args:
+            habit_id (int): The ID of the habit.
+            days (int): Length of the window in days.
+            end (date): Last day of the window, defaults to `today`.
+
+        Returns:
+            WindowStats: The statistics of the window.
+
+        Raises:
+            KeyError: If the habit didn't exist when the prefix sums were built.
+        """
+        habit_period, created_day = self._habits[habit_id]
+        last = self.today if end is None else end.toordinal()
+        first = last - days + 1
+
+        segment = self._segments.get(habit_id)
+        completions = completed_days = completed_weeks = 0
+        started = created_day
+        if segment is not None:
+            first_day, base, length, first_week, week_base, week_length = segment
+            completions = self._range_sum(self._counts, base, length, first - first_day, last - first_day)
+            completed_days = self._range_sum(self._days, base, length, first - first_day, last - first_day)
+            completed_weeks = self._range_sum(self._weeks, week_base, week_length,
+                                              _week(first) - first_week, _week(last) - first_week)
+            started = first_day if started is None else min(started, first_day)
+
+        eligible_first = first if started is None else max(first, started)
+        if habit_period == "WEEKLY":
+            completed, periods = completed_weeks, _week(last) - _week(first) + 1
+            eligible = _week(last) - _week(eligible_first) + 1
+        else:
+            completed, periods = completed_days, days
+            eligible = last - eligible_first + 1
+        adherence = completed / eligible if eligible > 0 and started is not None else None
+        return WindowStats(completions, completed, periods, completed / periods, adherence)
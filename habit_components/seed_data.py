@@ -1,18 +1,29 @@
-from habit_components.db import DBManager
-from habit_components.habit import Habit, HabitPeriod, HabitType
+import random
 from datetime import datetime, timedelta
+from habit_components.db import DBManager
+from habit_components.habit import Habit, HabitPeriod, HabitType, TIMESTAMP_FORMAT
+from habit_components.streaks import period_key
+
+# Rows written per executemany call, each in its own transaction.
+CHUNK_SIZE = 50_000
+
+# Completion times of day the generator picks from, every quarter of an hour between 06:00 and 22:45.
+TIMES_OF_DAY = [f" {hour:02d}:{minute:02d}:00" for hour in range(6, 23) for minute in (0, 15, 30, 45)]
 
 def reset_database(db):
-    """Deletes all the data present in the habits and completions tables."""
+    """Deletes all the data present in the habits, completions, rollup, cold storage and compaction tables."""
     print("Deleting all existing data for habits...")
 
-    db.cursor.execute("DELETE FROM completions")
-    db.cursor.execute("DELETE FROM habits")
-    db.is_conn.commit()
+    with db.transaction() as cursor:
+        cursor.execute("DELETE FROM compacted_history")
+        cursor.execute("DELETE FROM archived_completions")
+        cursor.execute("DELETE FROM completion_rollups")
+        cursor.execute("DELETE FROM completions")
+        cursor.execute("DELETE FROM habits")
     print("Database reset completed.\n")
 
 def create_predefined_habits(db):
-    """Adds habit data of 4 weeks in the habits table."""
+    """Adds the five predefined demo habits to the habits table."""
     habits = [
         Habit("Read a book", HabitPeriod.DAILY, HabitType.POSITIVE),
         Habit("Exercise 15 minutes", HabitPeriod.DAILY, HabitType.POSITIVE),
@@ -22,72 +33,153 @@ def create_predefined_habits(db):
         ]
     for habit in habits:
         db.insert_habit_info(habit)
-    db.is_conn.commit()
     print("Database has been inserted with predefined habits.")
 
 def simulate_completion_dates(habit_id, habit_period, db, gaps=None):
-    """Simulates habit completion data for the predefined habits."""
+    """Simulates 4 weeks of completion data for a predefined habit.
+
+    The completions are written with `DBManager.insert_habit_completions`, so the streak values are rebuilt
+    from the history and account for the gaps.
+
+    Args:
+        habit_id (int): The habit to add completions to.
+        habit_period (HabitPeriod): The period of the habit.
+        db (DBManager): The database to write to.
+        gaps (list): Indexes of the days or weeks that are left out.
+    """
     if gaps is None:
         gaps = []
     now = datetime.now()
-    completions = []
 
     if habit_period == HabitPeriod.DAILY:
-        for i in range(28):
-            if i not in gaps:
-                date = now - timedelta(days=(27 - i))
-                completions.append(date)
-    elif habit_period == HabitPeriod.WEEKLY:
-        for i in range(4):
-            if i not in gaps:
-                date = now - timedelta(weeks=(3 - i))
-                completions.append(date)
-
-    for date in completions:
-        date_str = date.strftime("%b %d, %Y at %H:%M")
-        db.cursor.execute(
-            "INSERT INTO completions (habit_id, completed_at) VALUES (?,?)",
-            (habit_id, date_str)
-        )
-
-    if completions:
-        last = completions[-1].strftime("%b %d, %Y at %H:%M")
-        streak = len(completions)
-        db.cursor.execute('''
-        UPDATE habits SET
-        last_completed_at = ?,
-        current_streak = ?,
-        longest_streak = ?
-        WHERE id = ?
-        ''',
-      (last, streak, streak, habit_id)
-      )
-
-    db.is_conn.commit()
+        completions = [now - timedelta(days=(27 - i)) for i in range(28) if i not in gaps]
+    else:
+        completions = [now - timedelta(weeks=(3 - i)) for i in range(4) if i not in gaps]
+
+    db.insert_habit_completions((habit_id, date) for date in completions)
+
+def _habit_rows(count, start, rng):
+    """Yields the rows of `count` synthetic habits with random periods and types, every tenth one archived."""
+    created_at = start.strftime(TIMESTAMP_FORMAT)
+    for i in range(count):
+        habit_period = rng.choice((HabitPeriod.DAILY, HabitPeriod.WEEKLY))
+        habit_type = rng.choice((HabitType.POSITIVE, HabitType.NEGATIVE))
+        yield f"Habit {i + 1}", habit_period.value, habit_type.value, created_at, int(rng.random() >= 0.1)
+
+def _completion_rows(habits, start, days, rng):
+    """Yields synthetic (habit_id, completed_at, period_key) rows, grouped by habit and in chronological order.
+
+    Every habit follows a two-state pattern: after a completed period the next one is completed with the
+    habit's completion probability, and after a missed period the habit stays off track with its relapse
+    probability, which produces realistic runs of streaks and gaps. Weekly habits step through calendar
+    weeks, so like in the app every habit is completed at most once per period.
+
+    Args:
+        habits (list): (habit_id, habit_period) tuples of the habits to generate completions for.
+        start (datetime): First day of the history.
+        days (int): Length of the history in days.
+        rng (random.Random): Random generator that drives all choices.
+    """
+    dates = [(start + timedelta(days=day)).strftime("%Y-%m-%d") for day in range(days)]
+    first_day = start.toordinal()
+    for habit_id, habit_period in habits:
+        completion_probability = rng.uniform(0.6, 0.98)
+        relapse_probability = rng.uniform(0.1, 0.6)
+        step, first = (1, 0) if habit_period == HabitPeriod.DAILY.value else (7, -start.weekday())
+        on_track = True
+        for period_start in range(first, days, step):
+            on_track = rng.random() < (completion_probability if on_track else 1 - relapse_probability)
+            if on_track:
+                day = rng.randrange(max(period_start, 0), min(period_start + step, days))
+                yield habit_id, dates[day] + rng.choice(TIMES_OF_DAY), period_key(first_day + day, habit_period)
+
+def generate_habits(db, habits, years=1, seed=None, chunk_size=CHUNK_SIZE):
+    """Fills the database with synthetic habits and a history of completions, reproducibly for a given seed.
+
+    Rows are streamed through `executemany` in chunked transactions, so memory use stays flat for any size.
+    Durability is turned off for the connection while loading. Afterwards the rollups and the streak values
+    of every habit are rebuilt once from the generated history, and the history of the archived habits is
+    moved into cold storage.
+
+    Args:
+        db (DBManager): The database to fill.
+        habits (int): Number of habits to generate.
+        years (float): Length of the completion history in years, ending today.
+        seed (int): Seed of the random generator; None picks a random one.
+        chunk_size (int): Rows written per transaction.
+
+    Returns:
+        int: Number of completions written.
+    """
+    rng = random.Random(seed)
+    days = max(1, int(years * 365))
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+    synchronous = db.cursor.execute('PRAGMA synchronous').fetchone()[0]
+    db.cursor.execute('PRAGMA synchronous = OFF')
+
+    try:
+        with db.transaction() as cursor:
+            first_id = cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM habits").fetchone()[0]
+            cursor.executemany('''
+                INSERT INTO habits (name, habit_period, habit_type, created_at, is_active) VALUES (?, ?, ?, ?, ?)
+            ''', _habit_rows(habits, start, rng))
+            new_habits = cursor.execute("SELECT id, habit_period FROM habits WHERE id >= ? ORDER BY id",
+                                        (first_id,)).fetchall()
+
+        written = 0
+        rows = _completion_rows(new_habits, start, days, rng)
+        while True:
+            chunk = [row for _, row in zip(range(chunk_size), rows)]
+            if not chunk:
+                break
+            with db.transaction() as cursor:
+                cursor.executemany("INSERT INTO completions (habit_id, completed_at, period_key) VALUES (?, ?, ?)",
+                                   chunk)
+            written += len(chunk)
+
+        db.rebuild_rollups()
+        db.verify_streaks(apply=True)
+        db.move_archived_to_cold_storage()
+    finally:
+        db.cursor.execute(f'PRAGMA synchronous = {synchronous}')
+    return written
 
 def seed_data():
-    """Runs the functions to reset the database to make it ready for predefined habits additions, and defines those habits in their respective tables."""
-    db = DBManager("habit_tracker.db")
-    reset_database(db)
-    create_predefined_habits(db)
+    """Resets the database and fills it with the predefined demo habits and 4 weeks of completions.
 
-    print("Inserting 4 weeks of completion data...")
-    db.cursor.execute("SELECT id, name, habit_period FROM habits")
-    all_habits = db.cursor.fetchall()
+    With command line options, generates synthetic data instead; see `--help`.
+    """
+    import argparse
 
-    for h in all_habits:
-        habit_id, name, period_str = h
-        period = HabitPeriod(period_str)
+    parser = argparse.ArgumentParser(description="Reset the database and fill it with demo or synthetic data.")
+    parser.add_argument("--db", default="habit_tracker.db", help="Name of the SQLite database file.")
+    parser.add_argument("--habits", type=int, help="Generate this many synthetic habits instead of the demo data.")
+    parser.add_argument("--years", type=float, default=1, help="Years of synthetic completion history.")
+    parser.add_argument("--seed", type=int, help="Seed of the synthetic data generator.")
+    args = parser.parse_args()
 
-        # Customize gaps per habit if needed
-        if name == "Limit device usage":
-            simulate_completion_dates(habit_id, period, db, gaps=[3, 10])
-        elif name == "Binge-eating":
-            simulate_completion_dates(habit_id, period, db, gaps=[2])
-        else:
-            simulate_completion_dates(habit_id, period, db)
+    db = DBManager(args.db)
+    reset_database(db)
 
-        print(f" Added completions for '{name}'")
+    if args.habits:
+        print(f"Generating {args.habits} habits with {args.years} year(s) of completions...")
+        written = generate_habits(db, args.habits, args.years, args.seed)
+        print(f" Added {written} completions")
+    else:
+        create_predefined_habits(db)
+        print("Inserting 4 weeks of completion data...")
+        for h in db.fetch_all_habits():
+            period = HabitPeriod(h.habit_period)
+
+            # Customize gaps per habit if needed
+            if h.name == "Limit device usage":
+                simulate_completion_dates(h.id, period, db, gaps=[3, 10])
+            elif h.name == "Binge-eating":
+                simulate_completion_dates(h.id, period, db, gaps=[2])
+            else:
+                simulate_completion_dates(h.id, period, db)
+
+            print(f" Added completions for '{h.name}'")
 
     db.close_conn()
     print("\nSeeding completed")
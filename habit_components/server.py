@@ -0,0 +1,281 @@
+import json
+import re
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from habit_components import analytics
+from habit_components.db import DBManager
+from habit_components.habit import Habit, HabitPeriod, HabitType
+
+# Largest request body accepted, in bytes.
+MAX_BODY_SIZE = 1024 * 1024
+
+
+class APIError(Exception):
+    """An error returned to the client as a JSON body with the given HTTP status."""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _to_json(value):
+    """Converts habit records, and lists or tuples of them, into JSON-serializable values."""
+    if hasattr(value, "_asdict"):
+        return value._asdict()
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    return value
+
+
+def _habit_or_404(db, habit_id):
+    """Fetches a habit record, raising a 404 APIError if it doesn't exist."""
+    habit = db.fetch_habit_by_id(habit_id)
+    if habit is None:
+        raise APIError(HTTPStatus.NOT_FOUND, f"Habit {habit_id} not found")
+    return habit
+
+
+def _habit_fields(body):
+    """Reads and validates the name, period and type of a habit from a request body."""
+    try:
+        name = body["name"]
+        habit_period, habit_type = HabitPeriod(body["habit_period"].upper()), HabitType(body["habit_type"].upper())
+    except (KeyError, AttributeError, TypeError, ValueError) as e:
+        raise APIError(HTTPStatus.BAD_REQUEST, f"Invalid habit: {e}")
+    if not isinstance(name, str) or not name.strip():
+        raise APIError(HTTPStatus.BAD_REQUEST, "Invalid habit: name must be a non-empty string")
+    return name, habit_period, habit_type
+
+
+# Route handlers take (db, query, body, *path_args) and return a payload or a (status, payload) tuple.
+def list_habits(db, query, body):
+    return db.fetch_all_habits(include_archived=query.get("include_archived") == "1")
+
+
+def create_habit(db, query, body):
+    name, habit_period, habit_type = _habit_fields(body)
+    return HTTPStatus.CREATED, {"id": db.insert_habits([Habit(name, habit_period, habit_type)])[0]}
+
+
+def get_habit(db, query, body, habit_id):
+    return _habit_or_404(db, habit_id)
+
+
+def update_habit(db, query, body, habit_id):
+    _habit_or_404(db, habit_id)
+    db.change_habit_info(habit_id, *_habit_fields(body))
+    return db.fetch_habit_by_id(habit_id)
+
+
+def delete_habit(db, query, body, habit_id):
+    _habit_or_404(db, habit_id)
+    db.delete_habit_info(habit_id)
+    return HTTPStatus.NO_CONTENT, None
+
+
+def archive_habit(db, query, body, habit_id):
+    _habit_or_404(db, habit_id)
+    db.archive_habit_info(habit_id)
+    return db.fetch_habit_by_id(habit_id)
+
+
+def unarchive_habit(db, query, body, habit_id):
+    _habit_or_404(db, habit_id)
+    db.unarchive_habit_info(habit_id)
+    return db.fetch_habit_by_id(habit_id)
+
+
+def complete_habit(db, query, body, habit_id):
+    if not _habit_or_404(db, habit_id).is_active:
+        raise APIError(HTTPStatus.CONFLICT, f"Habit {habit_id} is archived")
+    result = db.insert_habit_completion(habit_id)
+    if result is None:
+        raise APIError(HTTPStatus.NOT_FOUND, f"Habit {habit_id} not found")
+    # Completing a habit twice in one period records nothing, so the retry is answered like a GET.
+    return (HTTPStatus.OK if result["already_completed"] else HTTPStatus.CREATED), result
+
+
+def list_completions(db, query, body, habit_id):
+    _habit_or_404(db, habit_id)
+    return [completed_at for completed_at, in db.fetch_habit_completions(habit_id)]
+
+
+def run_analytics(db, query, body, name):
+    """Answers one of the `analytics.py` queries with the database as the source."""
+    if name == "active":
+        return analytics.get_all_active_habits(db)
+    if name == "by_period" and "period" in query:
+        return analytics.get_habits_by_period(db, query["period"])
+    if name == "by_type" and "type" in query:
+        return analytics.get_habits_by_type(db, query["type"])
+    if name == "longest_streak":
+        return analytics.list_habits_by_longest_streak(db)
+    if name == "current_streaks":
+        return analytics.get_current_streaks(db)
+    if name == "longest_streak_for_name" and "name" in query:
+        return analytics.get_longest_streak_for_name(db, query["name"])
+    raise APIError(HTTPStatus.NOT_FOUND, f"Unknown analytics query or missing parameter: {name}")
+
+
+# (method, path pattern, handler); captured groups are passed to the handler as extra arguments.
+ROUTES = [
+    ("GET", r"/habits", list_habits),
+    ("POST", r"/habits", create_habit),
+    ("GET", r"/habits/(\d+)", get_habit),
+    ("PUT", r"/habits/(\d+)", update_habit),
+    ("DELETE", r"/habits/(\d+)", delete_habit),
+    ("POST", r"/habits/(\d+)/archive", archive_habit),
+    ("POST", r"/habits/(\d+)/unarchive", unarchive_habit),
+    ("GET", r"/habits/(\d+)/completions", list_completions),
+    ("POST", r"/habits/(\d+)/completions", complete_habit),
+    ("GET", r"/analytics/(\w+)", run_analytics),
+]
+ROUTES = [(method, re.compile(pattern + r"/?"), handler) for method, pattern, handler in ROUTES]
+
+
+def dispatch(db, method, target, body=None):
+    """Routes one API request to its handler.
+
+    Args:
+        db (DBManager): The database to serve from.
+        method (str): HTTP method.
+        target (str): Request path, optionally with a query string.
+        body: Decoded JSON body, or None.
+
+    Returns:
+        tuple: (status, payload) where payload is JSON-serializable or None.
+    """
+    url = urlsplit(target)
+    query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+    path_matched = False
+    for route_method, pattern, handler in ROUTES:
+        match = pattern.fullmatch(url.path)
+        if not match:
+            continue
+        path_matched = True
+        if route_method != method:
+            continue
+        args = [int(group) if group.isdigit() else group for group in match.groups()]
+        try:
+            result = handler(db, query, body or {}, *args)
+        except APIError as e:
+            return e.status, {"error": str(e)}
+        if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], HTTPStatus):
+            status, payload = result
+        else:
+            status, payload = HTTPStatus.OK, result
+        return status, _to_json(payload)
+
+    if path_matched:
+        return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{method} not allowed on {url.path}"}
+    return HTTPStatus.NOT_FOUND, {"error": f"No such endpoint: {url.path}"}
+
+
+def dispatch_batch(db, requests):
+    """Runs a list of {"method", "path", "body"} requests in order and collects their responses.
+
+    Returns:
+        list: A {"status", "body"} dictionary per request.
+    """
+    if not isinstance(requests, list):
+        raise APIError(HTTPStatus.BAD_REQUEST, "A batch must be a JSON list of requests")
+    responses = []
+    for request in requests:
+        try:
+            status, payload = dispatch(db, request.get("method", "GET").upper(), request["path"], request.get("body"))
+        except (AttributeError, KeyError, TypeError):
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": "Each batch entry needs a method and a path"}
+        responses.append({"status": int(status), "body": payload})
+    return responses
+
+
+class HabitRequestHandler(BaseHTTPRequestHandler):
+    """Serves the JSON API over persistent HTTP/1.1 connections."""
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; with Nagle's algorithm every keep-alive response would wait for
+    # the client's delayed ACK.
+    disable_nagle_algorithm = True
+
+    def _handle(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_BODY_SIZE:
+                self.close_connection = True
+                raise APIError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw) if raw else None
+            except ValueError:
+                raise APIError(HTTPStatus.BAD_REQUEST, "Request body is not valid JSON")
+
+            if self.command == "POST" and urlsplit(self.path).path.rstrip("/") == "/batch":
+                status, payload = HTTPStatus.OK, dispatch_batch(self.server.db, body)
+            else:
+                status, payload = dispatch(self.server.db, self.command, self.path, body)
+        except APIError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:
+            self.log_error("Error handling %s %s: %r", self.command, self.path, e)
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+
+        data = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        if data:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class HabitServer(ThreadingHTTPServer):
+    """Long-running HTTP server that keeps one warm `DBManager` for all requests.
+
+    The database is opened once in concurrent mode, so the connections, the reader pool and the habit cache stay
+    warm between requests, and each keep-alive client connection is served by its own thread.
+
+    Attributes:
+        db (DBManager): The database served by this server.
+        verbose (bool): Whether every request is logged to stderr.
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, db_name="habit_tracker.db", verbose=False, **db_options):
+        super().__init__(address, HabitRequestHandler)
+        self.db = DBManager(db_name, concurrent=True, **db_options)
+        self.verbose = verbose
+
+    def server_close(self):
+        super().server_close()
+        self.db.close_conn(verbose=False)
+
+
+def main():
+    """Starts the JSON API server from the command line."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the habit tracker as a local HTTP/JSON API.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on.")
+    parser.add_argument("--db", default="habit_tracker.db", help="Name of the SQLite database file.")
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+    args = parser.parse_args()
+
+    server = HabitServer((args.host, args.port), args.db, args.verbose)
+    print(f"Serving habit tracker on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from habit_components.db import DBManager
+
+# User IDs become part of a file name, so they are limited to characters that are safe on every file system.
+USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class ShardedDBManager:
+    """Routes each user to their own SQLite database file, keeping a bounded number of them open.
+
+    Every user gets a small database of their own, so per-user operations never touch other users' data and the
+    schema stays the same as for a single user. With `shards` set, the files are spread over that many
+    subdirectories chosen by a stable hash of the user ID, which keeps directory sizes manageable for many users.
+
+    Open `DBManager` instances are kept in an LRU. When more than `max_open` are open, the least recently used
+    ones that are not in use are closed. Managers handed out by `session` are pinned until the block ends, so
+    the limit may be exceeded briefly while more users than `max_open` are being served at the same time.
+    The managers are opened in concurrent mode by default, so a session may be used from several threads at once.
+
+    Attributes:
+        root_dir (str): Directory holding the user databases.
+        shards (int or None): Number of hashed subdirectories, or None to keep all files in `root_dir`.
+        max_open (int): Maximum number of database managers kept open.
+    """
+    def __init__(self, root_dir, shards=None, max_open=32, **db_options):
+        """Initializes the router.
+
+        Args:
+            root_dir (str): Directory holding the user databases; created if it doesn't exist.
+            shards (int): Optional number of hashed subdirectories to spread the user databases over.
+            max_open (int): Maximum number of database managers kept open.
+            **db_options: Keyword arguments passed to every `DBManager`, e.g. `cache=False`; `concurrent`
+                defaults to True.
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.shards = shards
+        self.max_open = max_open
+        self._db_options = {"concurrent": True, **db_options}
+        self._open = OrderedDict()
+        self._pins = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def user_path(self, user_id):
+        """Returns the path of a user's database file.
+
+        Raises:
+            ValueError: If the user ID contains characters other than letters, digits, "_" and "-".
+        """
+        user_id = str(user_id)
+        if not USER_ID_PATTERN.match(user_id):
+            raise ValueError(f"Invalid user ID: {user_id!r}")
+        if self.shards is None:
+            return os.path.join(self.root_dir, f"user_{user_id}.db")
+        shard = int.from_bytes(hashlib.blake2b(user_id.encode(), digest_size=8).digest(), "big") % self.shards
+        return os.path.join(self.root_dir, f"shard_{shard:03d}", f"user_{user_id}.db")
+
+    def _acquire(self, user_id):
+        """Returns the open manager of a user, opening it if needed, and pins it."""
+        path = self.user_path(user_id)
+        with self._lock:
+            db = self._open.get(path)
+            if db is None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                db = DBManager(path, **self._db_options)
+                self._open[path] = db
+            self._open.move_to_end(path)
+            self._pins[path] = self._pins.get(path, 0) + 1
+            self._evict()
+        return path, db
+
+    def _release(self, path):
+        """Unpins a manager and closes managers over the limit."""
+        with self._lock:
+            pins = self._pins.pop(path, 0) - 1
+            if pins > 0:
+                self._pins[path] = pins
+            self._evict()
+
+    def _evict(self):
+        """Closes the least recently used unpinned managers while more than `max_open` are open."""
+        for path in list(self._open):
+            if len(self._open) <= self.max_open:
+                break
+            if path not in self._pins:
+                self._open.pop(path).close_conn(verbose=False)
+
+    @contextmanager
+    def session(self, user_id):
+        """Borrows the database manager of a user, keeping it open for the duration of the block.
+
+        Args:
+            user_id (str or int): The ID of the user.
+
+        Yields:
+            DBManager: The user's database manager.
+        """
+        path, db = self._acquire(user_id)
+        try:
+            yield db
+        finally:
+            self._release(path)
+
+    def call(self, user_id, method, *args, **kwargs):
+        """Runs a single `DBManager` method for a user.
+
+        Args:
+            user_id (str or int): The ID of the user.
+            method (str): Name of the DBManager method, e.g. "fetch_all_habits".
+
+        Returns:
+            The return value of the method.
+        """
+        with self.session(user_id) as db:
+            return getattr(db, method)(*args, **kwargs)
+
+    @property
+    def open_count(self):
+        """Number of database managers currently open."""
+        return len(self._open)
+
+    def close_all(self):
+        """Closes every open database manager."""
+        with self._lock:
+            while self._open:
+                self._open.popitem()[1].close_conn(verbose=False)
+            self._pins.clear()
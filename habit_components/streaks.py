@@ -0,0 +1,159 @@
+from datetime import datetime
+from itertools import chain, groupby
+
+def period_key(day, habit_period):
+    """Returns the integer key of the period containing a day.
+
+    Daily habits use the proleptic Gregorian ordinal of the day itself; weekly habits use the number of its
+    Monday-based calendar week, counted from the week of 0001-01-01. Consecutive periods have consecutive keys,
+    so a streak continues exactly when the next completed period's key is one higher.
+
+    Args:
+        day (int): The date ordinal, as returned by `date.toordinal()`.
+        habit_period (str): The period of the habit (DAILY or WEEKLY).
+
+    Returns:
+        int: The period key.
+    """
+    return (day - 1) // 7 if habit_period == "WEEKLY" else day
+
+
+def is_overdue(last_day, today, habit_period):
+    """Checks whether a habit missed a whole period since its last completion, which breaks its current streak.
+
+    A DAILY habit is overdue from the second day after its last completion and a WEEKLY habit from the second
+    calendar week after it.
+
+    Args:
+        last_day (int): The date ordinal of the last completion.
+        today (int): The date ordinal of the current day.
+        habit_period (str): The period of the habit (DAILY or WEEKLY).
+
+    Returns:
+        bool: True if the current streak of the habit is 0.
+    """
+    return period_key(today, habit_period) - period_key(last_day, habit_period) >= 2
+
+
+def compute_streaks(timestamps, habit_period):
+    """Computes the streak values of a habit from its completion history.
+
+    Completions in the same period (calendar day for daily habits, Monday-based calendar week for weekly habits)
+    count once. A streak continues when the next completion falls in the following period and starts over
+    otherwise.
+
+    Args:
+        timestamps (list): ISO-8601 completion timestamps in chronological order.
+        habit_period (str): The period of the habit (DAILY or WEEKLY).
+
+    Returns:
+        tuple: (current_streak, longest_streak, last_completed_at), where last_completed_at is None if there
+        are no completions.
+    """
+    if not timestamps:
+        return 0, 0, None
+
+    keys = [period_key(datetime.fromisoformat(timestamp).toordinal(), habit_period) for timestamp in timestamps]
+    current_streak, longest_streak = _streaks_from_days(keys, 1)
+    return current_streak, longest_streak, timestamps[-1]
+
+
+def _streaks_from_days(days, max_gap):
+    """Computes (current_streak, longest_streak) from ascending day numbers."""
+    current_streak = longest_streak = 0
+    previous_day = None
+
+    for day in days:
+        if previous_day is not None and day == previous_day:
+            continue
+        if previous_day is not None and day - previous_day <= max_gap:
+            current_streak += 1
+        else:
+            current_streak = 1
+        longest_streak = max(longest_streak, current_streak)
+        previous_day = day
+
+    return current_streak, longest_streak
+
+
+def compute_all_streaks(rows, max_gaps):
+    """Computes the current and longest streak of many habits at once.
+
+    Uses NumPy when it is installed: the rows are loaded into integer arrays, duplicate days are dropped, and
+    streak runs are found with array diffs and run-length logic, so millions of completions are processed in
+    seconds. Without NumPy the same rules are applied habit by habit in Python.
+
+    Args:
+        rows (iterable): (habit_id, number) pairs, grouped by habit and ascending by number within a habit,
+            such as period keys or day ordinals.
+        max_gaps (dict): Maps habit ID to the largest step between numbers that continues its streak, 1 for
+            period keys. Rows of habits missing from this mapping are ignored.
+
+    Returns:
+        dict: Maps each habit ID with at least one completion to a (current_streak, longest_streak) tuple.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return _compute_all_streaks_python(rows, max_gaps)
+
+    data = np.fromiter(chain.from_iterable(rows), dtype=np.int64).reshape(-1, 2)
+    known_ids = np.fromiter(max_gaps.keys(), dtype=np.int64, count=len(max_gaps))
+    data = data[np.isin(data[:, 0], known_ids)]
+    if not len(data):
+        return {}
+    habit_ids, days = data[:, 0], data[:, 1]
+
+    new_habit = np.ones(len(habit_ids), dtype=bool)
+    new_habit[1:] = habit_ids[1:] != habit_ids[:-1]
+    distinct = new_habit.copy()
+    distinct[1:] |= days[1:] != days[:-1]
+    habit_ids, days, new_habit = habit_ids[distinct], days[distinct], new_habit[distinct]
+
+    unique_ids, inverse = np.unique(habit_ids, return_inverse=True)
+    gaps = np.array([max_gaps[habit_id] for habit_id in unique_ids.tolist()], dtype=np.int64)[inverse]
+
+    run_starts = new_habit.copy()
+    run_starts[1:] |= (days[1:] - days[:-1]) > gaps[1:]
+    run_start_index = np.flatnonzero(run_starts)
+    run_lengths = np.diff(np.append(run_start_index, len(days)))
+    run_habits = habit_ids[run_start_index]
+
+    first_run = np.flatnonzero(np.r_[True, run_habits[1:] != run_habits[:-1]])
+    last_run = np.r_[first_run[1:] - 1, len(run_lengths) - 1]
+    longest = np.maximum.reduceat(run_lengths, first_run)
+    current = run_lengths[last_run]
+
+    return dict(zip(run_habits[first_run].tolist(), zip(current.tolist(), longest.tolist())))
+
+
+def _compute_all_streaks_python(rows, max_gaps):
+    """Pure Python fallback of `compute_all_streaks`."""
+    results = {}
+    for habit_id, habit_rows in groupby(rows, key=lambda row: row[0]):
+        if habit_id in max_gaps:
+            results[habit_id] = _streaks_from_days((day for _, day in habit_rows), max_gaps[habit_id])
+    return results
+
+
+def main():
+    """Verifies the stored streaks of a database against its completion history, optionally repairing them."""
+    import argparse
+    from habit_components.db import DBManager
+
+    parser = argparse.ArgumentParser(description="Rebuild habit streaks from the completions log.")
+    parser.add_argument("db_name", nargs="?", default="habit_tracker.db", help="Name of the SQLite database file.")
+    parser.add_argument("--apply", action="store_true", help="Overwrite streak values that drifted.")
+    args = parser.parse_args()
+
+    db = DBManager(args.db_name)
+    mismatches = db.verify_streaks(apply=args.apply)
+    for habit_id, stored, rebuilt in mismatches:
+        print(f"Habit {habit_id}: stored {stored} -> rebuilt {rebuilt}")
+    action = "Repaired" if args.apply else "Found"
+    print(f"{action} {len(mismatches)} habit(s) with drifted streaks.")
+    db.close_conn()
+
+
+if __name__ == "__main__":
+    main()
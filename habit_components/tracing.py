@@ -0,0 +1,267 @@
+import functools
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from habit_components.habit import TIMESTAMP_FORMAT
+
+# Upper bounds in milliseconds of the latency histogram buckets; the last bucket holds everything slower.
+HISTOGRAM_BOUNDS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+# Statements that `EXPLAIN QUERY PLAN` can describe.
+EXPLAINABLE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|REPLACE|WITH)\b", re.IGNORECASE)
+
+
+class LatencyStats:
+    """Call count, total and maximum time, and a latency histogram of one method or statement."""
+    __slots__ = ("count", "total_ms", "max_ms", "rows", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def add(self, elapsed_ms, rows=0):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.rows += rows
+        bucket = next((i for i, bound in enumerate(HISTOGRAM_BOUNDS_MS) if elapsed_ms <= bound),
+                      len(HISTOGRAM_BOUNDS_MS))
+        self.histogram[bucket] += 1
+
+    def percentile(self, fraction):
+        """Estimates a latency percentile as the upper bound of the histogram bucket it falls in."""
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(HISTOGRAM_BOUNDS_MS, self.histogram):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
+class QueryTracer:
+    """Opt-in instrumentation of the queries and commits run by a `DBManager`.
+
+    Pass a tracer to `DBManager(tracer=...)` to record every statement with its SQL, number of bound
+    parameters, rows returned and elapsed time, including the time spent fetching rows. Statements are
+    attributed to the outermost public `DBManager` method that ran them, and every method keeps a latency
+    histogram. Statements slower than `slow_ms` are written to the slow-query log with their
+    `EXPLAIN QUERY PLAN` output.
+
+    Attributes:
+        slow_ms (float): Threshold in milliseconds above which a statement is logged as slow.
+        slow_log (file object or None): Stream the slow-query log is written to.
+        methods (dict): Maps DBManager method name to its LatencyStats.
+        statements (dict): Maps normalized SQL to its LatencyStats.
+        slow_queries (list): (method, sql, elapsed_ms, plan) tuples of the slow statements.
+    """
+    def __init__(self, slow_ms=50, slow_log=None):
+        self.slow_ms = slow_ms
+        self.slow_log = slow_log
+        self.methods = {}
+        self.statements = {}
+        self.slow_queries = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def current_method(self):
+        """Returns the name of the DBManager method running on this thread, or "<direct>" outside one."""
+        return getattr(self._local, "method", None) or "<direct>"
+
+    def wrap_method(self, name, method):
+        """Wraps a bound DBManager method so its calls are timed and statements attributed to it.
+
+        Nested calls of other public methods are attributed to the outermost one.
+        """
+        @functools.wraps(method)
+        def traced(*args, **kwargs):
+            if getattr(self._local, "method", None):
+                return method(*args, **kwargs)
+            self._local.method = name
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                self._local.method = None
+                with self._lock:
+                    self.methods.setdefault(name, LatencyStats()).add(elapsed_ms)
+        return traced
+
+    def record(self, conn, sql, params, rows, elapsed_ms):
+        """Records one finished statement and logs it if it was slow.
+
+        Args:
+            conn (sqlite3.Connection): The connection that ran the statement, used for `EXPLAIN QUERY PLAN`.
+            sql (str): The statement.
+            params (tuple or dict): Parameters bound to the statement, for executemany the first set.
+            rows (int): Number of rows fetched.
+            elapsed_ms (float): Time spent executing and fetching, in milliseconds.
+        """
+        normalized = " ".join(sql.split())
+        method = self.current_method()
+        with self._lock:
+            self.statements.setdefault(normalized, LatencyStats()).add(elapsed_ms, rows)
+        if elapsed_ms < self.slow_ms:
+            return
+
+        plan = self.explain(conn, sql, params)
+        with self._lock:
+            self.slow_queries.append((method, normalized, elapsed_ms, plan))
+            if self.slow_log is not None:
+                binds = len(params) if params else 0
+                self.slow_log.write(f"{datetime.now().strftime(TIMESTAMP_FORMAT)} {elapsed_ms:.1f} ms {method} "
+                                    f"rows={rows} binds={binds}\n  {normalized}\n")
+                for line in plan:
+                    self.slow_log.write(f"    {line}\n")
+                self.slow_log.flush()
+
+    @staticmethod
+    def explain(conn, sql, params):
+        """Returns the `EXPLAIN QUERY PLAN` lines of a statement, or an empty list if it has no plan."""
+        if not EXPLAINABLE.match(sql):
+            return []
+        try:
+            rows = conn.cursor(sqlite3.Cursor).execute(f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()
+        except sqlite3.Error as e:
+            return [f"(no plan: {e})"]
+        depth = {0: 0}
+        lines = []
+        for node_id, parent_id, _, detail in rows:
+            depth[node_id] = depth.get(parent_id, 0) + 1
+            lines.append("  " * (depth[node_id] - 1) + detail)
+        return lines
+
+    def summary(self, top=10):
+        """Formats the per-method latencies, the most expensive statements and the slow queries as text."""
+        lines = ["DBManager methods:",
+                 f"  {'method':<34} {'calls':>7} {'total ms':>10} {'mean ms':>9} {'p95 ms':>8} {'max ms':>8}"]
+        for name, stats in sorted(self.methods.items(), key=lambda item: -item[1].total_ms):
+            lines.append(f"  {name:<34} {stats.count:>7} {stats.total_ms:>10.2f} {stats.total_ms / stats.count:>9.3f} "
+                         f"{stats.percentile(0.95):>8.2f} {stats.max_ms:>8.2f}")
+
+        lines += ["", f"Top {top} statements by total time:"]
+        for sql, stats in sorted(self.statements.items(), key=lambda item: -item[1].total_ms)[:top]:
+            lines.append(f"  {stats.total_ms:>9.2f} ms  {stats.count:>6}x  {stats.rows:>8} rows  {sql[:100]}")
+
+        lines += ["", f"Slow queries (>= {self.slow_ms} ms): {len(self.slow_queries)}"]
+        for method, sql, elapsed_ms, plan in self.slow_queries[:top]:
+            lines.append(f"  {elapsed_ms:>9.2f} ms  {method}: {sql[:100]}")
+            lines.extend(f"      {line}" for line in plan)
+        return "\n".join(lines)
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement, including the rows fetched from it, to the connection's tracer."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending = None
+
+    def _start(self, sql, params):
+        self._finish()
+        self._pending = [sql, params, 0, 0.0]
+
+    def _add(self, rows, elapsed):
+        if self._pending is not None:
+            self._pending[2] += rows
+            self._pending[3] += elapsed
+
+    def _finish(self):
+        if getattr(self, "_pending", None) is not None:
+            sql, params, rows, elapsed = self._pending
+            self._pending = None
+            self.connection.tracer.record(self.connection, sql, params, rows, elapsed * 1000)
+
+    def execute(self, sql, params=()):
+        self._start(sql, params)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, params)
+        finally:
+            self._add(0, time.perf_counter() - start)
+            if self.description is None:
+                self._finish()
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = iter(seq_of_params)
+        first = next(seq_of_params, None)
+        self._start(sql, first)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, [] if first is None else _prepend(first, seq_of_params))
+        finally:
+            self._add(0, time.perf_counter() - start)
+            self._finish()
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._add(row is not None, time.perf_counter() - start)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._add(len(rows), time.perf_counter() - start)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._add(len(rows), time.perf_counter() - start)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._add(0, time.perf_counter() - start)
+            self._finish()
+            raise
+        self._add(1, time.perf_counter() - start)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+
+def _prepend(first, rest):
+    """Yields `first` followed by the items of `rest`."""
+    yield first
+    yield from rest
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors and commits are reported to `tracer`."""
+    tracer = None
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            self.tracer.record(self, "COMMIT", (), 0, (time.perf_counter() - start) * 1000)
@@ -10,6 +10,9 @@ setup(
         "pytest>=8.3.5"
         "questionary>=2.1.0"
     ],
+    extras_require={
+        "fast": ["numpy>=1.22"]
+    },
 entry_points={
     "console_scripts": [
         "habit_tracker=cli:main"
@@ -1,14 +1,18 @@
+import os
+from datetime import date
 import habit_components.analytics
+from habit_components.db import DBManager
+from habit_components.habit import HabitRecord
 
 class TestAnalytics:
     """Tests all the methods inside the analytics module."""
 
     def setup_method(self):
         self.sample_habits = [
-            (1, "Limit device usage", "DAILY", "NEGATIVE", "", "", 3, 5, 1),
-            (2, "Workout", "WEEKLY", "POSITIVE", "", "", 1, 2, 1),
-            (3, "Deep cleaning", "WEEKLY", "POSITIVE", "", "", 0, 1, 1),
-            (4, "Read", "DAILY", "POSITIVE","", "", 0, 3, 0)
+            HabitRecord(1, "Limit device usage", "DAILY", "NEGATIVE", "", "", 3, 5, 1),
+            HabitRecord(2, "Workout", "WEEKLY", "POSITIVE", "", "", 1, 2, 1),
+            HabitRecord(3, "Deep cleaning", "WEEKLY", "POSITIVE", "", "", 0, 1, 1),
+            HabitRecord(4, "Read", "DAILY", "POSITIVE","", "", 0, 3, 0)
         ]
 
     def test_get_habits_by_period(self):
@@ -59,4 +63,77 @@ class TestAnalytics:
         assert result is not None
         assert result[1] == "Limit device usage"
         assert result[7] == 5
-        
\ No newline at end of file
+
+
+class TestAnalyticsQueries:
+    """Tests that the SQL-backed analytics return the same results as the list-based functions."""
+
+    def setup_method(self):
+        self.db_name = "test_habit_tracker.db"
+        self.db = DBManager(db_name=self.db_name)
+        self.db.cursor.execute("DELETE FROM completions")
+        self.db.cursor.execute("DELETE FROM habits")
+        self.db.cursor.executemany('''
+            INSERT INTO habits (id, name, habit_period, habit_type, created_at, last_completed_at, current_streak, longest_streak, is_active)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (1, "Limit device usage", "DAILY", "NEGATIVE", "", "", 3, 5, 1),
+            (2, "Workout", "WEEKLY", "POSITIVE", "", "", 1, 2, 1),
+            (3, "Deep cleaning", "WEEKLY", "POSITIVE", "", "", 0, 5, 1),
+            (4, "Read", "DAILY", "POSITIVE", "", "", 0, 9, 0)
+        ])
+        self.db.is_conn.commit()
+        self.habits = self.db.fetch_all_habits()
+
+    def test_filters_match_list_functions(self):
+        analytics = habit_components.analytics
+        for period in ("Daily", "weekly"):
+            assert analytics.get_habits_by_period(self.db, period) == analytics.get_habits_by_period(self.habits, period)
+        for habit_type in ("Positive", "NEGATIVE"):
+            assert analytics.get_habits_by_type(self.db, habit_type) == analytics.get_habits_by_type(self.habits, habit_type)
+        assert analytics.get_current_streaks(self.db) == analytics.get_current_streaks(self.habits)
+        assert analytics.get_all_active_habits(self.db) == analytics.get_all_active_habits(self.habits)
+
+    def test_longest_streak_excludes_archived(self):
+        result = habit_components.analytics.list_habits_by_longest_streak(self.db)
+
+        assert [h[1] for h in result] == ["Limit device usage", "Deep cleaning"]
+        assert [h[0] for h in self.db.fetch_top_streaks(2)] in ([1, 3], [3, 1])
+
+    def test_get_longest_streak_for_name(self):
+        result = habit_components.analytics.get_longest_streak_for_name(self.db, "WORKOUT")
+
+        assert result == habit_components.analytics.get_longest_streak_for_name(self.habits, "workout")
+        assert habit_components.analytics.get_longest_streak_for_name(self.db, "Read") is None
+        assert self.db.has_active_habits() is True
+
+    def test_completion_heatmap(self):
+        analytics = habit_components.analytics
+        self.db.cursor.execute("DELETE FROM completion_rollups")
+        self.db.is_conn.commit()
+        self.db.insert_habit_completions([
+            (1, "2025-01-06 08:00:00"), (1, "2025-01-13 20:00:00"),  # Mondays
+            (1, "2025-01-08 08:00:00"),  # Wednesday
+            (1, "2025-02-16 08:00:00"),  # Sunday
+            (1, "2024-06-30 08:00:00"),  # before the heatmap
+            (2, "2025-01-07 08:00:00"),  # another habit
+        ], recompute_streaks=False)
+
+        heatmap = analytics.get_completion_heatmap(self.db, 1, months=3, today=date(2025, 2, 28))
+
+        assert (heatmap["start"], heatmap["end"]) == (date(2024, 11, 29), date(2025, 2, 28))
+        assert heatmap["days"] == {date(2025, 1, 6): 1, date(2025, 1, 8): 1, date(2025, 1, 13): 1,
+                                   date(2025, 2, 16): 1}
+        assert heatmap["weekdays"] == [2, 0, 1, 0, 0, 0, 1]
+        assert heatmap["total"] == 4
+
+        lines = analytics.format_heatmap(heatmap).splitlines()
+        assert lines[0].split() == ["Nov", "Jan", "Feb"]  # "Dec" would overlap "Nov"
+        assert lines[1].startswith("Mon") and lines[1].count("█") == 2
+        assert lines[3].startswith("Wed") and lines[3].count("█") == 1
+        assert "4 completions from 2024-11-29 to 2025-02-28, by weekday:" in lines
+
+    def teardown_method(self):
+        self.db.close_conn()
+        if os.path.exists(self.db_name):
+            os.remove(self.db_name)
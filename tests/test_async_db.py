@@ -0,0 +1,67 @@
+import asyncio
+import os
+import threading
+from habit_components.async_db import AsyncDBManager
+from habit_components.habit import HabitPeriod, HabitType
+
+
+class TestAsyncDBManager:
+    """Tests the asyncio facade over the DBManager class."""
+
+    def setup_method(self):
+        self.db_name = "test_async_habit_tracker.db"
+
+    def _run(self, test):
+        async def main():
+            async with AsyncDBManager(self.db_name, max_readers=3) as adb:
+                return await test(adb)
+        return asyncio.run(main())
+
+    def test_concurrent_creates_and_completions(self):
+        async def test(adb):
+            habit_ids = await asyncio.gather(*(
+                adb.create_habit(f"Habit {i}", "DAILY" if i % 2 else HabitPeriod.WEEKLY, HabitType.POSITIVE)
+                for i in range(50)))
+            results = await asyncio.gather(*(adb.complete_habit(habit_id) for habit_id in habit_ids))
+            habits = await adb.fetch_all_habits()
+            weekly = await adb.get_habits_by_period("weekly")
+            return habit_ids, results, habits, weekly
+
+        habit_ids, results, habits, weekly = self._run(test)
+
+        assert sorted(habit_ids) == [h.id for h in habits]
+        assert all(result["new_streak"] == 1 for result in results)
+        assert all(h.current_streak == 1 for h in habits)
+        assert len(weekly) == 25
+
+    def test_reads_run_in_parallel_and_writes_are_serialized(self):
+        threads = {"read": set(), "write": set()}
+
+        async def test(adb):
+            habit_id = await adb.create_habit("Read a book", "DAILY", "POSITIVE")
+            barrier = threading.Barrier(3, timeout=5)
+
+            def blocking_read():
+                barrier.wait()
+                threads["read"].add(threading.current_thread().name)
+                return adb.db.fetch_habit_by_id(habit_id)
+
+            reads = await asyncio.gather(*(adb._read(blocking_read) for _ in range(3)))
+            await asyncio.gather(adb.update_habit(habit_id, "Read two books", "DAILY", "POSITIVE"),
+                                 adb._write(lambda: threads["write"].add(threading.current_thread().name)),
+                                 adb.archive_habit(habit_id))
+            return reads, await adb.fetch_all_habits(include_archived=True), await adb.has_active_habits()
+
+        reads, habits, has_active = self._run(test)
+
+        assert len(threads["read"]) == 3
+        assert len(threads["write"]) == 1
+        assert all(read.name == "Read a book" for read in reads)
+        assert [(h.name, h.is_active) for h in habits] == [("Read two books", 0)]
+        assert has_active is False
+
+    def teardown_method(self):
+        for suffix in ("", "-wal", "-shm"):
+            path = os.path.join(os.path.dirname(os.path.dirname(__file__)), self.db_name + suffix)
+            if os.path.exists(path):
+                os.remove(path)
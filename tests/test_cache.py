@@ -0,0 +1,75 @@
+import os
+import sqlite3
+from habit_components.db import DBManager
+from habit_components.habit import Habit, HabitPeriod, HabitType
+
+
+class TestHabitCache:
+    """Tests the session cache of habit records in front of the DBManager class."""
+
+    def setup_method(self):
+        self.db_name = "test_habit_tracker.db"
+        self.db = DBManager(db_name=self.db_name)
+        self.db.cursor.execute("DELETE FROM completions")
+        self.db.cursor.execute("DELETE FROM habits")
+        self.db.is_conn.commit()
+        self.db.insert_habit_info(Habit("Read a book", HabitPeriod.DAILY, HabitType.POSITIVE))
+        self.db.insert_habit_info(Habit("Deep cleaning", HabitPeriod.WEEKLY, HabitType.POSITIVE))
+
+    def test_repeated_reads_use_cache(self):
+        first = self.db.fetch_all_habits()
+        version = self.db.cache.version
+
+        assert self.db.fetch_all_habits() == first
+        assert self.db.fetch_habit_by_id(first[0][0]) == first[0]
+        assert self.db.cache.version == version
+
+    def test_writes_patch_cache(self):
+        habit_id = self.db.fetch_all_habits()[0][0]
+        self.db.change_habit_info(habit_id, "Read two books", HabitPeriod.DAILY, HabitType.POSITIVE)
+        self.db.insert_habit_completion(habit_id)
+        self.db.insert_habit_info(Habit("Workout", HabitPeriod.WEEKLY, HabitType.POSITIVE))
+        self.db.archive_habit_info(habit_id + 1)
+
+        assert self.db.cache.loaded
+        assert [h[1] for h in self.db.fetch_all_habits()] == ["Read two books", "Workout"]
+        assert self.db.fetch_habit_by_id(habit_id)[6] == 1
+        assert self.db.fetch_all_habits() == self.db.cursor.execute("SELECT * FROM habits WHERE is_active = 1 ORDER BY id").fetchall()
+
+        self.db.delete_habit_info(habit_id)
+        assert self.db.fetch_habit_by_id(habit_id) is None
+
+    def test_raw_write_invalidates_cache(self):
+        self.db.fetch_all_habits()
+        self.db.cursor.execute("UPDATE habits SET is_active = 0")
+        self.db.is_conn.commit()
+
+        assert self.db.fetch_all_habits() == []
+
+    def test_transaction_write_clears_cache(self):
+        self.db.fetch_all_habits()
+        with self.db.transaction() as cursor:
+            cursor.execute("UPDATE habits SET name = 'Renamed'")
+
+        assert [h[1] for h in self.db.fetch_all_habits()] == ["Renamed", "Renamed"]
+
+    def test_other_connection_invalidates_cache(self):
+        self.db.fetch_all_habits()
+        other = sqlite3.connect(self.db.db_path)
+        other.execute("UPDATE habits SET name = 'Changed elsewhere' WHERE habit_period = 'DAILY'")
+        other.commit()
+        other.close()
+
+        assert self.db.fetch_all_habits()[0][1] == "Changed elsewhere"
+
+    def test_cache_disabled(self):
+        db = DBManager(db_name=self.db_name, cache=False)
+
+        assert db.cache is None
+        assert len(db.fetch_all_habits()) == 2
+        db.close_conn()
+
+    def teardown_method(self):
+        self.db.close_conn()
+        if os.path.exists(self.db_name):
+            os.remove(self.db_name)
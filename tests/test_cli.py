@@ -1,8 +1,11 @@
 import os
+import subprocess
+import sys
 import pytest
 from unittest.mock import patch, MagicMock
 import cli
 from habit_components.habit_tracker import HabitTracker
+from habit_components.habit import HabitRecord
 
 @pytest.fixture(autouse=True)
 def disable_prompt_toolkit_console():
@@ -22,6 +25,12 @@ class TestCLI:
         self.tracker.db.cursor.execute("DELETE FROM completions")
         self.tracker.db.cursor.execute("DELETE FROM habits")
         self.tracker.db.is_conn.commit()
+        self.trackers = [self.tracker]
+
+    def _test_tracker(self, tracer=None):
+        """Stands in for the HabitTracker built by cli.main, so the menu runs against the test database."""
+        self.trackers.append(HabitTracker(db_name=self.db_name, test_mode=True, tracer=tracer))
+        return self.trackers[-1]
 
     @patch("cli.confirm")
     @patch("cli.select")
@@ -29,8 +38,8 @@ class TestCLI:
         mock_select.return_value.ask.side_effect = ["Exit"]
         mock_confirm.return_value.ask.return_value = True
 
-        with patch("builtins.print") as mock_print:
-            cli.main()
+        with patch("builtins.print") as mock_print, patch("cli.HabitTracker", side_effect=self._test_tracker):
+            cli.main([])
 
         mock_print.assert_any_call("Thank you for using the Habit Tracker App! Goodbye!")
 
@@ -48,7 +57,7 @@ class TestCLI:
 
         with patch("cli.confirm") as mock_confirm:
             mock_confirm.return_value.ask.return_value = True
-            cli.main()
+            cli.main([])
 
         assert mock_tracker.create_habit.called
 
@@ -61,7 +70,7 @@ class TestCLI:
 
         # Mock a valid habits list (tuple format from the DB)
         mock_tracker.db.fetch_all_habits.return_value = [
-            (1, "Test Habit", "DAILY", "POSITIVE", "", "", 1, 3, 1)
+            HabitRecord(1, "Test Habit", "DAILY", "POSITIVE", "", "", 1, 3, 1)
         ]
 
         # Enough select inputs to enter and then exit
@@ -74,7 +83,7 @@ class TestCLI:
         ]
         mock_confirm.return_value.ask.return_value = True
 
-        cli.main()
+        cli.main([])
 
         assert mock_tracker.view_habits.called
 
@@ -93,12 +102,12 @@ class TestCLI:
         mock_tracker_class.return_value = mock_tracker
 
         mock_tracker.db.fetch_all_habits.return_value = [
-            (1, "Test Habit", "DAILY", "POSITIVE", "", "", 2, 5, 1)
+            HabitRecord(1, "Test Habit", "DAILY", "POSITIVE", "", "", 2, 5, 1)
         ]
 
         # ✅ Return a list of habits
         mock_list_longest_streak.return_value = [
-            (1, "Test Habit", "DAILY", "POSITIVE", "", "", 2, 5, 1)
+            HabitRecord(1, "Test Habit", "DAILY", "POSITIVE", "", "", 2, 5, 1)
         ]
 
         mock_select.return_value.ask.side_effect = [
@@ -109,11 +118,35 @@ class TestCLI:
         mock_confirm.return_value.ask.return_value = True
 
         with patch("builtins.print") as mock_print:
-            cli.main()
+            cli.main([])
 
         mock_print.assert_any_call("1. Test Habit — 🔥 5 days")
 
+    @patch("cli.confirm")
+    @patch("cli.select")
+    def test_profile_prints_summary(self, mock_select, mock_confirm):
+        mock_select.return_value.ask.side_effect = ["Exit"]
+        mock_confirm.return_value.ask.return_value = True
+
+        with patch("builtins.print") as mock_print, patch("cli.HabitTracker", side_effect=self._test_tracker):
+            cli.main(["--profile"])
+
+        assert "DBManager methods:" in mock_print.call_args.args[0]
+        assert self.trackers[-1].tracer is not None
+
+    def test_unknown_flag_is_rejected(self):
+        with pytest.raises(SystemExit), patch("sys.stderr"):
+            cli.main(["--profil"])
+
+    def test_import_does_not_load_prompt_toolkit(self):
+        check = "import sys, cli; print('questionary' in sys.modules or 'prompt_toolkit' in sys.modules)"
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, "-c", check], cwd=root, capture_output=True, text=True)
+
+        assert result.stdout.strip() == "False"
+
     def teardown_method(self):
-        self.tracker.db.close_conn()
+        for tracker in self.trackers:
+            tracker.db.close_conn()
         if os.path.exists(self.db_name):
             os.remove(self.db_name)
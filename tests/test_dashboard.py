@@ -0,0 +1,67 @@
+import os
+from datetime import date
+from unittest.mock import patch
+from habit_components.dashboard import HabitDashboard
+from habit_components.db import DBManager
+from habit_components.habit import Habit, HabitPeriod, HabitType
+
+TODAY = date(2025, 6, 4)  # a Wednesday
+
+
+class TestHabitDashboard:
+    """Tests the habit list snapshot used by the view habits menu."""
+
+    def setup_method(self):
+        self.db_name = "test_dashboard_habit_tracker.db"
+        self.db = DBManager(db_name=self.db_name)
+        self.db.insert_habits([
+            Habit("Read", HabitPeriod.DAILY, HabitType.POSITIVE, last_completed_at="2025-06-04 08:00:00",
+                  current_streak=2),
+            Habit("Clean", HabitPeriod.WEEKLY, HabitType.POSITIVE, last_completed_at="2025-06-02 08:00:00",
+                  current_streak=1),
+            Habit("Walk", HabitPeriod.DAILY, HabitType.POSITIVE),
+        ])
+        self.read, self.clean, self.walk = (h.id for h in self.db.fetch_all_habits())
+
+    def test_snapshot_uses_one_day(self):
+        dashboard = HabitDashboard(self.db, today=TODAY)
+
+        assert dashboard.choices() == ["[1] ✅ Read - Daily, Positive", "[2] ✅ Clean - Weekly, Positive",
+                                       "[3] 🔲 Walk - Daily, Positive"]
+        assert dashboard.habit_at(3) == (self.db.fetch_habit_by_id(self.walk), False)
+        assert not HabitDashboard(self.db, today=date(2025, 6, 9)).habit_at(2)[1]
+
+    def test_missed_streaks_are_reset_once(self):
+        dashboard = HabitDashboard(self.db)
+
+        assert sorted(name for _, name, _, _ in dashboard.missed) == ["Clean", "Read"]
+        assert [habit.current_streak for habit, _, _ in dashboard.rows.values()] == [0, 0, 0]
+
+    def test_refresh_patches_only_the_changed_habit(self):
+        dashboard = HabitDashboard(self.db)
+        with patch.object(self.db, "fetch_all_habits") as fetch_all_habits, \
+                patch.object(self.db, "is_habit_completed", wraps=self.db.is_habit_completed) as is_completed:
+            self.db.insert_habit_completion(self.walk)
+            dashboard.refresh(self.walk)
+            self.db.archive_habit_info(self.clean)
+            dashboard.refresh(self.clean)
+
+        assert not fetch_all_habits.called
+        assert is_completed.call_count == 1
+        assert dashboard.choices() == ["[1] 🔲 Read - Daily, Positive", "[2] ✅ Walk - Daily, Positive"]
+
+        self.db.delete_habit_info(self.read)
+        dashboard.refresh(self.read)
+        assert dashboard.ids == [self.walk]
+        assert dashboard.habit_at(1)[0].id == self.walk
+
+        self.db.unarchive_habit_info(self.clean)
+        dashboard.refresh(self.clean)
+        assert dashboard.ids == [self.clean, self.walk]
+        assert dashboard.habit_at(1)[0].id == self.clean
+        assert dashboard.choices()[1] == "[2] ✅ Walk - Daily, Positive"
+
+    def teardown_method(self):
+        self.db.close_conn()
+        if os.path.exists(self.db.db_path):
+            os.remove(self.db.db_path)
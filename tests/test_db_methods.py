@@ -1,7 +1,11 @@
 import os
+import sqlite3
+import threading
+import pytest
+from unittest.mock import patch
 from datetime import datetime, timedelta
-from habit_components.db import DBManager
-from habit_components.habit import Habit, HabitPeriod, HabitType
+from habit_components.db import DBManager, SCHEMA_VERSION
+from habit_components.habit import Habit, HabitPeriod, HabitRecord, HabitType, TIMESTAMP_FORMAT
 
 class TestDBManager:
     """Tests all the methods found in the DBManager class."""
@@ -23,6 +27,28 @@ class TestDBManager:
         assert results[0][2] == "DAILY"
         assert results[0][3] == "POSITIVE"
 
+    def test_no_ddl_when_schema_current(self):
+        with patch.object(DBManager, "create_tables") as mock_create_tables:
+            DBManager(db_name=self.db_name).is_conn.close()
+        assert not mock_create_tables.called
+
+        self.db.cursor.execute('PRAGMA user_version = 1')
+        self.db.is_conn.commit()
+        reopened = DBManager(db_name=self.db_name)
+        assert reopened.cursor.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+        reopened.is_conn.close()
+
+    def test_fetch_returns_habit_records(self):
+        habit = Habit("Typed Habit", HabitPeriod.WEEKLY, HabitType.NEGATIVE)
+        self.db.insert_habit_info(habit)
+
+        record = self.db.fetch_all_habits()[0]
+        assert isinstance(record, HabitRecord)
+        assert (record.name, record.habit_period, record.habit_type, record.is_active) == ("Typed Habit", "WEEKLY", "NEGATIVE", 1)
+        assert record == self.db.fetch_habit_by_id(record.id)
+        assert not hasattr(record, "__dict__")
+        assert not hasattr(habit, "__dict__")
+
     def test_change_habit_info(self):
         habit = Habit("Old Habit", HabitPeriod.DAILY, HabitType.POSITIVE)
         self.db.insert_habit_info(habit)
@@ -53,6 +79,84 @@ class TestDBManager:
         deleted = self.db.fetch_habit_by_id(habit_id)
         assert deleted is None
 
+    def test_archive_moves_history_to_cold_storage(self):
+        self.db.insert_habit_info(Habit("Cold", HabitPeriod.DAILY, HabitType.POSITIVE))
+        self.db.insert_habit_info(Habit("Hot", HabitPeriod.DAILY, HabitType.POSITIVE))
+        cold_id, hot_id = [h[0] for h in self.db.fetch_all_habits()]
+        self.db.insert_habit_completions([(cold_id, f"2025-01-{day:02d} 08:00:00") for day in (1, 2, 3)] +
+                                         [(hot_id, "2025-01-02 09:00:00")])
+        exported = list(self.db.iter_completions())
+        history = self.db.fetch_habit_completions(cold_id)
+
+        self.db.archive_habit_info(cold_id)
+
+        assert self.db.cursor.execute("SELECT habit_id, COUNT(*) FROM completions GROUP BY habit_id").fetchall() == [
+            (hot_id, 1)]
+        assert self.db.fetch_habit_completions(cold_id) == history
+        assert list(self.db.iter_completions()) == [row for row in exported if row[1] == hot_id] + [
+            row for row in exported if row[1] == cold_id]
+        assert sorted(self.db.iter_completions(start="2025-01-02", end="2025-01-02")) == [
+            row for row in exported if row[2].startswith("2025-01-02")]
+        assert [h.id for h in self.db.fetch_all_habits(include_archived=True)] == [cold_id, hot_id]
+        assert self.db.fetch_completion_counts(cold_id)[0] == ("2025-01-01", 1)
+        assert self.db.verify_streaks() == []
+
+        self.db.unarchive_habit_info(cold_id)
+
+        assert list(self.db.iter_completions()) == exported
+        assert self.db.cursor.execute("SELECT COUNT(*) FROM archived_completions").fetchone()[0] == 0
+        assert self.db.insert_habit_completions([(cold_id, "2025-01-03 20:00:00")])[cold_id]["longest_streak"] == 3
+
+    def test_cold_storage_merges_and_keeps_conflicts(self):
+        self.db.insert_habit_info(Habit("Revived", HabitPeriod.DAILY, HabitType.POSITIVE))
+        habit_id = self.db.fetch_all_habits()[0][0]
+        self.db.insert_habit_completions([(habit_id, "2025-01-01 08:00:00"), (habit_id, "2025-01-02 08:00:00")])
+        self.db.archive_habit_info(habit_id)
+        self.db.insert_habit_completions([(habit_id, "2025-01-02 20:00:00"), (habit_id, "2025-01-03 08:00:00")])
+
+        assert self.db.move_archived_to_cold_storage() == 1
+        assert self.db.fetch_habit_completions(habit_id) == [
+            ("2025-01-01 08:00:00",), ("2025-01-02 08:00:00",), ("2025-01-02 20:00:00",), ("2025-01-03 08:00:00",)]
+
+        self.db.unarchive_habit_info(habit_id)
+
+        assert self.db.cursor.execute("SELECT completed_at, period_key IS NULL FROM completions ORDER BY completed_at"
+                                      ).fetchall() == [("2025-01-01 08:00:00", 0), ("2025-01-02 08:00:00", 0),
+                                                       ("2025-01-02 20:00:00", 1), ("2025-01-03 08:00:00", 0)]
+        assert self.db.fetch_completion_counts(habit_id) == [("2025-01-01", 1), ("2025-01-02", 2), ("2025-01-03", 1)]
+
+    def test_archived_history_counts_toward_streaks(self):
+        self.db.insert_habit_info(Habit("Dormant", HabitPeriod.DAILY, HabitType.POSITIVE))
+        habit_id = self.db.fetch_all_habits()[0][0]
+        start = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0) - timedelta(days=5)
+        self.db.insert_habit_completions([(habit_id, start + timedelta(days=i)) for i in range(5)])
+        self.db.archive_habit_info(habit_id)
+        streaks = self.db.fetch_habit_by_id(habit_id)[5:8]
+        assert streaks[1:] == (5, 5)
+
+        self.db.change_habit_info(habit_id, "Dormant", HabitPeriod.WEEKLY, HabitType.POSITIVE)
+        assert self.db.fetch_habit_by_id(habit_id)[5] == streaks[0]
+        self.db.change_habit_info(habit_id, "Dormant", HabitPeriod.DAILY, HabitType.POSITIVE)
+        assert self.db.fetch_habit_by_id(habit_id)[5:8] == streaks
+
+        self.db.insert_habit_completions([(habit_id, start - timedelta(days=3))])
+        assert self.db.fetch_habit_by_id(habit_id)[5:8] == streaks
+        self.db.move_archived_to_cold_storage()
+
+        self.db.unarchive_habit_info(habit_id)
+        assert self.db.fetch_habit_by_id(habit_id)[5:8] == streaks
+
+        self.db.insert_habit_info(Habit("Lapsed", HabitPeriod.DAILY, HabitType.POSITIVE))
+        lapsed_id = self.db.fetch_habit_by_name("Lapsed").id
+        self.db.archive_habit_info(lapsed_id)
+        self.db.insert_habit_completions([(lapsed_id, f"2025-01-{day:02d} 08:00:00") for day in range(1, 4)])
+        self.db.move_archived_to_cold_storage()
+        assert self.db.fetch_habit_by_id(lapsed_id)[5:8] == ("2025-01-03 08:00:00", 3, 3)
+
+        self.db.unarchive_habit_info(lapsed_id)
+        assert self.db.fetch_habit_by_id(lapsed_id)[5:8] == ("2025-01-03 08:00:00", 0, 3)
+        assert self.db.verify_streaks() == []
+
     def test_insert_habit_completion_and_streak(self):
         habit = Habit("Daily Test", HabitPeriod.DAILY, HabitType.POSITIVE)
         self.db.insert_habit_info(habit)
@@ -63,16 +167,91 @@ class TestDBManager:
         assert result_1["new_streak"] == 1
         assert not result_1["streak_broken"]
 
-        yesterday = (datetime.now() - timedelta(days=1)).strftime("%b %d, %Y at %H:%M")
+        yesterday = (datetime.now() - timedelta(days=1)).strftime(TIMESTAMP_FORMAT)
         self.db.cursor.execute("UPDATE habits SET last_completed_at = ? WHERE id = ?", (yesterday, habit_id))
+        self.db.cursor.execute("UPDATE completions SET completed_at = ?, period_key = period_key - 1", (yesterday,))
         self.db.is_conn.commit()
         
         result_2 = self.db.insert_habit_completion(habit_id)
         assert result_2 is not None, "insert_habit_completion returned None"
         assert result_2["new_streak"] == 2
+        assert not result_2["already_completed"]
+
+    def test_completion_is_idempotent_per_period(self):
+        self.db.insert_habit_info(Habit("Once Daily", HabitPeriod.DAILY, HabitType.POSITIVE))
+        habit_id = self.db.fetch_all_habits()[0][0]
+
+        assert self.db.insert_habit_completion(habit_id)["already_completed"] is False
+        again = self.db.insert_habit_completion(habit_id)
+
+        assert again == {"new_streak": 1, "streak_broken": False, "already_completed": True}
+        assert len(self.db.fetch_habit_completions(habit_id)) == 1
+        assert self.db.fetch_completion_counts(habit_id)[-1][1] == 1
+        with pytest.raises(sqlite3.IntegrityError):
+            self.db.cursor.execute("INSERT INTO completions (habit_id, completed_at, period_key) "
+                                   "SELECT habit_id, completed_at, period_key FROM completions")
+
+    def test_weekly_streaks_follow_calendar_weeks(self):
+        self.db.insert_habit_info(Habit("Calendar Weekly", HabitPeriod.WEEKLY, HabitType.POSITIVE))
+        habit_id = self.db.fetch_all_habits()[0][0]
+
+        result = self.db.insert_habit_completions([
+            (habit_id, "2025-01-06 08:00:00"),  # Monday
+            (habit_id, "2025-01-12 20:00:00"),  # Sunday of the same week, skipped
+            (habit_id, "2025-01-19 08:00:00"),  # Sunday of the next week, 13 days after the first
+            (habit_id, "2025-01-20 08:00:00")   # the following Monday
+        ])
+
+        assert result[habit_id] == {"current_streak": 0, "longest_streak": 3,
+                                    "last_completed_at": "2025-01-20 08:00:00"}
+        assert [row[0] for row in self.db.fetch_habit_completions(habit_id)] == [
+            "2025-01-06 08:00:00", "2025-01-19 08:00:00", "2025-01-20 08:00:00"]
+
+    def test_period_change_regroups_completions(self):
+        self.db.insert_habit_info(Habit("Regrouped", HabitPeriod.DAILY, HabitType.POSITIVE))
+        habit_id = self.db.fetch_all_habits()[0][0]
+        self.db.insert_habit_completions([(habit_id, f"2025-01-{day:02d} 08:00:00") for day in range(6, 16)])
+        history = self.db.fetch_habit_completions(habit_id)
+        counts = self.db.fetch_completion_counts(habit_id)
+
+        self.db.change_habit_info(habit_id, "Regrouped", HabitPeriod.WEEKLY, HabitType.POSITIVE)
+
+        assert self.db.fetch_habit_completions(habit_id) == history
+        assert self.db.cursor.execute(
+            "SELECT completed_at FROM completions WHERE period_key IS NOT NULL ORDER BY completed_at").fetchall() == [
+            ("2025-01-06 08:00:00",), ("2025-01-13 08:00:00",)]
+        assert self.db.fetch_habit_by_id(habit_id)[5:8] == ("2025-01-15 08:00:00", 0, 2)
+
+        self.db.archive_habit_info(habit_id)
+        self.db.unarchive_habit_info(habit_id)
+        assert self.db.fetch_habit_completions(habit_id) == history
+
+        self.db.change_habit_info(habit_id, "Regrouped", HabitPeriod.DAILY, HabitType.POSITIVE)
+
+        assert self.db.fetch_habit_completions(habit_id) == history
+        assert self.db.fetch_completion_counts(habit_id) == counts
+        assert self.db.fetch_habit_by_id(habit_id)[5:8] == ("2025-01-15 08:00:00", 0, 10)
+
+    def test_migration_keys_first_completion_per_period(self):
+        self.db.insert_habit_info(Habit("Migrated", HabitPeriod.WEEKLY, HabitType.POSITIVE))
+        habit_id = self.db.fetch_all_habits()[0][0]
+        self.db.cursor.execute('DROP INDEX idx_completions_habit_period')
+        self.db.cursor.executemany("INSERT INTO completions (habit_id, completed_at) VALUES (?, ?)", [
+            (habit_id, "2025-01-08 08:00:00"),
+            (habit_id, "2025-01-07 08:00:00"),
+            (habit_id, "2025-01-14 08:00:00")
+        ])
+        self.db.cursor.execute('PRAGMA user_version = 3')
+        self.db.is_conn.commit()
+
+        self.db.create_tables()
+
+        assert self.db.cursor.execute("SELECT completed_at, period_key FROM completions ORDER BY id").fetchall() == [
+            ("2025-01-08 08:00:00", None), ("2025-01-07 08:00:00", 105608), ("2025-01-14 08:00:00", 105609)]
+        assert self.db.fetch_habit_by_id(habit_id)[5:8] == ("2025-01-14 08:00:00", 0, 2)
 
     def test_reset_broken_streak(self):
-        habit = Habit("Weekly Test", HabitPeriod.WEEKLY, HabitType.NEGATIVE, last_completed_at=(datetime.now() - timedelta(days=10)).strftime("%b %d, %Y at %H:%M"))
+        habit = Habit("Weekly Test", HabitPeriod.WEEKLY, HabitType.NEGATIVE, last_completed_at=(datetime.now() - timedelta(days=15)).strftime(TIMESTAMP_FORMAT))
         self.db.insert_habit_info(habit)
 
         habit_record = self.db.fetch_all_habits()[0]
@@ -84,14 +263,14 @@ class TestDBManager:
         assert updated[6] == 0
 
     def test_is_habit_completed_true_false(self):
-        now = datetime.now().strftime("%b %d, %Y at %H:%M")
+        now = datetime.now().strftime(TIMESTAMP_FORMAT)
         habit = Habit("Today Done", HabitPeriod.DAILY, HabitType.POSITIVE, last_completed_at=now)
         self.db.insert_habit_info(habit)
 
         daily_habit = self.db.fetch_all_habits()[0]
         assert self.db.is_habit_completed(daily_habit) is True
 
-        old = (datetime.now() - timedelta(days=8)).strftime("%b %d, %Y at %H:%M")
+        old = (datetime.now() - timedelta(days=8)).strftime(TIMESTAMP_FORMAT)
         habit2 = Habit("Late Weekly", HabitPeriod.WEEKLY, HabitType.NEGATIVE, last_completed_at=old)
         self.db.insert_habit_info(habit2)
 
@@ -120,9 +299,263 @@ class TestDBManager:
         assert any(row[0] == "Streak A" for row in streaks)
         assert any(row[0] == "Streak B" for row in streaks)
 
+    def test_fetch_completions_chronological_order(self):
+        habit = Habit("Ordered Habit", HabitPeriod.DAILY, HabitType.POSITIVE)
+        self.db.insert_habit_info(habit)
+        habit_id = self.db.fetch_all_habits()[0][0]
+        self.db.cursor.executemany("INSERT INTO completions (habit_id, completed_at) VALUES (?, ?)", [
+            (habit_id, "2025-04-02 08:00:00"),
+            (habit_id, "2025-01-15 08:00:00"),
+            (habit_id, "2024-12-31 08:00:00")
+        ])
+        self.db.is_conn.commit()
+
+        completions = [row[0] for row in self.db.fetch_habit_completions(habit_id)]
+        assert completions == ["2024-12-31 08:00:00", "2025-01-15 08:00:00", "2025-04-02 08:00:00"]
+
+    def test_migrate_legacy_timestamps(self):
+        self.db.cursor.execute('''
+            INSERT INTO habits (name, habit_period, habit_type, created_at, last_completed_at)
+            VALUES ('Legacy', 'DAILY', 'POSITIVE', 'Jan 05, 2025 at 09:30', 'Apr 01, 2025 at 21:15')
+        ''')
+        habit_id = self.db.cursor.lastrowid
+        self.db.cursor.execute("INSERT INTO completions (habit_id, completed_at) VALUES (?, 'Apr 01, 2025 at 21:15')",
+                               (habit_id,))
+        self.db.cursor.execute('PRAGMA user_version = 0')
+        self.db.is_conn.commit()
+
+        self.db.create_tables()
+
+        habit = self.db.fetch_habit_by_id(habit_id)
+        assert habit[4] == "2025-01-05 09:30:00"
+        assert habit[5] == "2025-04-01 21:15:00"
+        assert self.db.fetch_habit_completions(habit_id) == [("2025-04-01 21:15:00",)]
+
+    def test_insert_habit_completions_bulk(self):
+        self.db.insert_habit_info(Habit("Bulk Daily", HabitPeriod.DAILY, HabitType.POSITIVE))
+        self.db.insert_habit_info(Habit("Bulk Weekly", HabitPeriod.WEEKLY, HabitType.POSITIVE))
+        daily_id, weekly_id = [h[0] for h in self.db.fetch_all_habits()]
+        start = datetime(2025, 1, 1, 8, 0)
+
+        result = self.db.insert_habit_completions(
+            [(daily_id, start + timedelta(days=i)) for i in range(10) if i != 4] +
+            [(weekly_id, "2025-01-01 08:00:00"), (weekly_id, "2025-01-06 08:00:00"), (999, start)]
+        )
+
+        assert set(result) == {daily_id, weekly_id}
+        assert result[daily_id] == {"current_streak": 0, "longest_streak": 5, "last_completed_at": "2025-01-10 08:00:00"}
+        assert len(self.db.fetch_habit_completions(daily_id)) == 9
+        assert self.db.fetch_habit_completions(999) == []
+
+        weekly = self.db.fetch_habit_by_id(weekly_id)
+        assert weekly[5:8] == ("2025-01-06 08:00:00", 0, 2)
+
+        now = datetime.now()
+        recent = self.db.insert_habit_completions([(daily_id, now - timedelta(days=i)) for i in (1, 2)])
+        assert recent[daily_id]["current_streak"] == 2
+
+    def test_reset_broken_streaks(self):
+        now = datetime.now()
+        habits = [
+            Habit("Overdue Daily", HabitPeriod.DAILY, HabitType.POSITIVE, current_streak=3,
+                  last_completed_at=(now - timedelta(days=3)).strftime(TIMESTAMP_FORMAT)),
+            Habit("On Time Daily", HabitPeriod.DAILY, HabitType.POSITIVE, current_streak=2,
+                  last_completed_at=(now - timedelta(hours=20)).strftime(TIMESTAMP_FORMAT)),
+            Habit("Overdue Weekly", HabitPeriod.WEEKLY, HabitType.NEGATIVE, current_streak=1,
+                  last_completed_at=(now - timedelta(days=15)).strftime(TIMESTAMP_FORMAT)),
+            Habit("On Time Weekly", HabitPeriod.WEEKLY, HabitType.NEGATIVE, current_streak=4,
+                  last_completed_at=(now - timedelta(days=6)).strftime(TIMESTAMP_FORMAT))
+        ]
+        for habit in habits:
+            self.db.insert_habit_info(habit)
+
+        broken = self.db.reset_broken_streaks()
+
+        assert sorted((name, days) for _, name, _, days in broken) == [("Overdue Daily", 3), ("Overdue Weekly", 15)]
+        streaks = {row[0]: row[2] for row in self.db.fetch_all_streaks()}
+        assert streaks == {"Overdue Daily": 0, "On Time Daily": 2, "Overdue Weekly": 0, "On Time Weekly": 4}
+        assert self.db.reset_broken_streaks() == []
+
+    def test_verify_streaks(self):
+        self.db.insert_habit_info(Habit("Drifted", HabitPeriod.DAILY, HabitType.POSITIVE))
+        self.db.insert_habit_info(Habit("Correct", HabitPeriod.WEEKLY, HabitType.POSITIVE))
+        drifted_id, correct_id = [h[0] for h in self.db.fetch_all_habits()]
+        now = datetime.now()
+        self.db.insert_habit_completions([(drifted_id, now - timedelta(days=i)) for i in range(3)] +
+                                         [(correct_id, now - timedelta(days=20))])
+        self.db.cursor.execute("UPDATE habits SET current_streak = 28, longest_streak = 28 WHERE id = ?", (drifted_id,))
+        self.db.cursor.execute("UPDATE habits SET current_streak = 0 WHERE id = ?", (correct_id,))
+        self.db.cursor.execute("INSERT INTO completions (habit_id, completed_at) VALUES (999, '2025-01-01 08:00:00')")
+        self.db.is_conn.commit()
+
+        mismatches = self.db.verify_streaks()
+        assert [(habit_id, stored[:2], rebuilt[:2]) for habit_id, stored, rebuilt in mismatches] == [
+            (drifted_id, (28, 28), (3, 3))
+        ]
+        assert self.db.fetch_habit_by_id(drifted_id)[6] == 28
+
+        self.db.verify_streaks(apply=True)
+        assert self.db.fetch_habit_by_id(drifted_id)[6:8] == (3, 3)
+        assert self.db.verify_streaks() == []
+
+    def test_verify_streaks_after_bulk_insert(self):
+        self.db.insert_habit_info(Habit("Lapsed", HabitPeriod.DAILY, HabitType.POSITIVE))
+        self.db.insert_habit_info(Habit("Ongoing", HabitPeriod.WEEKLY, HabitType.POSITIVE))
+        lapsed_id, ongoing_id = [h[0] for h in self.db.fetch_all_habits()]
+        now = datetime.now()
+
+        self.db.insert_habit_completions([(lapsed_id, f"2025-01-{day:02d} 08:00:00") for day in range(1, 6)] +
+                                         [(ongoing_id, now - timedelta(weeks=i)) for i in range(3)])
+
+        assert self.db.verify_streaks() == []
+        assert self.db.fetch_habit_by_id(lapsed_id)[6:8] == (0, 5)
+        assert self.db.fetch_habit_by_id(ongoing_id)[6:8] == (3, 3)
+
+    def test_completion_rollups(self):
+        self.db.insert_habit_info(Habit("Rolled Up", HabitPeriod.DAILY, HabitType.POSITIVE))
+        habit_id = self.db.fetch_all_habits()[0][0]
+        self.db.insert_habit_completions([
+            (habit_id, "2025-01-01 08:00:00"),
+            (habit_id, "2025-01-02 20:00:00"),
+            (habit_id, "2025-01-05 08:00:00"),
+            (habit_id, "2025-01-06 08:00:00")
+        ])
+        self.db.insert_habit_completion(habit_id)
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        days = self.db.fetch_completion_counts(habit_id)
+        assert days[:3] == [("2025-01-01", 1), ("2025-01-02", 1), ("2025-01-05", 1)]
+        assert days[-1] == (today, 1)
+        assert self.db.fetch_completion_counts(habit_id, "WEEK", end="2025-12-31") == [
+            ("2024-12-30", 3), ("2025-01-06", 1)
+        ]
+        assert self.db.fetch_completion_counts(habit_id, start="2025-01-03", end="2025-01-05") == [("2025-01-05", 1)]
+
+        incremental = self.db.cursor.execute("SELECT * FROM completion_rollups ORDER BY 1, 2, 3").fetchall()
+        self.db.rebuild_rollups()
+        assert self.db.cursor.execute("SELECT * FROM completion_rollups ORDER BY 1, 2, 3").fetchall() == incremental
+
+        self.db.delete_habit_info(habit_id)
+        assert self.db.fetch_completion_counts(habit_id) == []
+
+    def test_rebuild_rollups_keeps_archived_history(self):
+        self.db.insert_habit_info(Habit("Shelved", HabitPeriod.DAILY, HabitType.POSITIVE))
+        habit_id = self.db.fetch_all_habits()[0][0]
+        self.db.insert_habit_completions([(habit_id, "2025-01-04 08:00:00"), (habit_id, "2025-01-05 08:00:00"),
+                                          (habit_id, "2025-01-06 08:00:00")])
+        self.db.archive_habit_info(habit_id)
+        self.db.insert_habit_completions([(habit_id, "2025-01-06 20:00:00")])
+        self.db.move_archived_to_cold_storage()
+        counts = {granularity: self.db.fetch_completion_counts(habit_id, granularity) for granularity in ("DAY", "WEEK")}
+        assert counts["WEEK"] == [("2024-12-30", 2), ("2025-01-06", 2)]
+
+        self.db.rebuild_rollups()
+        assert {granularity: self.db.fetch_completion_counts(habit_id, granularity)
+                for granularity in ("DAY", "WEEK")} == counts
+
+        self.db.unarchive_habit_info(habit_id)
+        assert {granularity: self.db.fetch_completion_counts(habit_id, granularity)
+                for granularity in ("DAY", "WEEK")} == counts
+
+    def test_compact_history(self):
+        self.db.insert_habit_info(Habit("Daily", HabitPeriod.DAILY, HabitType.POSITIVE))
+        self.db.insert_habit_info(Habit("Weekly", HabitPeriod.WEEKLY, HabitType.POSITIVE))
+        self.db.insert_habit_info(Habit("Lapsed", HabitPeriod.DAILY, HabitType.POSITIVE))
+        daily_id, weekly_id, lapsed_id = [h[0] for h in self.db.fetch_all_habits()]
+        now = datetime.now()
+        self.db.insert_habit_completions([(daily_id, now - timedelta(days=i)) for i in range(60)] +
+                                         [(weekly_id, now - timedelta(weeks=i)) for i in range(12)] +
+                                         [(lapsed_id, now - timedelta(days=i)) for i in range(100, 110)])
+        self.db.reset_broken_streaks()
+        streaks = self.db.fetch_all_streaks()
+        counts = {(habit_id, granularity): self.db.fetch_completion_counts(habit_id, granularity)
+                  for habit_id in (daily_id, weekly_id, lapsed_id) for granularity in ("DAY", "WEEK")}
+
+        report = self.db.compact_history(horizon_days=30, dry_run=True)
+        assert report["habits"] == 3 and report["rows"] > 0 and report["bytes"] > 0
+        assert report["reclaimed_bytes"] == 0
+        assert self.db.cursor.execute("SELECT COUNT(*) FROM completions").fetchone()[0] == 82
+
+        assert self.db.compact_history(horizon_days=30)["rows"] == report["rows"]
+        remaining = dict(self.db.cursor.execute("SELECT habit_id, COUNT(*) FROM completions GROUP BY habit_id"))
+        assert sum(remaining.values()) == 82 - report["rows"]
+        assert 1 <= remaining[lapsed_id] <= 7
+        assert self.db.fetch_all_streaks() == streaks
+        assert self.db.verify_streaks() == []
+        assert self.db.compact_history(horizon_days=30)["rows"] == 0
+
+        compacted_day = now - timedelta(days=50)
+        self.db.insert_habit_completions([(daily_id, compacted_day), (daily_id, compacted_day.date())])
+        assert self.db.cursor.execute("SELECT COUNT(*) FROM completions").fetchone()[0] == 82 - report["rows"]
+        assert self.db.fetch_completion_counts(daily_id) == counts[daily_id, "DAY"]
+        self.db.rebuild_rollups()
+        assert {(habit_id, granularity): self.db.fetch_completion_counts(habit_id, granularity)
+                for habit_id in (daily_id, weekly_id, lapsed_id) for granularity in ("DAY", "WEEK")} == counts
+        self.db.insert_habit_completions([(daily_id, now + timedelta(days=1))])
+        assert self.db.fetch_habit_by_id(daily_id)[6:8] == (61, 61)
+        assert self.db.cursor.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
     def teardown_method(self):
         self.db.close_conn()
         if os.path.exists(self.db_name):
             os.remove(self.db_name)
 
-    
\ No newline at end of file
+
+class TestConcurrentDBManager:
+    """Tests the WAL mode and reader pool of the DBManager class."""
+    def setup_method(self):
+        self.db_name = "test_concurrent_habit_tracker.db"
+        self.db = DBManager(db_name=self.db_name, concurrent=True, pool_size=2, busy_timeout=1000)
+
+    def test_wal_mode_enabled(self):
+        journal_mode = self.db.cursor.execute('PRAGMA journal_mode').fetchone()[0]
+        busy_timeout = self.db.cursor.execute('PRAGMA busy_timeout').fetchone()[0]
+
+        assert journal_mode == "wal"
+        assert busy_timeout == 1000
+
+    def test_reader_sees_committed_writes(self):
+        self.db.insert_habit_info(Habit("Pooled", HabitPeriod.DAILY, HabitType.POSITIVE))
+        habit_id = self.db.fetch_all_habits()[0][0]
+        self.db.insert_habit_completion(habit_id)
+
+        assert self.db.fetch_habit_by_id(habit_id)[6] == 1
+        assert len(self.db.fetch_habit_completions(habit_id)) == 1
+
+    def test_reads_do_not_block_open_write(self):
+        self.db.insert_habit_info(Habit("Before", HabitPeriod.DAILY, HabitType.POSITIVE))
+
+        with self.db.transaction() as cursor:
+            cursor.execute("UPDATE habits SET name = 'During'")
+            result = []
+            reader = threading.Thread(target=lambda: result.append(self.db.fetch_habit_names()))
+            reader.start()
+            reader.join(timeout=5)
+
+            assert result == [["Before"]]
+
+        assert self.db.fetch_habit_names() == ["During"]
+
+    def test_reader_pool_is_bounded(self):
+        with self.db.reader() as first, self.db.reader() as second:
+            assert first is not second
+            with pytest.raises(sqlite3.OperationalError):
+                first.execute("DELETE FROM habits")
+
+        for _ in range(5):
+            self.db.fetch_all_habits()
+        assert self.db._reader_count == 2
+
+    def test_transaction_rolls_back_on_error(self):
+        with pytest.raises(RuntimeError):
+            with self.db.transaction() as cursor:
+                cursor.execute("INSERT INTO habits (name, habit_period, habit_type, created_at) VALUES ('x', 'DAILY', 'POSITIVE', '')")
+                raise RuntimeError("abort")
+
+        assert self.db.fetch_all_habits() == []
+
+    def teardown_method(self):
+        self.db.close_conn()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.db_name + suffix):
+                os.remove(self.db_name + suffix)
@@ -0,0 +1,61 @@
+import csv
+import gzip
+import json
+import os
+from habit_components.db import DBManager
+from habit_components.export import export_table
+from habit_components.habit import Habit, HabitPeriod, HabitType
+
+
+class TestExport:
+    """Tests the streaming export of habits and completions."""
+
+    def setup_method(self, method):
+        self.db_name = "test_habit_tracker.db"
+        self.db = DBManager(db_name=self.db_name)
+        self.db.cursor.execute("DELETE FROM completions")
+        self.db.cursor.execute("DELETE FROM habits")
+        self.db.is_conn.commit()
+        self.db.insert_habit_info(Habit("Read a book", HabitPeriod.DAILY, HabitType.POSITIVE))
+        self.db.insert_habit_info(Habit("Deep cleaning", HabitPeriod.WEEKLY, HabitType.POSITIVE))
+        self.daily_id, self.weekly_id = [h.id for h in self.db.fetch_all_habits()]
+        self.db.insert_habit_completions([
+            (self.daily_id, "2025-01-01 08:00:00"),
+            (self.daily_id, "2025-01-02 08:00:00"),
+            (self.daily_id, "2025-01-03 23:59:00"),
+            (self.weekly_id, "2025-01-02 10:00:00")
+        ])
+        self.output = f"test_export_{method.__name__}"
+
+    def test_iter_completions_filters(self):
+        rows = list(self.db.iter_completions(habit_period="daily", start="2025-01-02", end="2025-01-03",
+                                             batch_size=1))
+
+        assert [completed_at for _, _, completed_at in rows] == ["2025-01-02 08:00:00", "2025-01-03 23:59:00"]
+        assert [h.name for h in self.db.iter_habits(habit_ids=[self.weekly_id])] == ["Deep cleaning"]
+
+    def test_export_completions_csv(self):
+        path = self.output + ".csv"
+        count = export_table(self.db, "completions", path, habit_ids=[self.weekly_id])
+
+        with open(path, newline="") as f:
+            rows = list(csv.reader(f))
+        assert count == 1
+        assert rows[0] == ["id", "habit_id", "completed_at"]
+        assert rows[1][1:] == [str(self.weekly_id), "2025-01-02 10:00:00"]
+
+    def test_export_habits_jsonl_gzip(self):
+        path = self.output + ".jsonl.gz"
+        count = export_table(self.db, "habits", path)
+
+        with gzip.open(path, "rt") as f:
+            habits = [json.loads(line) for line in f]
+        assert count == 2
+        assert [h["name"] for h in habits] == ["Read a book", "Deep cleaning"]
+        assert habits[0]["longest_streak"] == 3
+
+    def teardown_method(self):
+        self.db.close_conn()
+        for path in (self.db.db_path, self.output + ".csv", self.output + ".jsonl.gz"):
+            if os.path.exists(path):
+                os.remove(path)
@@ -133,7 +133,7 @@ class TestHabitTracker:
     def test_view_habits_with_completed_habit(self, mock_print, mock_select):
         habit = Habit(
             "Already done", HabitPeriod.DAILY, HabitType.POSITIVE,
-            last_completed_at="Jun 02, 2025 at 08:00"
+            last_completed_at="2025-06-02 08:00:00"
         )
         self.tracker.db.insert_habit_info(habit)
 
@@ -146,6 +146,22 @@ class TestHabitTracker:
 
         mock_print.assert_any_call("Returning to main menu...")
 
+    @patch("habit_components.habit_tracker.select")
+    @patch("builtins.print")
+    def test_view_habits_resets_missed_streak(self, mock_print, mock_select):
+        habit = Habit(
+            "Missed habit", HabitPeriod.DAILY, HabitType.POSITIVE,
+            last_completed_at="2025-06-02 08:00:00", current_streak=4, longest_streak=4
+        )
+        self.tracker.db.insert_habit_info(habit)
+
+        mock_select.return_value.ask.side_effect = ["Go back to main menu"]
+        self.tracker.view_habits()
+
+        missed = [c.args[0] for c in mock_print.call_args_list if "Missed habit" in str(c.args[0])]
+        assert len(missed) == 1
+        assert self.tracker.db.fetch_habit_by_name("Missed habit").current_streak == 0
+
     def teardown_method(self):
         self.tracker.db.close_conn()
         if os.path.exists(self.db_name):
@@ -0,0 +1,157 @@
+import gzip
+import os
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from habit_components.db import DBManager
+from habit_components.export import export_table
+from habit_components.importer import import_file
+
+
+class TestImporter:
+    """Tests the streaming bulk import of habits and completions."""
+
+    def setup_method(self, method):
+        self.db_name = "test_habit_tracker.db"
+        self.db = DBManager(db_name=self.db_name)
+        self.db.cursor.execute("DELETE FROM completions")
+        self.db.cursor.execute("DELETE FROM habits")
+        self.db.cursor.execute("DELETE FROM import_checkpoints")
+        self.db.is_conn.commit()
+        self.prefix = f"test_import_{method.__name__}"
+        self.paths = []
+
+    def _write(self, suffix, text):
+        path = self.prefix + suffix
+        opener = gzip.open if suffix.endswith(".gz") else open
+        with opener(path, "wt") as f:
+            f.write(text)
+        self.paths.append(path)
+        return path
+
+    def test_import_habits_validates_rows(self):
+        path = self._write(".csv", "name,habit_period,habit_type\n"
+                                   "Read a book,daily,positive\n"
+                                   "Nap,hourly,positive\n"
+                                   ",weekly,negative\n"
+                                   "Deep cleaning,WEEKLY,POSITIVE\n")
+        summary = import_file(self.db, "habits", path, chunk_size=2)
+
+        assert summary["imported"] == 2
+        assert summary["invalid"] == 2
+        assert [row for row, _ in summary["errors"]] == [2, 3]
+        assert [h.name for h in self.db.fetch_all_habits()] == ["Read a book", "Deep cleaning"]
+
+    def test_import_habits_rejects_assigned_ids(self):
+        self.db.cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'habits'")
+        self.db.is_conn.commit()
+        path = self._write(".csv", "id,name,habit_period,habit_type\n"
+                                   ",Read a book,daily,positive\n"
+                                   "3,Deep cleaning,weekly,positive\n"
+                                   "4,Nap,daily,positive\n")
+        summary = import_file(self.db, "habits", path, chunk_size=2)
+
+        assert summary["imported"] == 2
+        assert summary["errors"] == [(3, "habit ID 4 already exists")]
+        assert [(h.id, h.name) for h in self.db.fetch_all_habits()] == [(3, "Deep cleaning"), (4, "Read a book")]
+
+    def test_import_completions_recomputes_streaks(self):
+        import_file(self.db, "habits", self._write(".jsonl", '{"name": "Read a book", "habit_period": "DAILY", '
+                                                            '"habit_type": "POSITIVE"}\n'))
+        path = self._write(".jsonl.gz", '{"habit_name": "read a book", "completed_at": "2025-01-01T08:00:00"}\n'
+                                        '{"habit_name": "read a book", "completed_at": "2025-01-02 08:00:00"}\n'
+                                        'not json\n'
+                                        '{"habit_id": 999, "completed_at": "2025-01-03 08:00:00"}\n'
+                                        '{"habit_name": "Read a book", "completed_at": "2025-01-03"}\n')
+        summary = import_file(self.db, "completions", path, chunk_size=2)
+
+        habit = self.db.fetch_all_habits()[0]
+        assert summary["imported"] == 3
+        assert summary["invalid"] == 2
+        assert habit.longest_streak == 3
+        assert habit.last_completed_at == "2025-01-03 00:00:00"
+        assert self.db.fetch_completion_counts(habit.id, "WEEK") == [("2024-12-30", 3)]
+
+    def test_import_counts_duplicate_completions(self):
+        import_file(self.db, "habits", self._write(".csv", "id,name,habit_period,habit_type\n"
+                                                           "7,Read a book,daily,positive\n"))
+        path = self._write(".csv", "habit_id,completed_at\n7,2025-01-01 08:00:00\n7,2025-01-01 12:00:00\n"
+                                   "7,2025-01-01 20:00:00\n7,2025-01-02 08:00:00\n")
+
+        summary = import_file(self.db, "completions", path, chunk_size=3)
+
+        assert summary["imported"] == 2
+        assert summary["duplicates"] == 2
+        assert summary["invalid"] == 0
+        assert self.db.fetch_habit_completions(7) == [("2025-01-01 08:00:00",), ("2025-01-02 08:00:00",)]
+
+    def test_import_moves_archived_completions_to_cold_storage(self):
+        import_file(self.db, "habits", self._write(".csv", "id,name,habit_period,habit_type,is_active\n"
+                                                           "7,Read a book,daily,positive,0\n"
+                                                           "8,Nap,daily,positive,1\n"))
+        path = self._write(".csv", "habit_id,completed_at\n7,2025-01-01 08:00:00\n7,2025-01-02 08:00:00\n"
+                                   "8,2025-01-01 08:00:00\n")
+
+        assert import_file(self.db, "completions", path)["imported"] == 3
+
+        assert self.db.cursor.execute("SELECT habit_id FROM completions").fetchall() == [(8,)]
+        assert self.db.cursor.execute("SELECT habit_id, completions FROM archived_completions").fetchall() == [(7, 2)]
+        assert self.db.fetch_habit_by_id(7)[5:8] == ("2025-01-02 08:00:00", 2, 2)
+        assert self.db.fetch_completion_counts(7) == [("2025-01-01", 1), ("2025-01-02", 1)]
+
+    def test_import_resumes_from_checkpoint(self):
+        path = self._write(".csv", "name,habit_period,habit_type\n" +
+                           "".join(f"Habit {i},daily,positive\n" for i in range(5)))
+        original = self.db.insert_habits
+        calls = []
+
+        def fail_on_second_chunk(habits):
+            calls.append(habits)
+            if len(calls) == 2:
+                raise RuntimeError("interrupted")
+            return original(habits)
+
+        with patch.object(self.db, "insert_habits", side_effect=fail_on_second_chunk):
+            with pytest.raises(RuntimeError):
+                import_file(self.db, "habits", path, chunk_size=2)
+        summary = import_file(self.db, "habits", path, chunk_size=2)
+
+        assert summary["resumed_at"] == 2
+        assert summary["imported"] == 3
+        assert [h.name for h in self.db.fetch_all_habits()] == [f"Habit {i}" for i in range(5)]
+        assert import_file(self.db, "habits", path)["imported"] == 0
+
+    def test_export_round_trip(self):
+        import_file(self.db, "habits", self._write(".csv", "id,name,habit_period,habit_type\n"
+                                                           "7,Read a book,daily,positive\n"))
+        self.db.insert_habit_completions([(7, "2025-01-01 08:00:00"), (7, "2025-01-02 08:00:00")])
+        export_path = self.prefix + ".export.jsonl"
+        self.paths.append(export_path)
+        export_table(self.db, "completions", export_path)
+        self.db.cursor.execute("DELETE FROM completions")
+        self.db.is_conn.commit()
+
+        summary = import_file(self.db, "completions", export_path)
+
+        assert summary["imported"] == 2
+        assert self.db.fetch_habit_by_id(7).longest_streak == 2
+
+    def test_import_skips_compacted_completions(self):
+        import_file(self.db, "habits", self._write(".csv", "id,name,habit_period,habit_type\n"
+                                                           "7,Read a book,daily,positive\n"))
+        self.db.insert_habit_completions([(7, "2025-01-01 08:00:00"), (7, "2025-03-03 08:00:00")])
+        self.db.compact_history(horizon_days=30, today=datetime(2025, 3, 5).date())
+        path = self._write(".csv", "habit_id,completed_at\n7,2025-01-01 20:00:00\n7,2025-01-02 08:00:00\n"
+                                   "7,2025-03-04 08:00:00\n")
+
+        summary = import_file(self.db, "completions", path)
+
+        assert summary["imported"] == 1
+        assert [row for row, _ in summary["errors"]] == [1, 2]
+        assert self.db.fetch_completion_counts(7, end="2025-01-31") == [("2025-01-01", 1)]
+
+    def teardown_method(self):
+        self.db.close_conn()
+        for path in [self.db.db_path] + self.paths:
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,142 @@
+import math
+import os
+import re
+import pytest
+from datetime import datetime
+from habit_components import analytics
+from habit_components.db import DBManager
+from habit_components.habit import HabitPeriod, HabitType
+from habit_components.seed_data import generate_habits
+from habit_components.tracing import QueryTracer
+
+# A plan line reading a whole table or index; SQLite before 3.36 writes "SCAN TABLE habits".
+FULL_SCAN = re.compile(r"^\s*SCAN (?:TABLE )?(?!CONSTANT ROW)(\w+)")
+
+# Statements that read a whole table on purpose, mapped to the reason they are allowed to.
+ALLOWED_SCANS = {
+    "SELECT * FROM habits ORDER BY id": "loads every habit, including archived ones, e.g. into the session cache",
+    "SELECT id, habit_period, is_active, current_streak, longest_streak, last_completed_at FROM habits":
+        "verify_streaks audits every habit",
+    "SELECT habit_id, MAX(completed_at)": "verify_streaks audits every completion",
+    "SELECT habit_id, period_key FROM completions": "verify_streaks audits every completion",
+    "SELECT c.id, c.habit_id, c.completed_at FROM completions c JOIN habits h ON h.id = c.habit_id ORDER BY c.id":
+        "an unfiltered export streams every completion",
+    "SELECT * FROM habits h WHERE h.habit_period = ?": "exports filter active and archived habits by period",
+    "SELECT id, habit_period, CAST(julianday(created_at)": "the rolling-rate prefix sums cover every habit",
+    "SELECT habit_id, group_concat(": "the rolling-rate prefix sums are built in one pass over the rollups",
+    "SELECT habit_id FROM archived_completions":
+        "verify_streaks skips, and rebuild_rollups re-adds, every habit in cold storage",
+    "SELECT a.habit_id, a.history FROM archived_completions a JOIN habits h ON h.id = a.habit_id":
+        "exports read the cold storage rows of the matching archived habits",
+    "SELECT r.habit_id, CASE": "verify_streaks audits the rollups of every compacted habit",
+    "SELECT COUNT(*) FROM completions": "compact_history estimates the size of one completion",
+    "SELECT SUM(pgsize) FROM dbstat": "compact_history measures the completions table and its indexes",
+    "DELETE FROM completion_rollups WHERE period_start >=": "rebuild_rollups recomputes the rollups of every habit",
+}
+
+# Statements behind the hot paths; each must be issued by the workload below and must use an index.
+HOT_QUERIES = {
+    "by-id lookup": "SELECT * FROM habits WHERE id = ?",
+    "completions by habit": "SELECT completed_at FROM completions WHERE habit_id = ? ORDER BY completed_at ASC",
+    "active-habit listing": "SELECT * FROM habits WHERE is_active = 1 ORDER BY id",
+    "habits by period": "SELECT * FROM habits WHERE is_active = 1 AND habit_period = ? ORDER BY id",
+    "habits by type": "SELECT * FROM habits WHERE is_active = 1 AND habit_type = ? ORDER BY id",
+    "streak leaderboard": "SELECT * FROM habits WHERE is_active = 1 ORDER BY longest_streak DESC LIMIT ?",
+    "longest streak": "SELECT * FROM habits WHERE is_active = 1 AND longest_streak = (",
+    "current streaks": "SELECT name, habit_period, current_streak FROM habits WHERE is_active = 1 AND current_streak > 0",
+    "habit by name": "SELECT * FROM habits WHERE name = ? COLLATE NOCASE",
+    "completion counts": "SELECT period_start, completions FROM completion_rollups WHERE habit_id = ?",
+    "completion rollup": "INSERT INTO completion_rollups",
+}
+
+
+class PlanRecorder(QueryTracer):
+    """Tracer that keeps the `EXPLAIN QUERY PLAN` output of every distinct statement it sees."""
+
+    def __init__(self):
+        super().__init__(slow_ms=math.inf)
+        self.plans = {}
+
+    def record(self, conn, sql, params, rows, elapsed_ms):
+        normalized = " ".join(sql.split())
+        self.plans.setdefault(normalized, (self.current_method(), self.explain(conn, sql, params)))
+        super().record(conn, sql, params, rows, elapsed_ms)
+
+
+class TestQueryPlans:
+    """Checks that the queries of DBManager and analytics keep using their indexes on a populated database."""
+
+    def setup_method(self):
+        self.db_name = "test_query_plans.db"
+        db = DBManager(db_name=self.db_name, cache=False)
+        generate_habits(db, 300, years=0.5, seed=5)
+        self.db_path = db.db_path
+        db.close_conn(verbose=False)
+
+    def _run_workload(self, db):
+        habit = db.fetch_all_habits()[0]
+        db.fetch_all_habits(include_archived=True)
+        db.fetch_habit_by_id(habit.id)
+        db.fetch_habit_completions(habit.id)
+        db.fetch_habit_names()
+        db.fetch_all_streaks()
+        db.has_active_habits()
+        db.fetch_top_streaks(10)
+        db.fetch_completion_counts(habit.id)
+        db.fetch_completion_counts(habit.id, "WEEK")
+        db.fetch_weekday_counts(habit.id)
+        list(db.iter_habits(habit_period="daily"))
+        list(db.iter_completions(habit_ids=[habit.id], start=datetime(2000, 1, 1)))
+        list(db.iter_completions())
+
+        analytics.get_all_active_habits(db)
+        analytics.get_habits_by_period(db, "daily")
+        analytics.get_habits_by_type(db, "negative")
+        analytics.list_habits_by_longest_streak(db)
+        analytics.get_current_streaks(db)
+        analytics.get_longest_streak_for_name(db, habit.name)
+        analytics.get_completion_rates(db)
+
+        db.insert_habit_completion(habit.id)
+        db.insert_habit_completions([(habit.id, datetime(2020, 1, 1, 8)), (habit.id, datetime(2020, 1, 2, 8))])
+        db.change_habit_info(habit.id, habit.name, HabitPeriod.DAILY, HabitType.POSITIVE)
+        db.reset_broken_streak(db.fetch_habit_by_id(habit.id))
+        db.reset_broken_streaks()
+        db.verify_streaks()
+        db.archive_habit_info(habit.id)
+        db.fetch_habit_completions(habit.id)
+        db.unarchive_habit_info(habit.id)
+        db.archive_habit_info(habit.id)
+        db.move_archived_to_cold_storage()
+        db.compact_history(horizon_days=60, dry_run=True)
+        db.compact_history(horizon_days=60)
+        db.verify_streaks()
+        db.rebuild_rollups()
+        db.delete_habit_info(habit.id)
+
+    @pytest.mark.parametrize("analyze", [False, True], ids=["no-stats", "analyzed"])
+    def test_statements_use_indexes(self, analyze):
+        recorder = PlanRecorder()
+        db = DBManager(db_name=self.db_name, cache=False, tracer=recorder)
+        if analyze:
+            db.cursor.execute("ANALYZE")
+            db.is_conn.commit()
+        try:
+            self._run_workload(db)
+        finally:
+            db.close_conn(verbose=False)
+
+        missing = [name for name, prefix in HOT_QUERIES.items()
+                   if not any(sql.startswith(prefix) for sql in recorder.plans)]
+        assert not missing, f"Workload no longer issues the hot queries: {missing}"
+
+        scans = []
+        for sql, (method, plan) in recorder.plans.items():
+            scanned = [match.group(1) for match in map(FULL_SCAN.match, plan) if match]
+            if scanned and not any(sql.startswith(prefix) for prefix in ALLOWED_SCANS):
+                scans.append(f"{method}: {sql}\n    " + "\n    ".join(plan))
+        assert not scans, "Statements reading whole tables:\n" + "\n".join(scans)
+
+    def teardown_method(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
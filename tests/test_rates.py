@@ -0,0 +1,108 @@
+import os
+import random
+import sys
+from datetime import date, timedelta
+from unittest.mock import patch
+from habit_components.analytics import get_completion_rate, get_completion_rates
+from habit_components.db import DBManager
+from habit_components.habit import Habit, HabitPeriod, HabitType
+from habit_components.rates import CompletionPrefixSums, WindowStats
+
+TODAY = date(2025, 3, 31)
+
+
+def concat_rows(rows):
+    """Groups (habit_id, day, completions) rows into the comma-separated form returned by `group_concat`."""
+    grouped = {}
+    for habit_id, day, count in rows:
+        grouped.setdefault(habit_id, []).append((day, count))
+    return [(habit_id, ",".join(str(day) for day, _ in days), ",".join(str(count) for _, count in days))
+            for habit_id, days in grouped.items()]
+
+
+class TestCompletionPrefixSums:
+    """Tests the window queries answered from per-habit prefix sums."""
+
+    def test_windows_match_brute_force(self):
+        rng = random.Random(3)
+        today = TODAY.toordinal()
+        counts = {1: {}, 2: {}}
+        for habit_id in counts:
+            for day in rng.sample(range(today - 200, today + 1), 60):
+                counts[habit_id][day] = rng.randint(1, 3)
+        rows = [(habit_id, day, counts[habit_id][day]) for habit_id in counts for day in sorted(counts[habit_id])]
+        prefix_sums = CompletionPrefixSums([(1, "DAILY", None), (2, "WEEKLY", None)], concat_rows(rows), TODAY)
+
+        for days in (1, 7, 30, 90, 365):
+            for end in (today, today - 45):
+                window = range(end - days + 1, end + 1)
+                daily = prefix_sums.window(1, days, date.fromordinal(end))
+                assert daily.completions == sum(counts[1].get(day, 0) for day in window)
+                assert daily.completed_periods == sum(day in counts[1] for day in window)
+                assert daily.rate == daily.completed_periods / days
+
+                weekly = prefix_sums.window(2, days, date.fromordinal(end))
+                weeks = {(day - 1) // 7 for day in window}
+                assert weekly.completed_periods == len({(day - 1) // 7 for day in counts[2]} & weeks)
+                assert weekly.periods == len(weeks)
+
+    def test_python_fallback_matches_numpy(self):
+        rng = random.Random(5)
+        today = TODAY.toordinal()
+        rows = [(habit_id, day, rng.randint(1, 2)) for habit_id in range(1, 30)
+                for day in sorted(rng.sample(range(today - 400, today + 10), rng.randint(0, 50)))]
+        habits = [(habit_id, rng.choice(["DAILY", "WEEKLY"]), None) for habit_id in range(1, 30)]
+        prefix_sums = CompletionPrefixSums(habits, concat_rows(rows), TODAY)
+        with patch.dict(sys.modules, {"numpy": None}):
+            fallback = CompletionPrefixSums(habits, concat_rows(rows), TODAY)
+
+        for habit_id in range(1, 30):
+            for days in (7, 30, 90, 1000):
+                assert prefix_sums.window(habit_id, days) == fallback.window(habit_id, days)
+
+    def test_adherence_counts_from_habit_start(self):
+        created = (TODAY - timedelta(days=9)).toordinal()
+        rows = [(1, TODAY.toordinal() - offset, 1) for offset in (0, 2, 4, 6, 8)]
+        prefix_sums = CompletionPrefixSums([(1, "DAILY", created), (2, "DAILY", None)], concat_rows(rows), TODAY)
+
+        assert prefix_sums.window(1, 30) == WindowStats(5, 5, 30, 5 / 30, 0.5)
+        assert prefix_sums.window(1, 7, TODAY - timedelta(days=20)).adherence is None
+        assert prefix_sums.window(2, 7) == WindowStats(0, 0, 7, 0.0, None)
+
+
+class TestCompletionRateAnalytics:
+    """Tests the rolling completion rates computed from the database."""
+
+    def setup_method(self):
+        self.db_name = "test_rates_habit_tracker.db"
+        self.db = DBManager(db_name=self.db_name)
+        self.db.insert_habits([Habit("Read", HabitPeriod.DAILY, HabitType.POSITIVE),
+                               Habit("Clean", HabitPeriod.WEEKLY, HabitType.POSITIVE)])
+        self.read, self.clean = (h.id for h in self.db.fetch_all_habits())
+        self.db.insert_habit_completions(
+            [(self.read, f"{TODAY - timedelta(days=offset)} 08:00:00") for offset in range(0, 14, 2)] +
+            [(self.clean, f"{TODAY - timedelta(weeks=offset)} 08:00:00") for offset in (0, 1, 3)])
+
+    def test_rates_for_all_habits(self):
+        rates = dict((name, stats) for name, _, stats in get_completion_rates(self.db, today=TODAY))
+
+        assert rates["Read"][7].completed_periods == 4
+        assert rates["Read"][30].completions == 7
+        assert rates["Clean"][30].completed_periods == 3
+        assert rates["Clean"][30].periods == 6  # 2025-03-02 is a Sunday, 2025-03-31 a Monday
+        assert get_completion_rate(self.db, self.read, 3, TODAY).rate == 2 / 3
+
+    def test_prefix_sums_are_cached_until_a_write(self):
+        prefix_sums = self.db.fetch_completion_prefix_sums(TODAY)
+        assert self.db.fetch_completion_prefix_sums(TODAY) is prefix_sums
+
+        self.db.insert_habit_completions([(self.read, f"{TODAY - timedelta(days=1)} 08:00:00")])
+        rebuilt = self.db.fetch_completion_prefix_sums(TODAY)
+        assert rebuilt is not prefix_sums
+        assert rebuilt.window(self.read, 2).completed_periods == 2
+        assert self.db.fetch_completion_prefix_sums(TODAY + timedelta(days=1)) is not rebuilt
+
+    def teardown_method(self):
+        self.db.close_conn()
+        if os.path.exists(self.db.db_path):
+            os.remove(self.db.db_path)
@@ -0,0 +1,68 @@
+import os
+import pytest
+from habit_components.db import DBManager
+from habit_components.habit import HabitPeriod
+from habit_components.seed_data import (create_predefined_habits, generate_habits, reset_database,
+                                        simulate_completion_dates)
+
+
+class TestSeedData:
+    """Tests the demo data and the synthetic data generator."""
+
+    def setup_method(self):
+        self.db_name = "test_habit_tracker.db"
+        self.db = DBManager(db_name=self.db_name)
+        reset_database(self.db)
+
+    def _dump(self):
+        return (self.db.cursor.execute("SELECT * FROM habits ORDER BY id").fetchall(),
+                self.db.cursor.execute("SELECT habit_id, completed_at FROM completions ORDER BY id").fetchall())
+
+    def test_generator_is_deterministic(self):
+        written = generate_habits(self.db, 20, years=0.25, seed=3, chunk_size=100)
+        first = self._dump()
+        reset_database(self.db)
+        self.db.cursor.execute("DELETE FROM sqlite_sequence")
+        self.db.is_conn.commit()
+        generate_habits(self.db, 20, years=0.25, seed=3, chunk_size=100)
+
+        assert len(first[0]) == 20
+        assert len(first[1]) == written > 0
+        assert self._dump() == first
+
+    def test_generated_streaks_match_history(self):
+        generate_habits(self.db, 30, years=0.5, seed=11)
+
+        assert self.db.verify_streaks() == []
+        assert self.db.cursor.execute("SELECT SUM(completions) FROM completion_rollups WHERE granularity = 'DAY'"
+                                      ).fetchone()[0] == self.db.cursor.execute("SELECT COUNT(*) FROM completions").fetchone()[0] + \
+            self.db.cursor.execute("SELECT SUM(completions) FROM archived_completions").fetchone()[0]
+        assert self.db.cursor.execute("SELECT COUNT(*) FROM completions c JOIN habits h ON h.id = c.habit_id "
+                                      "WHERE h.is_active = 0").fetchone()[0] == 0
+
+    def test_demo_streaks_account_for_gaps(self):
+        create_predefined_habits(self.db)
+        habit = self.db.fetch_habit_by_name("Limit device usage")
+        simulate_completion_dates(habit.id, HabitPeriod.DAILY, self.db, gaps=[3, 10])
+
+        habit = self.db.fetch_habit_by_id(habit.id)
+        assert habit.current_streak == 17
+        assert habit.longest_streak == 17
+        assert self.db.verify_streaks() == []
+
+    def test_generator_restores_synchronous_on_failure(self, monkeypatch):
+        synchronous = self.db.cursor.execute("PRAGMA synchronous").fetchone()[0]
+
+        def fail():
+            raise RuntimeError("rollups failed")
+
+        monkeypatch.setattr(self.db, "rebuild_rollups", fail)
+        with pytest.raises(RuntimeError):
+            generate_habits(self.db, 5, years=0.1, seed=1)
+
+        assert self.db.cursor.execute("PRAGMA synchronous").fetchone()[0] == synchronous
+
+    def teardown_method(self):
+        self.db.close_conn()
+        if os.path.exists(self.db.db_path):
+            os.remove(self.db.db_path)
@@ -0,0 +1,93 @@
+import http.client
+import json
+import os
+import threading
+from unittest.mock import patch
+from habit_components.server import HabitServer
+
+
+class TestHabitServer:
+    """Tests the HTTP/JSON API served by HabitServer."""
+
+    def setup_method(self):
+        self.db_name = "test_server_habit_tracker.db"
+        self.server = HabitServer(("127.0.0.1", 0), self.db_name)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.conn = http.client.HTTPConnection("127.0.0.1", self.server.server_port, timeout=5)
+
+    def _request(self, method, path, body=None):
+        self.conn.request(method, path, body=None if body is None else json.dumps(body),
+                          headers={"Content-Type": "application/json"})
+        response = self.conn.getresponse()
+        data = response.read()
+        is_json = response.getheader("Content-Type") == "application/json"
+        return response.status, json.loads(data) if is_json else None
+
+    def test_habit_crud_and_completion(self):
+        status, created = self._request("POST", "/habits",
+                                        {"name": "Read a book", "habit_period": "daily", "habit_type": "positive"})
+        habit_id = created["id"]
+
+        assert status == 201
+        assert self._request("POST", f"/habits/{habit_id}/completions") == (201, {"new_streak": 1,
+                                                                                  "streak_broken": False,
+                                                                                  "already_completed": False})
+        assert self._request("POST", f"/habits/{habit_id}/completions")[0] == 200
+        status, habit = self._request("GET", f"/habits/{habit_id}")
+        assert habit["current_streak"] == 1
+        assert len(self._request("GET", f"/habits/{habit_id}/completions")[1]) == 1
+
+        status, habit = self._request("PUT", f"/habits/{habit_id}",
+                                      {"name": "Read two books", "habit_period": "WEEKLY", "habit_type": "POSITIVE"})
+        assert (habit["name"], habit["habit_period"]) == ("Read two books", "WEEKLY")
+        assert self._request("POST", f"/habits/{habit_id}/archive")[1]["is_active"] == 0
+        assert self._request("POST", f"/habits/{habit_id}/completions")[0] == 409
+        assert self._request("GET", "/habits") == (200, [])
+        assert len(self._request("GET", f"/habits/{habit_id}/completions")[1]) == 1
+        assert self._request("POST", f"/habits/{habit_id}/unarchive")[1]["is_active"] == 1
+        assert self._request("POST", f"/habits/{habit_id}/archive")[1]["is_active"] == 0
+        assert self._request("DELETE", f"/habits/{habit_id}") == (204, None)
+        assert self._request("GET", f"/habits/{habit_id}")[0] == 404
+
+    def test_errors(self):
+        assert self._request("POST", "/habits", {"name": "Nap", "habit_period": "hourly",
+                                                 "habit_type": "positive"})[0] == 400
+        for body in (["Nap"], "Nap", {"name": "Nap", "habit_period": 1, "habit_type": "positive"},
+                     {"name": "", "habit_period": "daily", "habit_type": "positive"},
+                     {"name": ["Nap"], "habit_period": "daily", "habit_type": "positive"}):
+            assert self._request("POST", "/habits", body)[0] == 400
+        assert self._request("POST", "/habits/1/completions")[0] == 404
+        habit_id = self._request("POST", "/habits", {"name": "Nap", "habit_period": "daily",
+                                                     "habit_type": "positive"})[1]["id"]
+        with patch.object(self.server.db, "insert_habit_completion", return_value=None):
+            assert self._request("POST", f"/habits/{habit_id}/completions")[0] == 404
+        assert self._request("PATCH", "/habits")[0] == 501
+        assert self._request("DELETE", "/habits")[0] == 405
+        assert self._request("GET", "/nothing")[0] == 404
+        assert self._request("GET", "/analytics/by_period")[0] == 404
+
+    def test_batch_and_analytics(self):
+        status, responses = self._request("POST", "/batch", [
+            {"method": "POST", "path": "/habits",
+             "body": {"name": "Read a book", "habit_period": "DAILY", "habit_type": "POSITIVE"}},
+            {"method": "POST", "path": "/habits",
+             "body": {"name": "Deep cleaning", "habit_period": "WEEKLY", "habit_type": "NEGATIVE"}},
+            {"method": "GET", "path": "/analytics/by_type?type=negative"},
+            {"path": "/analytics/longest_streak_for_name?name=READ%20A%20BOOK"},
+            {"method": "GET"}
+        ])
+
+        assert status == 200
+        assert [r["status"] for r in responses] == [201, 201, 200, 200, 400]
+        assert [h["name"] for h in responses[2]["body"]] == ["Deep cleaning"]
+        assert responses[3]["body"]["name"] == "Read a book"
+
+    def teardown_method(self):
+        self.conn.close()
+        self.server.shutdown()
+        self.server.server_close()
+        for suffix in ("", "-wal", "-shm"):
+            path = os.path.join(os.path.dirname(os.path.dirname(__file__)), self.db_name + suffix)
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,65 @@
+import os
+import threading
+import pytest
+from habit_components.habit import Habit, HabitPeriod, HabitType
+from habit_components.shards import ShardedDBManager
+
+
+class TestShardedDBManager:
+    """Tests the routing of users to their own database files."""
+
+    def test_users_are_isolated(self, tmp_path):
+        router = ShardedDBManager(tmp_path)
+        router.call("alice", "insert_habit_info", Habit("Read a book", HabitPeriod.DAILY, HabitType.POSITIVE))
+        router.call(42, "insert_habit_info", Habit("Deep cleaning", HabitPeriod.WEEKLY, HabitType.POSITIVE))
+
+        assert router.call("alice", "fetch_habit_names") == ["Read a book"]
+        assert router.call("42", "fetch_habit_names") == ["Deep cleaning"]
+        router.close_all()
+        assert sorted(os.listdir(tmp_path)) == ["user_42.db", "user_alice.db"]
+
+    def test_hashed_shards_are_stable(self, tmp_path):
+        router = ShardedDBManager(tmp_path, shards=8)
+        path = router.user_path("alice")
+
+        assert path == ShardedDBManager(tmp_path, shards=8).user_path("alice")
+        assert os.path.basename(os.path.dirname(path)).startswith("shard_")
+        with pytest.raises(ValueError):
+            router.user_path("../alice")
+
+    def test_open_managers_are_bounded(self, tmp_path):
+        router = ShardedDBManager(tmp_path, max_open=2)
+        with router.session("pinned") as pinned:
+            for user_id in range(5):
+                router.call(user_id, "has_active_habits")
+                assert router.open_count <= 3
+            assert pinned.fetch_habit_names() == []
+
+        router.call("other", "has_active_habits")
+        assert router.open_count == 2
+        router.close_all()
+        assert router.open_count == 0
+
+    def test_session_is_shared_across_threads(self, tmp_path):
+        router = ShardedDBManager(tmp_path)
+        errors = []
+
+        def complete(habit_id):
+            try:
+                with router.session("alice") as db:
+                    db.insert_habit_completions([(habit_id, "2025-01-02 08:00:00")])
+                    assert db.fetch_habit_completions(habit_id) == [("2025-01-01 08:00:00",), ("2025-01-02 08:00:00",)]
+            except Exception as e:
+                errors.append(e)
+
+        with router.session("alice") as db:
+            db.insert_habit_info(Habit("Read a book", HabitPeriod.DAILY, HabitType.POSITIVE))
+            habit_id = db.fetch_habit_by_name("Read a book").id
+            db.insert_habit_completions([(habit_id, "2025-01-01 08:00:00")])
+            thread = threading.Thread(target=complete, args=(habit_id,))
+            thread.start()
+            thread.join()
+
+        assert errors == []
+        assert router.call("alice", "fetch_habit_by_id", habit_id).longest_streak == 2
+        router.close_all()
@@ -0,0 +1,59 @@
+import random
+from datetime import date
+from habit_components.streaks import compute_all_streaks, compute_streaks, period_key, _compute_all_streaks_python
+
+
+class TestStreaks:
+    """Tests the streak computation used when rebuilding streaks from completion history."""
+
+    def test_no_completions(self):
+        assert compute_streaks([], "DAILY") == (0, 0, None)
+
+    def test_daily_streak_with_gap(self):
+        timestamps = [
+            "2025-01-01 08:00:00",
+            "2025-01-02 08:00:00",
+            "2025-01-03 08:00:00",
+            "2025-01-05 08:00:00",
+            "2025-01-06 21:00:00"
+        ]
+        assert compute_streaks(timestamps, "DAILY") == (2, 3, "2025-01-06 21:00:00")
+
+    def test_same_day_counts_once(self):
+        timestamps = ["2025-01-01 08:00:00", "2025-01-01 20:00:00", "2025-01-02 07:00:00"]
+        assert compute_streaks(timestamps, "DAILY") == (2, 2, "2025-01-02 07:00:00")
+
+    def test_weekly_streak(self):
+        timestamps = ["2025-01-01 08:00:00", "2025-01-08 08:00:00", "2025-01-20 08:00:00"]
+        assert compute_streaks(timestamps, "WEEKLY") == (1, 2, "2025-01-20 08:00:00")
+
+    def test_weekly_streak_uses_calendar_weeks(self):
+        # Sunday to Monday continues the streak, Monday to Sunday of the same week counts once.
+        timestamps = ["2025-01-05 08:00:00", "2025-01-06 08:00:00", "2025-01-12 08:00:00", "2025-01-26 08:00:00"]
+        assert compute_streaks(timestamps, "WEEKLY") == (1, 2, "2025-01-26 08:00:00")
+
+    def test_period_key(self):
+        monday, sunday = date(2025, 1, 6).toordinal(), date(2025, 1, 12).toordinal()
+        assert period_key(monday, "DAILY") == monday
+        assert period_key(monday, "WEEKLY") == period_key(sunday, "WEEKLY") == period_key(sunday + 1, "WEEKLY") - 1
+
+    def test_compute_all_streaks_matches_python_fallback(self):
+        rng = random.Random(7)
+        rows = []
+        for habit_id in range(1, 40):
+            day = 730000
+            for _ in range(rng.randint(0, 60)):
+                day += rng.choice([0, 1, 1, 1, 2, 5, 8])
+                rows.append((habit_id, day))
+        max_gaps = {habit_id: 1 if habit_id % 2 else 7 for habit_id in range(1, 39)}
+
+        result = compute_all_streaks(iter(rows), max_gaps)
+
+        assert result == _compute_all_streaks_python(iter(rows), max_gaps)
+        assert 39 not in result
+
+    def test_compute_all_streaks_runs(self):
+        rows = [(1, 10), (1, 11), (1, 11), (1, 12), (1, 20), (2, 5), (2, 12), (2, 20)]
+
+        assert compute_all_streaks(rows, {1: 1, 2: 7}) == {1: (1, 3), 2: (1, 2)}
+        assert compute_all_streaks([], {1: 1}) == {}
@@ -0,0 +1,44 @@
+import io
+import os
+from habit_components.db import DBManager
+from habit_components.habit import Habit, HabitPeriod, HabitType
+from habit_components.tracing import QueryTracer
+
+
+class TestQueryTracer:
+    """Tests the opt-in query instrumentation of the DBManager class."""
+
+    def setup_method(self):
+        self.db_name = "test_traced_habit_tracker.db"
+        self.slow_log = io.StringIO()
+        self.tracer = QueryTracer(slow_ms=0, slow_log=self.slow_log)
+        self.db = DBManager(db_name=self.db_name, tracer=self.tracer)
+
+    def test_methods_and_statements_are_recorded(self):
+        self.db.insert_habit_info(Habit("Read a book", HabitPeriod.DAILY, HabitType.POSITIVE))
+        self.db.insert_habit_info(Habit("Deep cleaning", HabitPeriod.WEEKLY, HabitType.POSITIVE))
+        habit_id = self.db.fetch_habits_by_period("daily")[0].id
+        self.db.insert_habit_completion(habit_id)
+
+        assert self.tracer.methods["insert_habit_info"].count == 2
+        assert "insert_habits" not in self.tracer.methods
+        assert self.tracer.methods["fetch_habits_by_period"].count == 1
+        select = self.tracer.statements[
+            "SELECT * FROM habits WHERE is_active = 1 AND habit_period = ? ORDER BY id"]
+        assert (select.count, select.rows) == (1, 1)
+        assert self.tracer.statements["COMMIT"].count >= 3
+
+    def test_slow_log_includes_query_plan(self):
+        self.db.fetch_habits_by_period("weekly")
+
+        methods = [method for method, *_ in self.tracer.slow_queries]
+        plan = next(plan for method, sql, _, plan in self.tracer.slow_queries if sql.startswith("SELECT * FROM habits"))
+        assert "fetch_habits_by_period" in methods
+        assert any("idx_habits_active_period" in line for line in plan)
+        assert "idx_habits_active_period" in self.slow_log.getvalue()
+        assert "fetch_habits_by_period" in self.tracer.summary()
+
+    def teardown_method(self):
+        self.db.close_conn()
+        if os.path.exists(self.db.db_path):
+            os.remove(self.db.db_path)